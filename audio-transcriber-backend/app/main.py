@@ -1,63 +1,142 @@
+from app.services.model_registry import registry  # first import: starts the startup clock
 import os
 import sys
+import time
+import queue
+import argparse
 import threading
-from sounddevice import check_input_settings
-from app.services.audio_stream import run_vad_stream
-from app.services.transcriber import run_transcription_loop
-from app.stream_config import MIC_CONFIG, REMOTE_CONFIG
-from app.audio_devices import select_input_device, select_wasapi_loopback_device
+from app.services.supervisor import StreamSupervisor, load_stream_definitions, resolve_device
+from app.services.transcriber import run_transcription_loop, device, compute_type
+from app.services.partial_transcriber import PartialTranscriber
+from app.services.metrics import metrics, MetricsExporter, enable_profiling
+from app.services.segment_queue import encoder_pool
+from app.stream_config import PARTIALS_CONFIG, METRICS_CONFIG, STORAGE_CONFIG, SUPERVISOR_CONFIG, TRANSCRIBER_CONFIG
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+registry.mark("imports done")
 
 stop_event = threading.Event()
+segment_queue = queue.Queue(maxsize=TRANSCRIBER_CONFIG["max_queued_segments"])
+encoder_pool(STORAGE_CONFIG["encoder_workers"])
+transcriber_ready = threading.Event()
+transcriber_failed = threading.Event()
+partials = None
+if PARTIALS_CONFIG["enabled"]:
+    partials = PartialTranscriber(
+        PARTIALS_CONFIG["model"],
+        device=device,
+        compute_type=compute_type,
+        interval_ms=PARTIALS_CONFIG["interval_ms"],
+        max_window_s=PARTIALS_CONFIG["max_window_s"]
+    )
 
-def find_supported_sample_rate(device_index, rates=(48000, 44100, 32000, 16000)):
-    for rate in rates:
-        try:
-            check_input_settings(device=device_index, samplerate=rate)
-            print(f"[main] Sample rate {rate} is supported by device {device_index}")
-            return rate
-        except Exception as e:
-            print(f"[main] Sample rate {rate} not supported: {e}")
-    raise RuntimeError(f"No supported sample rate found for device {device_index}")
+def run_transcriber(**kwargs):
+    try:
+        run_transcription_loop(**kwargs)
+    except Exception as e:
+        print(f"[main] Transcriber failed: {e}")
+        transcriber_failed.set()
+        raise
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Live (or replayed) multi-stream audio transcription.")
+    parser.add_argument("--streams", metavar="FILE", default=SUPERVISOR_CONFIG["streams_file"],
+                        help="JSON stream definitions (default: the mic + remote pair from stream_config).")
+    parser.add_argument("--replay", metavar="NAME=WAV", action="append", default=[],
+                        help="Replay a WAV as stream NAME instead of its device; only replayed streams run.")
+    parser.add_argument("--mic-file", help="Same as --replay mic=WAV.")
+    parser.add_argument("--remote-file", help="Same as --replay remote=WAV.")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed as a multiple of real time; 0 = as fast as possible (default 1).")
+    parser.add_argument("--profile", metavar="DIR", default=METRICS_CONFIG["profile_dir"],
+                        help="Profile the capture and Whisper threads with cProfile, writing DIR/<thread>.prof.")
+    return parser.parse_args()
+
+def replay_files(args) -> dict:
+    files = dict(item.split("=", 1) for item in args.replay)
+    if args.mic_file:
+        files["mic"] = args.mic_file
+    if args.remote_file:
+        files["remote"] = args.remote_file
+    return files
 
 if __name__ == "__main__":
-    print("[main] Starting audio system...")
-
-    mic_device_index = select_input_device()
-    MIC_CONFIG["device_index"] = mic_device_index
-    print(f"[main] Selected mic device index: {mic_device_index}")
-
-    remote_device_index = select_wasapi_loopback_device()
-    if remote_device_index is not None:
-        REMOTE_CONFIG["device_index"] = remote_device_index
-        REMOTE_CONFIG["sample_rate"] = find_supported_sample_rate(remote_device_index)
-        print(f"[main] Selected remote device index: {remote_device_index}")
-    else:
-        exit("[main] No suitable WASAPI loopback device found. Exiting.")
-
-    mic_thread = threading.Thread(target=run_vad_stream, kwargs={"config": MIC_CONFIG, "stop_event": stop_event}, daemon=True)
-    remote_thread = threading.Thread(target=run_vad_stream, kwargs={"config": REMOTE_CONFIG, "stop_event": stop_event}, daemon=True)
-    transcriber_thread = threading.Thread(target=run_transcription_loop, kwargs={"stop_event": stop_event}, daemon=True)
-
-    mic_thread.start()
-    remote_thread.start()
+    args = parse_args()
+    configs = load_stream_definitions(args.streams)
+    replays = replay_files(args)
+    if replays:
+        unknown = set(replays) - {config["name"] for config in configs}
+        if unknown:
+            exit(f"[main] No stream named {', '.join(sorted(unknown))}")
+        # All files share one clock, so their transcripts line up in the merged timeline.
+        replay_start = time.time()
+        configs = [config for config in configs if config["name"] in replays]
+        for config in configs:
+            config.update(input_file=replays[config["name"]], replay_speed=args.speed, replay_start=replay_start)
+
+    print(f"[main] Starting audio system{' (replay)' if replays else ''} with streams: "
+          f"{', '.join(config['name'] for config in configs)}")
+    if args.profile:
+        enable_profiling(args.profile)
+    exporter = MetricsExporter(
+        metrics,
+        snapshot_path=METRICS_CONFIG["snapshot_path"],
+        interval=METRICS_CONFIG["snapshot_interval_s"],
+        port=METRICS_CONFIG["prometheus_port"]
+    )
+    exporter.start()
+
+    # Models load in the background while devices are being selected.
+    registry.preload()
+    drain_event = threading.Event()
+    transcriber_thread = threading.Thread(target=run_transcriber, kwargs={"stop_event": stop_event, "segment_queue": segment_queue, "streams": configs, "ready_event": transcriber_ready, "drain_event": drain_event}, daemon=True)
     transcriber_thread.start()
+    if partials is not None:
+        partials.start()
+
+    selection_started = time.perf_counter()
+    for config in configs:
+        resolve_device(config)
+    registry.record("device selection", selection_started, time.perf_counter() - selection_started)
 
-    print("[main] All threads started. Press Ctrl+C to stop.")
+    supervisor = StreamSupervisor(configs, stop_event, segment_queue, partials)
+    supervisor.start()
+    supervisor_thread = threading.Thread(target=supervisor.run, name="supervisor", daemon=True)
+    supervisor_thread.start()
+    registry.mark("streams started")
 
+    print("[main] All streams started. Press Ctrl+C to stop.")
+
+    reported = False
+    failed = False
     try:
         while not stop_event.is_set():
-            mic_thread.join(timeout=0.5)
-            remote_thread.join(timeout=0.5)
+            if not reported and transcriber_ready.is_set():
+                print(registry.report())
+                reported = True
+            supervisor_thread.join(timeout=0.5)
+            if not supervisor_thread.is_alive():
+                drain_event.set()  # Every stream has finished: transcribe what is queued, then exit
             transcriber_thread.join(timeout=0.5)
-            if not (mic_thread.is_alive() or remote_thread.is_alive() or transcriber_thread.is_alive()):
+            if not transcriber_thread.is_alive() and (transcriber_failed.is_set() or not drain_event.is_set()):
+                # Nothing would consume the segments: stop capturing instead of queueing them forever
+                print("[main] Transcriber stopped unexpectedly. Stopping streams...")
+                failed = True
+                stop_event.set()
+                supervisor_thread.join()
+                break
+            if not (supervisor_thread.is_alive() or transcriber_thread.is_alive()):
                 break
     except KeyboardInterrupt:
         print("[main] Ctrl+C detected. Stopping threads...")
         stop_event.set()
-        mic_thread.join()
-        remote_thread.join()
+        supervisor_thread.join()
         transcriber_thread.join()
+    if partials is not None:
+        partials.stop()
+    exporter.stop()
+    print(metrics.report())
 
-    print("[main] All threads stopped. Exiting.")
\ No newline at end of file
+    print("[main] All threads stopped. Exiting.")
+    if failed:
+        sys.exit(1)
@@ -1,12 +1,11 @@
 # audio_stream.py
 
-from app.services.mic_audio_buffer import MicAudioBuffer
-from app.services.remote_audio_buffer import RemoteAudioBuffer
-
-def run_vad_stream(config, stop_event):
-    if config["name"] == "remote":
-        buffer = RemoteAudioBuffer(config, stop_event)
-    else:
-        buffer = MicAudioBuffer(config, stop_event)
+from app.services.supervisor import resolve_strategy, strategy_name
 
+def run_vad_stream(config, stop_event, segment_queue=None, partials=None):
+    """
+    Run a single stream on the calling thread until stop_event is set (StreamSupervisor runs many).
+    """
+    cls, _ = resolve_strategy(strategy_name(config))
+    buffer = cls(config, stop_event, segment_queue, partials)
     buffer.run()
@@ -0,0 +1,319 @@
+# capture_ring.py
+
+import time
+import threading
+import logging
+import numpy as np
+from typing import Callable, Optional
+from app.services.metrics import metrics, profiled
+
+
+class CaptureRing:
+    """
+    Preallocated single-producer/single-consumer ring of audio frames.
+
+    The producer (PortAudio callback) only advances write_pos and the consumer
+    only advances read_pos, so neither side takes a lock. When the consumer
+    falls behind, new input is dropped and counted instead of overwriting
+    unread samples.
+    """
+
+    def __init__(self, capacity: int, channels: int, dtype):
+        self.capacity = capacity
+        self.channels = channels
+        self.data = np.zeros((capacity, channels), dtype=dtype)
+        self.write_pos = 0
+        self.read_pos = 0
+        self.dropped_frames = 0
+
+    def available(self) -> int:
+        return self.write_pos - self.read_pos
+
+    def write(self, indata: np.ndarray) -> int:
+        frames = min(len(indata), self.capacity - self.available())
+        if frames < len(indata):
+            self.dropped_frames += len(indata) - frames
+        if frames <= 0:
+            return 0
+
+        start = self.write_pos % self.capacity
+        first = min(frames, self.capacity - start)
+        self.data[start:start + first] = indata[:first]
+        if first < frames:
+            self.data[:frames - first] = indata[first:frames]
+        self.write_pos += frames
+        return frames
+
+    def read(self, frames: int) -> Optional[np.ndarray]:
+        if self.available() < frames:
+            return None
+
+        start = self.read_pos % self.capacity
+        first = min(frames, self.capacity - start)
+        if first == frames:
+            block = self.data[start:start + frames].copy()
+        else:
+            block = np.concatenate((self.data[start:], self.data[:frames - first]))
+        self.read_pos += frames
+        return block
+
+
+class CaptureStage:
+    """
+    Splits a stream into a real-time capture side and a processing side.
+
+    `callback` is safe to hand to sounddevice: it only copies `indata` into the
+    ring and records a clock anchor (ring position -> capture time from
+    `time_info`). A consumer thread pulls fixed-size blocks and runs
+    `process_block(block, capture_time)` (VAD, segmentation, persistence)
+    outside the audio thread, where capture_time is the wall-clock time the
+    block's first sample was captured. The consumer is the stage's own
+    thread, or a ProcessingPool shared with other stages.
+    """
+
+    anchor_slots = 64
+
+    def __init__(
+        self,
+        name: str,
+        channels: int,
+        dtype,
+        block_size: int,
+        capacity: int,
+        sample_rate: int,
+        process_block: Callable[[np.ndarray, float], None],
+        pool: Optional["ProcessingPool"] = None,
+    ):
+        self.name = name
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.process_block = process_block
+        self.stopping = threading.Event()
+        self.ring = CaptureRing(capacity, channels, dtype)
+        self.poll_interval = 0.01
+        self.worker: Optional[threading.Thread] = None
+        self.pool = pool
+        self.busy = threading.Lock()  # held while a consumer processes this stage's blocks
+
+        self.input_overflows = 0
+        self.input_underflows = 0
+        self.blocks_processed = 0
+
+        # anchors[i] = (ring write position, capture time of that sample); written only by the callback.
+        self.anchors = np.zeros((self.anchor_slots, 2))
+        self.anchor_count = 0
+        self.clock_offset: Optional[float] = None  # wall clock - PortAudio stream clock
+
+        self.callback_time = metrics.histogram("capture_callback_seconds", "Time spent in the audio callback", source=name)
+        self.process_time = metrics.histogram("capture_process_seconds", "Processing time per captured block", source=name)
+        self.capture_lag = metrics.histogram("capture_lag_seconds", "Capture of a block -> start of its processing", source=name)
+        metrics.counter("capture_dropped_frames_total", lambda: self.ring.dropped_frames,
+                        "Frames dropped because the capture ring was full", source=name)
+        metrics.counter("capture_input_overflows_total", lambda: self.input_overflows,
+                        "Input overflows reported by the audio device", source=name)
+
+        self.logger = logging.getLogger(name)
+
+    def _capture_time(self, frames, time_info) -> float:
+        adc_time = getattr(time_info, "inputBufferAdcTime", 0.0)
+        stream_time = getattr(time_info, "currentTime", 0.0)
+        if adc_time and stream_time:
+            if self.clock_offset is None:
+                self.clock_offset = time.time() - stream_time
+            return adc_time + self.clock_offset
+        # Host API does not report stream time: estimate from the callback time.
+        return time.time() - frames / self.sample_rate
+
+    def callback(self, indata, frames, time_info, status):
+        started = time.perf_counter()
+        if status:
+            if status.input_overflow:
+                self.input_overflows += 1
+            if status.input_underflow:
+                self.input_underflows += 1
+
+        slot = self.anchor_count % self.anchor_slots
+        self.anchors[slot, 0] = self.ring.write_pos
+        self.anchors[slot, 1] = self._capture_time(frames, time_info)
+        self.anchor_count += 1
+        self.ring.write(indata)
+        self.callback_time.observe(time.perf_counter() - started)
+
+    def time_at(self, position: int) -> float:
+        """
+        Capture time of the sample at ring position `position`, from the latest anchor.
+        """
+        if not self.anchor_count:
+            return time.time()
+        anchor_position, anchor_time = self.anchors[(self.anchor_count - 1) % self.anchor_slots]
+        return anchor_time + (position - anchor_position) / self.sample_rate
+
+    def stats(self) -> dict:
+        return {
+            "buffered_frames": self.ring.available(),
+            "dropped_frames": self.ring.dropped_frames,
+            "input_overflows": self.input_overflows,
+            "input_underflows": self.input_underflows,
+            "blocks_processed": self.blocks_processed,
+        }
+
+    def start(self):
+        if self.pool is not None:
+            self.pool.add(self)
+            return
+        self.worker = threading.Thread(target=profiled(self._consume, f"{self.name}-capture"),
+                                       name=f"{self.name}-capture", daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        """
+        Drain whatever is left in the ring, then join the consumer thread.
+        """
+        self.stopping.set()
+        if self.pool is not None:
+            self.pool.remove(self)
+            with self.busy:
+                self.process_available()
+            self.logger.info(f"Capture stopped: {self.stats()}")
+        elif self.worker is not None:
+            self.worker.join()
+            self.worker = None
+
+    def _consume(self):
+        while True:
+            with self.busy:
+                processed = self.process_available()
+            if not processed:
+                if self.stopping.is_set():
+                    break
+                self.stopping.wait(self.poll_interval)
+
+        self.logger.info(f"Capture stopped: {self.stats()}")
+
+    def process_available(self, max_blocks: Optional[int] = None) -> int:
+        """
+        Process the complete blocks in the ring (at most max_blocks); the caller holds `busy`.
+        """
+        processed = 0
+        while max_blocks is None or processed < max_blocks:
+            capture_time = self.time_at(self.ring.read_pos)
+            block = self.ring.read(self.block_size)
+            if block is None:
+                break
+
+            started = time.perf_counter()
+            self.capture_lag.observe(time.time() - capture_time)
+            try:
+                self.process_block(block, capture_time)
+            except Exception:
+                self.logger.exception("Error processing captured audio")
+            self.process_time.observe(time.perf_counter() - started)
+            self.blocks_processed += 1
+            processed += 1
+        return processed
+
+
+class ProcessingPool:
+    """
+    A fixed number of threads that process captured blocks for any number
+    of CaptureStages, so the thread count does not grow with the number of
+    streams.
+
+    Each worker walks the registered stages round robin and takes a stage
+    only if no other worker holds it (`busy`), so every stage's blocks are
+    still processed one at a time and in order, as its stateful VAD and
+    segmentation require. A worker handles at most `max_blocks` blocks per
+    visit, so one busy stream cannot starve the others.
+    """
+
+    def __init__(self, workers: int = 2, max_blocks: int = 4, poll_interval: float = 0.01):
+        self.max_blocks = max_blocks
+        self.poll_interval = poll_interval
+        self.stages: list[CaptureStage] = []  # replaced, never mutated, so workers can iterate without a lock
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.threads = [
+            threading.Thread(target=profiled(self._run, f"vad-worker-{i}"), args=(i,), name=f"vad-worker-{i}",
+                             daemon=True)
+            for i in range(workers)
+        ]
+
+    def add(self, stage: CaptureStage):
+        with self.lock:
+            self.stages = self.stages + [stage]
+
+    def remove(self, stage: CaptureStage):
+        with self.lock:
+            self.stages = [s for s in self.stages if s is not stage]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        for thread in self.threads:
+            thread.join()
+
+    def _run(self, index: int):
+        turn = index
+        while not self.stopping.is_set():
+            stages = self.stages
+            processed = 0
+            for i in range(len(stages)):
+                stage = stages[(turn + i) % len(stages)]
+                if stage.busy.acquire(blocking=False):
+                    try:
+                        processed += stage.process_available(self.max_blocks)
+                    finally:
+                        stage.busy.release()
+            turn += 1
+            if not processed:
+                self.stopping.wait(self.poll_interval)
+
+
+class HistoryRing:
+    """
+    Fixed-size history of the most recent samples.
+
+    Every sample is written twice (at i and i + capacity), so the latest
+    window is always one contiguous slice and `latest` returns a view
+    without copying.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        self.capacity = capacity
+        self.data = np.zeros(2 * capacity, dtype=dtype)
+        self.pos = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def extend(self, samples: np.ndarray):
+        if len(samples) > self.capacity:
+            samples = samples[-self.capacity:]
+        n = len(samples)
+
+        first = min(n, self.capacity - self.pos)
+        self.data[self.pos:self.pos + first] = samples[:first]
+        self.data[self.pos + self.capacity:self.pos + self.capacity + first] = samples[:first]
+        rest = n - first
+        if rest:
+            self.data[:rest] = samples[first:]
+            self.data[self.capacity:self.capacity + rest] = samples[first:]
+
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        View of the newest `n` samples (all buffered samples by default), oldest first.
+        """
+        n = self.size if n is None else min(n, self.size)
+        end = self.pos + self.capacity
+        return self.data[end - n:end]
+
+    def clear(self):
+        self.pos = 0
+        self.size = 0
@@ -0,0 +1,183 @@
+# capture_stream.py
+
+import queue
+import logging
+import threading
+import numpy as np
+from typing import Optional
+from app.services.capture_ring import CaptureStage, ProcessingPool
+from app.services.file_source import FileSource, wav_info
+from app.services.segment_store import SegmentStore
+from app.services.segment_queue import AudioSegment, AsyncSegmentWriter
+from app.services.metrics import metrics
+
+
+class CaptureStream:
+    """
+    Lifecycle shared by the capture strategies (MicAudioBuffer,
+    RemoteAudioBuffer, ...): open the device or replay file, feed its
+    CaptureStage, hand finished segments on, and close everything again.
+
+    Subclasses implement `process_frame(block, capture_time)` and set the
+    capture format through `dtype`, `capture_channels` and `device_blocksize`.
+    `start`/`stop`/`is_alive` let a supervisor manage many streams without a
+    thread each; `run` keeps the original blocking behaviour.
+    """
+
+    dtype = np.int16
+    device_blocksize = None  # None = frame_size; 0 lets PortAudio choose
+
+    def __init__(self, config: dict, stop_event, segment_queue=None, partials=None,
+                 processing_pool: Optional[ProcessingPool] = None):
+        self.input_file = config.get("input_file")  # Replay a WAV file instead of opening device_index
+        # A replayed file runs at its own sample rate, as if the device had been opened at it.
+        self.sample_rate = wav_info(self.input_file)[0] if self.input_file else config["sample_rate"]
+        self.frame_duration_ms = config["frame_duration_ms"]
+        self.frame_size = int(self.sample_rate * self.frame_duration_ms / 1000)
+        self.vad_sample_rate = 16000
+        self.audio_dir = config["path_audio"]
+        self.device_index = config.get("device_index")
+        self.name = config["name"]
+        self.stop_event = stop_event
+        self.segment_queue = segment_queue
+        self.partials = partials  # Optional PartialTranscriber fed while speech is in progress
+        self.processing_pool = processing_pool  # Shared block-processing threads; None = one thread per stream
+        self.capture_buffer_seconds = config.get("capture_buffer_seconds", 10)
+        self.replay_speed = config.get("replay_speed", 1.0)
+        self.replay_start = config.get("replay_start")
+
+        self.store = SegmentStore.for_stream(config)
+        self.writer = AsyncSegmentWriter(self.store, self.name) if config.get("save_audio", True) else None
+
+        self.capture: Optional[CaptureStage] = None
+        self.stream = None  # sounddevice.InputStream while a device is open
+        self.replay_thread: Optional[threading.Thread] = None
+        self.replay_done = False
+        self.source_stop = threading.Event()
+        self.dropped_segments = 0
+        metrics.counter("transcription_dropped_segments_total", lambda: self.dropped_segments,
+                        "Segments not transcribed because the transcription queue was full", source=self.name)
+
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(self.name)
+
+    def capture_channels(self, available: int) -> int:
+        """
+        Channels to capture from a device or file that has `available` of them.
+        """
+        return 1
+
+    def _enqueue(self, segment: AudioSegment):
+        """
+        A replay waits for room in the transcription queue (the file source
+        then waits for the capture ring), so no segment is lost. Live capture
+        cannot wait: when the transcriber falls that far behind, the segment
+        is dropped from transcription and counted; it is still saved.
+        """
+        if self.input_file:
+            while not self.stop_event.is_set() and not self.source_stop.is_set():
+                try:
+                    self.segment_queue.put(segment, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            return
+        try:
+            self.segment_queue.put_nowait(segment)
+        except queue.Full:
+            self.dropped_segments += 1
+            self.logger.warning(f"Transcription queue full; {segment.name} will not be transcribed "
+                                f"({self.dropped_segments} dropped)")
+
+    def hand_off(self, segment: AudioSegment):
+        if self.segment_queue is not None:
+            self._enqueue(segment)
+        if self.writer is not None:
+            self.writer.submit(segment)
+        self.logger.info(f"Segment ready: {segment.name} ({segment.duration:.2f}s)")
+
+    def audio_callback(self, indata, frames, time_info, status):
+        self.capture.callback(indata, frames, time_info, status)
+
+    def _create_capture(self, channels: int):
+        self.capture = CaptureStage(
+            name=self.name,
+            channels=channels,
+            dtype=self.dtype,
+            block_size=self.frame_size,
+            capacity=int(self.capture_buffer_seconds * self.sample_rate),
+            sample_rate=self.sample_rate,
+            process_block=self.process_frame,
+            pool=self.processing_pool
+        )
+        self.capture.start()
+
+    def _replay(self):
+        FileSource(self.input_file, self.capture, self.source_stop, speed=self.replay_speed,
+                   start_time=self.replay_start).run()
+        self.replay_done = not self.source_stop.is_set()
+
+    def start(self):
+        """
+        Open the device (or start the replay) and begin processing; returns immediately.
+        """
+        if self.writer is not None:
+            self.writer.start()
+
+        if self.input_file:
+            _, channels = wav_info(self.input_file)
+            self._create_capture(self.capture_channels(channels))
+            self.replay_thread = threading.Thread(target=self._replay, name=f"{self.name}-replay", daemon=True)
+            self.replay_thread.start()
+            return
+
+        import sounddevice as sd
+
+        device_info = sd.query_devices(self.device_index, kind="input" if self.device_index is None else None)
+        if device_info["max_input_channels"] < 1:
+            raise ValueError(f"Device '{device_info['name']}' has no input channels.")
+        channels = self.capture_channels(device_info["max_input_channels"])
+        self._create_capture(channels)
+        self.logger.info(f"Starting {self.name} stream on device {self.device_index} ({device_info['name']})...")
+        self.stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=channels,
+            dtype=np.dtype(self.dtype).name,
+            callback=self.audio_callback,
+            blocksize=self.frame_size if self.device_blocksize is None else self.device_blocksize,
+            device=self.device_index
+        )
+        self.stream.start()
+
+    def is_alive(self) -> bool:
+        if self.replay_thread is not None:
+            return self.replay_thread.is_alive()
+        return self.stream is not None and self.stream.active
+
+    def stop(self):
+        """
+        Close the source, process what is still buffered and wait for pending writes.
+        """
+        self.source_stop.set()
+        if self.stream is not None:
+            try:
+                self.stream.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing device stream: {e}")
+            self.stream = None
+        if self.replay_thread is not None:
+            self.replay_thread.join()
+        if self.capture is not None:
+            self.capture.stop()
+        if self.writer is not None:
+            self.writer.stop()
+
+    def run(self):
+        self.start()
+        try:
+            while not self.stop_event.is_set() and self.is_alive():
+                self.stop_event.wait(0.1)
+        except KeyboardInterrupt:
+            self.logger.info("Stream interrupted by user. Exiting.")
+        finally:
+            self.stop()
@@ -0,0 +1,128 @@
+# energy_gate.py
+
+import numpy as np
+from typing import Callable, Optional
+from app.services.metrics import metrics
+
+WINDOW_SIZE_SAMPLES = 512  # Same windows as Silero at 16 kHz
+
+
+def window_features(samples: np.ndarray, window: int = WINDOW_SIZE_SAMPLES) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-window energy (dBFS) and zero-crossing rate of float samples in [-1, 1],
+    for every full window plus the remainder.
+    """
+    n = len(samples)
+    pad = (-n) % window
+    if pad:
+        samples = np.concatenate((samples, np.zeros(pad, dtype=samples.dtype)))
+    windows = samples.reshape(-1, window)
+    power = np.einsum("ij,ij->i", windows, windows) / window
+    energy_db = 10 * np.log10(power + 1e-12)
+    signs = np.signbit(windows)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (window - 1)
+    return energy_db, zcr
+
+
+class EnergyGate:
+    """
+    Cheap first tier in front of the neural VAD.
+
+    A frame is "clear silence" when every 512-sample window in it is within
+    `margin_db` of the tracked noise floor (or below `silence_db`, i.e.
+    digital silence) and none looks like an unvoiced consonant: a high
+    zero-crossing rate at more than `margin_db / 2` over the floor (broadband
+    background hiss crosses zero just as often, but sits at the floor).
+    Anything else is ambiguous and goes to Silero.
+
+    The noise floor drops immediately to quieter frames and rises by at
+    most `rise_db_per_s` while Silero reports no speech, so it follows a
+    changing background without drifting up into speech. It is clamped to
+    `max_floor_db`, so a noisy room can never gate out normal speech.
+    """
+
+    def __init__(self, sample_rate: int = 16000, margin_db: float = 6.0, silence_db: float = -70.0,
+                 zcr_max: float = 0.3, initial_floor_db: float = -60.0, rise_db_per_s: float = 1.0,
+                 max_floor_db: float = -40.0):
+        self.sample_rate = sample_rate
+        self.margin_db = margin_db
+        self.silence_db = silence_db
+        self.zcr_max = zcr_max
+        self.floor_db = initial_floor_db
+        self.rise_db_per_s = rise_db_per_s
+        self.max_floor_db = max_floor_db
+
+    def is_silence(self, samples: np.ndarray) -> bool:
+        energy_db, zcr = window_features(samples)
+        quiet = energy_db < self.floor_db + self.margin_db
+        fricative = (zcr > self.zcr_max) & (energy_db > self.floor_db + self.margin_db / 2)
+        return bool(np.all((energy_db < self.silence_db) | (quiet & ~fricative)))
+
+    def update(self, samples: np.ndarray, speech: bool):
+        """
+        Adapt the noise floor to a frame whose speech/no-speech verdict is known.
+        """
+        energy_db, _ = window_features(samples)
+        audible = energy_db[energy_db > self.silence_db]
+        if not len(audible):
+            return
+        level = float(np.percentile(audible, 20))
+        if level < self.floor_db:
+            self.floor_db = level
+        elif not speech:
+            rise = self.rise_db_per_s * len(samples) / self.sample_rate
+            self.floor_db = min(level, self.floor_db + rise)
+        self.floor_db = min(self.floor_db, self.max_floor_db)
+
+    def floor_rms(self) -> float:
+        return float(10 ** (self.floor_db / 20))
+
+    def override_rms(self, minimum: float = 0.025, margin_db: float = 20.0) -> float:
+        """
+        RMS above which a frame counts as speech whatever the VAD says:
+        `minimum`, raised to `margin_db` above the noise floor in a loud room.
+        """
+        return max(minimum, self.floor_rms() * 10 ** (margin_db / 20))
+
+
+class GatedVAD:
+    """
+    `detect(frame) -> bool` behind an EnergyGate: clear-silence frames are
+    answered without calling `detect`. While `in_speech()` is true (a
+    stateful VAD is inside an utterance) every frame goes to `detect`, so it
+    still sees the silence that ends the utterance.
+    """
+
+    def __init__(self, detect: Callable[[np.ndarray], bool], gate: Optional[EnergyGate] = None,
+                 in_speech: Callable[[], bool] = lambda: False, on_skip: Callable[[], None] = lambda: None,
+                 name: str = "vad"):
+        self.detect = detect
+        self.gate = gate or EnergyGate()
+        self.in_speech = in_speech
+        self.on_skip = on_skip
+        self.frames = 0
+        self.skipped = 0
+        metrics.counter("vad_frames_total", lambda: self.frames, "Frames offered to the VAD", source=name)
+        metrics.counter("vad_frames_skipped_total", lambda: self.skipped,
+                        "Frames the energy gate answered without the neural VAD", source=name)
+
+    def __call__(self, frame: np.ndarray) -> bool:
+        """
+        Feed a 16 kHz int16 frame and report whether speech was active in it.
+        """
+        if frame.ndim > 1:
+            frame = frame[:, 0]
+        self.frames += 1
+        samples = frame.astype(np.float32) / 32768.0
+        if not self.in_speech() and self.gate.is_silence(samples):
+            self.skipped += 1
+            self.on_skip()
+            self.gate.update(samples, speech=False)
+            return False
+
+        speech = self.detect(frame)
+        self.gate.update(samples, speech)
+        return speech
+
+    def skipped_fraction(self) -> float:
+        return self.skipped / self.frames if self.frames else 0.0
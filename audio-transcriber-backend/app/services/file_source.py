@@ -0,0 +1,107 @@
+# file_source.py
+
+import time
+import logging
+import numpy as np
+from types import SimpleNamespace
+from typing import Optional
+from scipy.io import wavfile
+from app.services.capture_ring import CaptureStage
+
+
+def wav_info(path: str) -> tuple[int, int]:
+    """
+    (sample_rate, channels) of a WAV file, without reading the samples.
+    """
+    rate, data = wavfile.read(path, mmap=True)
+    return rate, 1 if data.ndim == 1 else data.shape[1]
+
+
+def to_capture_format(block: np.ndarray, channels: int, dtype) -> np.ndarray:
+    """
+    Convert a block of WAV samples to the (frames, channels) layout and dtype a capture ring expects.
+    """
+    if block.ndim == 1:
+        block = block[:, None]
+    if block.dtype == np.uint8:
+        samples = (block.astype(np.float32) - 128) / 128
+    elif np.issubdtype(block.dtype, np.integer):
+        samples = block.astype(np.float32) / (float(np.iinfo(block.dtype).max) + 1)
+    else:
+        samples = block.astype(np.float32, copy=False)
+
+    if samples.shape[1] != channels:
+        samples = samples.mean(axis=1, keepdims=True) if channels == 1 else np.repeat(samples[:, :1], channels, axis=1)
+    if np.dtype(dtype) == np.int16:
+        return np.clip(np.rint(samples * 32768), -32768, 32767).astype(np.int16)
+    return samples.astype(dtype, copy=False)
+
+
+class FileSource:
+    """
+    Plays a WAV file into a CaptureStage in place of a sounddevice stream.
+
+    Blocks go through the same `callback` as live audio, with a synthetic
+    `time_info` on a clock that starts at `start_time`, so segmentation,
+    timestamps and transcription run exactly as they would live. `speed` is
+    a multiple of real time (1.0 = real time, 0 = as fast as the consumer
+    keeps up). Unlike a live device the file never drops input: when the
+    ring is full the source waits for the consumer. A short stretch of
+    silence is appended so a segment still open at the end of the file is
+    closed.
+    """
+
+    poll_interval = 0.005
+
+    def __init__(self, path: str, capture: CaptureStage, stop_event, speed: float = 1.0,
+                 start_time: Optional[float] = None, tail_silence_s: float = 2.0):
+        self.path = path
+        self.capture = capture
+        self.stop_event = stop_event
+        self.speed = speed
+        self.start_time = start_time
+        self.tail_silence_s = tail_silence_s
+        self.logger = logging.getLogger(capture.name)
+
+    def _wait_for_space(self, frames: int):
+        ring = self.capture.ring
+        while ring.capacity - ring.available() < frames and not self.stop_event.is_set():
+            self.stop_event.wait(self.poll_interval)
+
+    def run(self) -> float:
+        """
+        Play the file to the end (or until stop_event); returns the seconds of audio played.
+        """
+        rate, data = wavfile.read(self.path, mmap=True)
+        block_size = self.capture.block_size
+        silence = np.zeros((int(self.tail_silence_s * rate),) + data.shape[1:], dtype=data.dtype)
+        start_time = time.time() if self.start_time is None else self.start_time
+        self.logger.info(f"Replaying {self.path} ({len(data) / rate:.1f}s at {rate} Hz, "
+                         f"{'unthrottled' if not self.speed else f'{self.speed:g}x'})")
+
+        self.capture.clock_offset = 0.0  # The synthetic stream clock is already wall-clock time
+        started = time.perf_counter()
+        position = 0
+        for samples in (data, silence):
+            for offset in range(0, len(samples), block_size):
+                if self.stop_event.is_set():
+                    return position / rate
+                block = to_capture_format(samples[offset:offset + block_size], self.capture.ring.channels,
+                                          self.capture.ring.data.dtype)
+                self._wait_for_space(len(block))
+
+                stream_time = position / rate
+                if self.speed:
+                    # Deliver each block once it would have finished recording.
+                    delay = (stream_time + len(block) / rate) / self.speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        self.stop_event.wait(delay)
+                time_info = SimpleNamespace(inputBufferAdcTime=start_time + stream_time,
+                                            currentTime=start_time + stream_time + len(block) / rate)
+                self.capture.callback(block, len(block), time_info, None)
+                position += len(block)
+
+        elapsed = time.perf_counter() - started
+        self.logger.info(f"Replay finished: {position / rate:.1f}s of audio in {elapsed:.1f}s "
+                         f"({position / rate / max(elapsed, 1e-9):.1f}x real time)")
+        return position / rate
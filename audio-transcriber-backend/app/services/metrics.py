@@ -0,0 +1,291 @@
+# metrics.py
+
+import os
+import json
+import time
+import logging
+import cProfile
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+logger = logging.getLogger("metrics")
+
+# Seconds, 50 us .. ~52 s in powers of two: covers a callback as well as a Whisper batch.
+LATENCY_BUCKETS = tuple(0.00005 * 2 ** i for i in range(21))
+# Real-time factor (processing time / audio time); below 1 keeps up with live audio.
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0, 10.0)
+
+
+def _label_text(labels: tuple, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (Prometheus style). `observe` is a bisect and
+    three additions, cheap enough for the audio callback.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate the q-th percentile (0-100) by interpolating inside its bucket.
+        """
+        with self.lock:
+            counts, total, top = list(self.counts), self.count, self.max
+        if not total:
+            return 0.0
+        rank = q / 100 * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else top
+                return min(top, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+        return top
+
+    def summary(self) -> dict:
+        with self.lock:
+            count, total, top = self.count, self.sum, self.max
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": top,
+        }
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Metrics:
+    """
+    Process-wide metrics: histograms and counters keyed by name and labels
+    (e.g. source="mic"), exportable as Prometheus text or a JSON snapshot.
+
+    Counters that already live elsewhere (e.g. a capture ring's dropped
+    frames) are registered as functions and read at export time, so the hot
+    path is not touched twice.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.help: dict[str, str] = {}
+        self.histograms: dict[tuple, Histogram] = {}
+        self.counters: dict[tuple, Callable[[], float]] = {}
+
+    def histogram(self, name: str, help: str = "", buckets: tuple = LATENCY_BUCKETS, **labels) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(buckets)
+                self.help.setdefault(name, help)
+            return self.histograms[key]
+
+    def counter(self, name: str, read: Callable[[], float], help: str = "", **labels):
+        """
+        Register a monotonically increasing value read by calling `read`.
+        """
+        with self.lock:
+            self.counters[(name, tuple(sorted(labels.items())))] = read
+            self.help.setdefault(name, help)
+
+    def _items(self):
+        with self.lock:
+            return sorted(self.histograms.items()), sorted(self.counters.items(), key=lambda item: item[0])
+
+    def prometheus(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        histograms, counters = self._items()
+        lines = []
+        described = set()
+
+        def describe(name: str, kind: str):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {self.help.get(name) or name}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), histogram in histograms:
+            describe(name, "histogram")
+            with histogram.lock:
+                counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _label_text(labels, f'le="{le}"')
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(labels)} {total}")
+            lines.append(f"{name}_count{_label_text(labels)} {count}")
+        for (name, labels), read in counters:
+            describe(name, "counter")
+            lines.append(f"{name}{_label_text(labels)} {read()}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        histograms, counters = self._items()
+        snapshot = {"time": datetime.utcnow().isoformat() + "Z", "histograms": {}, "counters": {}}
+        for (name, labels), histogram in histograms:
+            snapshot["histograms"][name + _label_text(labels)] = histogram.summary()
+        for (name, labels), read in counters:
+            snapshot["counters"][name + _label_text(labels)] = read()
+        return snapshot
+
+    def report(self) -> str:
+        histograms, counters = self._items()
+        lines = ["Metrics (mean / p50 / p95 / max):"]
+        for (name, labels), histogram in histograms:
+            s = histogram.summary()
+            if s["count"]:
+                lines.append(f"  {name + _label_text(labels):55s} n={s['count']:<7d} {s['mean']:.4f} / "
+                             f"{s['p50']:.4f} / {s['p95']:.4f} / {s['max']:.4f}")
+        for (name, labels), read in counters:
+            lines.append(f"  {name + _label_text(labels):55s} {read()}")
+        return "\n".join(lines)
+
+
+metrics = Metrics()
+
+
+class MetricsExporter:
+    """
+    Appends a JSON snapshot to `snapshot_path` every `interval` seconds and,
+    if `port` is set, serves Prometheus text on http://<host>:<port>/metrics.
+    """
+
+    def __init__(self, registry: Metrics = metrics, snapshot_path: Optional[str] = None, interval: float = 30.0,
+                 port: Optional[int] = None, host: str = "127.0.0.1"):
+        self.registry = registry
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def start(self):
+        if self.snapshot_path:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            self.thread = threading.Thread(target=self._run, name="metrics-snapshots", daemon=True)
+            self.thread.start()
+        if self.port is not None:
+            registry = self.registry
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.rstrip("/") != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = registry.prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+            threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+            logger.info(f"Serving Prometheus metrics on http://{self.host}:{self.server.server_port}/metrics")
+
+    def write_snapshot(self):
+        with open(self.snapshot_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.registry.snapshot()) + "\n")
+
+    def _run(self):
+        while not self.stopping.wait(self.interval):
+            self.write_snapshot()
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.write_snapshot()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+_profile_dir: Optional[str] = None
+
+
+def enable_profiling(output_dir: str):
+    """
+    Run every thread started through `profiled` under cProfile, writing
+    <output_dir>/<thread name>.prof when the thread exits.
+    """
+    global _profile_dir
+    _profile_dir = output_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+
+def profiled(target: Callable, name: str) -> Callable:
+    """
+    Wrap a thread target. With profiling enabled it runs under cProfile;
+    either way it runs in a function named after its stage, so py-spy and
+    other sampling profilers show e.g. `stage_mic_capture` in the stack.
+    """
+    def run(*args, **kwargs):
+        if _profile_dir is None:
+            return target(*args, **kwargs)
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(target, *args, **kwargs)
+        finally:
+            path = os.path.join(_profile_dir, f"{name}.prof")
+            profile.dump_stats(path)
+            logger.info(f"Profile written to {path}")
+
+    # Sampling profilers read the name from the code object, not __name__.
+    stage_name = "stage_" + "".join(c if c.isalnum() else "_" for c in name)
+    names = {"co_name": stage_name}
+    if hasattr(run.__code__, "co_qualname"):
+        names["co_qualname"] = stage_name
+    run.__code__ = run.__code__.replace(**names)
+    run.__name__ = run.__qualname__ = stage_name
+    return run
@@ -1,24 +1,30 @@
-import os
+import time
 import numpy as np
-import sounddevice as sd
-import logging
-from scipy.io.wavfile import write
 from collections import deque
 from typing import Deque, Optional
-from app.services.vad_handler import is_speech
+from app.services.vad_handler import create_vad
+from app.services.capture_stream import CaptureStream
+from app.services.metrics import metrics
+from app.services.resampler import StreamingResampler
+from app.services.segment_queue import AudioSegment, to_float32
 
 
-class MicAudioBuffer:
-    def __init__(self, config: dict, stop_event):
-        self.sample_rate = config["sample_rate"]
-        self.frame_duration_ms = config["frame_duration_ms"]
-        self.frame_size = int(self.sample_rate * self.frame_duration_ms / 1000)
-        self.audio_dir = config["path_audio"]
-        self.device_index = config["device_index"]
-        self.name = config["name"]
-        self.stop_event = stop_event
+class MicAudioBuffer(CaptureStream):
+    """
+    Frame-level VAD segmentation: a segment opens on the first speech frame
+    (with a little pre-roll) and closes after a few silent frames.
+    """
 
-        os.makedirs(self.audio_dir, exist_ok=True)
+    dtype = np.int16
+
+    def __init__(self, config: dict, stop_event, segment_queue=None, partials=None, processing_pool=None):
+        super().__init__(config, stop_event, segment_queue, partials, processing_pool)
+
+        self.vad = create_vad(config.get("vad_mode", "streaming"), config.get("vad_prefilter", True), self.name)
+        # Frames are resampled once to vad_sample_rate (a no-op at 16 kHz) and reused for VAD and saving.
+        self.resampler = StreamingResampler(self.sample_rate, self.vad_sample_rate)
+        self.vad_time = metrics.histogram("vad_seconds", "VAD time per frame", source=self.name)
+        self.resample_time = metrics.histogram("resample_seconds", "Resampling time per frame", source=self.name)
 
         # VAD parameters
         self.silence_frames_to_stop = 2
@@ -29,23 +35,37 @@ class MicAudioBuffer:
         self.recording = False
         self.speech_buffer: list[np.ndarray] = []
         self.recent_frames: Deque[np.ndarray] = deque(maxlen=self.pre_speech_frames)
+        self.recent_times: Deque[float] = deque(maxlen=self.pre_speech_frames)  # capture time of each recent frame
+        self.segment_start: Optional[float] = None
         self.silence_counter = 0
         self.vad_window: Deque[int] = deque(maxlen=self.vad_window_size)
 
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(self.name)
+    def save_recording(self, data: np.ndarray, capture_start: Optional[float] = None):
+        segment = AudioSegment(
+            source=self.name,
+            name=self.store.next_name(self.name),
+            audio=to_float32(data),
+            sample_rate=self.vad_sample_rate,
+            capture_start=capture_start
+        )
+        self.hand_off(segment)
 
-    def save_recording(self, data: np.ndarray):
-        index = len([f for f in os.listdir(self.audio_dir) if f.endswith(".wav")])
-        filename = os.path.join(self.audio_dir, f"{self.name}_chunk_{index:04d}.wav")
-        write(filename, self.sample_rate, data.astype(np.int16))
-        self.logger.info(f"Saved: {filename}")
+    def feed_partials(self, frame: np.ndarray):
+        if self.partials is not None:
+            self.partials.feed(self.name, to_float32(frame))
 
-    def audio_callback(self, indata, frames, time_info, status):
-        frame = indata[:, 0].copy().astype(np.int16)
+    def process_frame(self, block: np.ndarray, capture_time: float):
+        frame = block[:, 0]
+        if not self.resampler.passthrough:
+            started = time.perf_counter()
+            frame = np.clip(np.rint(self.resampler.process(frame)), -32768, 32767).astype(np.int16)
+            self.resample_time.observe(time.perf_counter() - started)
         self.recent_frames.append(frame)
+        self.recent_times.append(capture_time)
 
-        vad_result = is_speech(frame)
+        started = time.perf_counter()
+        vad_result = self.vad(frame)
+        self.vad_time.observe(time.perf_counter() - started)
         self.vad_window.append(1 if vad_result else 0)
         is_talking = sum(self.vad_window) >= (self.vad_window_size // 2 + 1)
 
@@ -53,41 +73,33 @@ class MicAudioBuffer:
             if not self.recording:
                 self.recording = True
                 self.speech_buffer = list(self.recent_frames)[:-1]
+                self.segment_start = self.recent_times[0]  # first pre-speech frame, or this one
                 self.logger.info("Speech detected")
                 self.vad_window.clear()
                 self.silence_counter = 0
+                for pre_speech in self.speech_buffer:
+                    self.feed_partials(pre_speech)
 
             self.speech_buffer.append(frame)
+            self.feed_partials(frame)
             self.silence_counter = 0
 
         elif self.recording:
             self.speech_buffer.append(frame)
+            self.feed_partials(frame)
             self.silence_counter += 1
 
             if self.silence_counter >= self.silence_frames_to_stop:
                 for _ in range(self.tail_padding_frames):
-                    self.speech_buffer.append(np.zeros(self.frame_size, dtype=np.int16))
+                    self.speech_buffer.append(np.zeros(len(frame), dtype=np.int16))
                 full_chunk = np.concatenate(self.speech_buffer)
-                self.save_recording(full_chunk)
+                self.save_recording(full_chunk, self.segment_start)
+                if self.partials is not None:
+                    self.partials.end(self.name)
 
                 self.recording = False
                 self.speech_buffer.clear()
                 self.silence_counter = 0
                 self.vad_window.clear()
                 self.recent_frames.clear()
-
-    def run(self):
-        self.logger.info(f"Starting mic VAD stream on device {self.device_index}...")
-        try:
-            with sd.InputStream(
-                samplerate=self.sample_rate,
-                channels=1,
-                dtype='int16',
-                callback=self.audio_callback,
-                blocksize=self.frame_size,
-                device=self.device_index
-            ):
-                while not self.stop_event.is_set():
-                    sd.sleep(100)
-        except KeyboardInterrupt:
-            self.logger.info("Stream interrupted by user. Exiting.")
+                self.recent_times.clear()
@@ -0,0 +1,114 @@
+# model_registry.py
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("models")
+
+
+class _Entry:
+    def __init__(self, loader: Callable[[], Any], warmup: Optional[Callable[[Any], None]]):
+        self.loader = loader
+        self.warmup = warmup
+        self.started = False
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[Exception] = None
+
+
+class ModelRegistry:
+    """
+    Loads each registered model at most once, on first use or in the
+    background via `preload`, and keeps a per-phase startup timeline.
+
+    Callers that ask for a model while another thread is loading it wait for
+    that load instead of starting a second one.
+    """
+
+    def __init__(self):
+        self.entries: dict[str, _Entry] = {}
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.timeline: list[tuple[str, float, float]] = []  # (phase, start offset, duration)
+
+    def register(self, name: str, loader: Callable[[], Any], warmup: Optional[Callable[[Any], None]] = None):
+        with self.lock:
+            if name not in self.entries:
+                self.entries[name] = _Entry(loader, warmup)
+
+    def get(self, name: str) -> Any:
+        with self.lock:
+            entry = self.entries[name]
+            load_here = not entry.started
+            entry.started = True
+
+        if load_here:
+            self._load(name, entry)
+        else:
+            entry.done.wait()
+
+        if entry.error is not None:
+            raise RuntimeError(f"Model '{name}' failed to load: {entry.error}") from entry.error
+        return entry.value
+
+    def preload(self, *names: str) -> list[threading.Thread]:
+        """
+        Start loading the given models (all registered ones by default) on
+        background threads.
+        """
+        threads = []
+        for name in names or list(self.entries):
+            thread = threading.Thread(target=self._preload_one, args=(name,), name=f"load-{name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _preload_one(self, name: str):
+        try:
+            self.get(name)
+        except RuntimeError as e:
+            logger.error(str(e))
+
+    def _load(self, name: str, entry: _Entry):
+        try:
+            with self.phase(f"{name}: load"):
+                entry.value = entry.loader()
+            if entry.warmup is not None:
+                with self.phase(f"{name}: warm-up"):
+                    entry.warmup(entry.value)
+        except Exception as e:
+            entry.error = e
+        finally:
+            entry.done.set()
+
+    @contextmanager
+    def phase(self, label: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(label, start, time.perf_counter() - start)
+
+    def record(self, label: str, start: float, duration: float):
+        with self.lock:
+            self.timeline.append((label, start - self.origin, duration))
+
+    def mark(self, label: str):
+        """
+        Record an instant (e.g. "streams started") on the startup timeline.
+        """
+        self.record(label, time.perf_counter(), 0.0)
+
+    def report(self) -> str:
+        with self.lock:
+            timeline = sorted(self.timeline, key=lambda item: item[1])
+        lines = ["Startup report (offset from startup / duration):"]
+        for label, offset, duration in timeline:
+            lines.append(f"  {offset:8.2f}s  {duration:7.2f}s  {label}")
+        return "\n".join(lines)
+
+
+registry = ModelRegistry()
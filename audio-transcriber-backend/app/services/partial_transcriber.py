@@ -0,0 +1,192 @@
+# partial_transcriber.py
+
+import time
+import logging
+import threading
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from faster_whisper import WhisperModel
+from app.services.model_registry import registry
+from app.services.whisper_pool import register_whisper
+
+logger = logging.getLogger("partials")
+
+
+@dataclass
+class TranscriptEvent:
+    """
+    A partial or final hypothesis for the utterance currently being spoken.
+
+    `committed` words are stable (agreed on by consecutive decodes) and will
+    not change; `tentative` is the rest of the latest hypothesis.
+    """
+    kind: str  # "partial" or "final"
+    source: str
+    utterance: int
+    committed: str
+    tentative: str = ""
+    audio_seconds: float = 0.0
+
+
+def common_prefix(a: list[str], b: list[str]) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+class LocalAgreement:
+    """
+    LocalAgreement-2 commit policy: a word is committed once two consecutive
+    hypotheses agree on it and on every word before it.
+
+    Committed words are only ever extended: a hypothesis that does not start
+    with them cannot commit anything, and its words past the point where it
+    diverges from them are returned as tentative.
+    """
+
+    def __init__(self):
+        self.committed: list[str] = []
+        self.previous: list[str] = []
+
+    def update(self, words: list[str]) -> list[str]:
+        """
+        Feed the latest hypothesis; returns its tentative (uncommitted) words.
+        """
+        n = len(self.committed)
+        if words[:n] == self.committed and self.previous[:n] == self.committed:
+            agreed = n + common_prefix(self.previous[n:], words[n:])
+            self.committed = words[:agreed]
+        self.previous = words
+        return words[common_prefix(self.committed, words):]
+
+
+@dataclass
+class _Session:
+    source: str
+    utterance: int
+    started_at: float = field(default_factory=time.monotonic)
+    chunks: list = field(default_factory=list)
+    samples: int = 0
+    decoded_samples: int = 0
+    first_word_at: Optional[float] = None
+    agreement: LocalAgreement = field(default_factory=LocalAgreement)
+
+
+class PartialTranscriber:
+    """
+    Low-latency hypotheses while an utterance is still in progress.
+
+    Capture buffers `feed` 16 kHz speech as it is segmented and call `end`
+    when the segment closes. Every `interval` seconds the growing window of
+    each active utterance is re-decoded, stable prefixes are committed with
+    LocalAgreement, and partial/final events are passed to `on_event`.
+    Time-to-first-word (first speech frame -> first decoded word) is tracked
+    per source.
+    """
+
+    def __init__(self, model_name: str = "base.en", device: str = "cpu", compute_type: str = "int8",
+                 interval_ms: int = 300, max_window_s: float = 25.0,
+                 on_event: Optional[Callable[[TranscriptEvent], None]] = None):
+        self.model_name = model_name
+        self.device = device
+        self.compute_type = compute_type
+        self.interval = interval_ms / 1000
+        self.max_window_samples = int(max_window_s * 16000)
+        self.on_event = on_event or self.print_event
+
+        self.sessions: dict[str, _Session] = {}
+        self.finished: list[_Session] = []
+        self.utterances = 0
+        self.first_word_latencies: dict[str, list[float]] = {}
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="partials", daemon=True)
+        register_whisper(model_name)
+
+    @staticmethod
+    def print_event(event: TranscriptEvent):
+        text = f"{event.committed} [{event.tentative}]" if event.tentative else event.committed
+        print(f"[partials] ({event.source}) {event.kind} #{event.utterance}: {text}")
+
+    def feed(self, source: str, audio: np.ndarray):
+        with self.lock:
+            session = self.sessions.get(source)
+            if session is None:
+                self.utterances += 1
+                session = self.sessions[source] = _Session(source, self.utterances)
+            session.chunks.append(audio.astype(np.float32, copy=False))
+            session.samples += len(audio)
+
+    def end(self, source: str):
+        with self.lock:
+            session = self.sessions.pop(source, None)
+            if session is not None:
+                self.finished.append(session)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+
+    def time_to_first_word_summary(self) -> str:
+        lines = []
+        for source, values in self.first_word_latencies.items():
+            values = np.array(values)
+            lines.append(f"{source}: time to first word mean {values.mean():.2f}s, "
+                         f"p50 {np.percentile(values, 50):.2f}s, p95 {np.percentile(values, 95):.2f}s "
+                         f"({len(values)} utterances)")
+        return "\n".join(lines) or "no utterances"
+
+    def _decode(self, model: WhisperModel, audio: np.ndarray) -> list[str]:
+        segments, _ = model.transcribe(
+            audio,
+            beam_size=1,
+            condition_on_previous_text=False,
+            without_timestamps=True,
+            vad_filter=False
+        )
+        return " ".join(seg.text.strip() for seg in segments).split()
+
+    def _run(self):
+        model = WhisperModel(registry.get(f"whisper:{self.model_name}"), device=self.device,
+                             compute_type=self.compute_type)
+        logger.info(f"Partial transcription ready ({self.model_name}, every {self.interval * 1000:.0f} ms)")
+
+        while not self.stopping.is_set():
+            tick = time.monotonic()
+            with self.lock:
+                work = [(session, True) for session in self.finished]
+                work += [(session, False) for session in self.sessions.values()
+                         if session.samples > session.decoded_samples]
+                self.finished = []
+
+            for session, ended in work:
+                with self.lock:
+                    audio = np.concatenate(session.chunks)
+                source = session.source
+
+                words = self._decode(model, audio[-self.max_window_samples:])
+                session.decoded_samples = len(audio)
+                if words and session.first_word_at is None:
+                    session.first_word_at = time.monotonic()
+                    self.first_word_latencies.setdefault(source, []).append(session.first_word_at - session.started_at)
+
+                if ended:
+                    event = TranscriptEvent("final", source, session.utterance, " ".join(words),
+                                            audio_seconds=len(audio) / 16000)
+                else:
+                    tentative = session.agreement.update(words)
+                    event = TranscriptEvent("partial", source, session.utterance,
+                                            " ".join(session.agreement.committed), " ".join(tentative),
+                                            audio_seconds=len(audio) / 16000)
+                self.on_event(event)
+
+            self.stopping.wait(max(0.0, self.interval - (time.monotonic() - tick)))
+
+        logger.info(f"Partial transcription stopped:\n{self.time_to_first_word_summary()}")
@@ -1,79 +1,96 @@
-import os
 import time
 import numpy as np
-import sounddevice as sd
 import logging
 import torch
-from scipy.io.wavfile import write
-from scipy.signal import resample
-from collections import deque
-from typing import Deque, Optional
-from app.services.vad_handler import is_speech
+from typing import Optional
+from app.services.vad_handler import create_vad, get_vad, copy_vad_model
+from app.services.capture_ring import HistoryRing
+from app.services.capture_stream import CaptureStream
+from app.services.resampler import StreamingResampler
+from app.services.metrics import metrics
+from app.services.segment_queue import AudioSegment
 
 
-class RemoteAudioBuffer:
-    def __init__(self, config: dict, stop_event):
-        self.sample_rate = config["sample_rate"]
-        self.frame_duration_ms = config["frame_duration_ms"]
-        self.frame_size = int(self.sample_rate * self.frame_duration_ms / 1000)
-        self.audio_dir = config["path_audio"]
-        self.device_index = config["device_index"]
-        self.name = config["name"]
-        self.stop_event = stop_event
+class RemoteAudioBuffer(CaptureStream):
+    """
+    Buffered segmentation for system audio: frame-level VAD tracks speech,
+    and on silence (or after max_segment_duration) the recent history is
+    re-cut with Silero speech timestamps.
+    """
 
-        os.makedirs(self.audio_dir, exist_ok=True)
+    dtype = np.float32
+    device_blocksize = 0
+
+    def __init__(self, config: dict, stop_event, segment_queue=None, partials=None, processing_pool=None):
+        super().__init__(config, stop_event, segment_queue, partials, processing_pool)
+
+        self.vad = create_vad(config.get("vad_mode", "streaming"), config.get("vad_prefilter", True), self.name)
 
         self.buffer_duration = 12.0
         self.overlap_duration = 0.25
-        self.vad_sample_rate = 16000
         self.min_save_duration = 0.3
         self.min_silence_duration = 0.8
         self.max_segment_duration = 8.0
         self.pre_speech_padding = 0.5
         self.post_speech_padding = 0.5
 
-        self.buffer_samples = int(self.buffer_duration * self.sample_rate)
-        self.hybrid_buffer: Deque[float] = deque(maxlen=self.buffer_samples)
+        # The history holds audio already resampled to vad_sample_rate, shared by VAD and flushes.
+        self.resampler = StreamingResampler(self.sample_rate, self.vad_sample_rate)
+        self.buffer_samples = int(self.buffer_duration * self.vad_sample_rate)
+        self.hybrid_buffer = HistoryRing(self.buffer_samples, dtype=np.float32)
+        self.vad_time = metrics.histogram("vad_seconds", "VAD time per frame", source=self.name)
+        self.resample_time = metrics.histogram("resample_seconds", "Resampling time per frame", source=self.name)
+        self.flush_time = metrics.histogram("segment_flush_seconds", "Segment-level VAD and hand-off per flush",
+                                            source=self.name)
         self.last_overlap = np.array([], dtype=np.float32)
         self.last_overlap_len = 0
 
         self.speech_active = False
         self.speech_start_time: Optional[float] = None
         self.last_voice_time: Optional[float] = None
+        self.stream_time = 0.0  # seconds of audio processed, used as the segmentation clock
+        self.history_end_time: Optional[float] = None  # capture time just past the newest sample in hybrid_buffer
 
-        logging.basicConfig(level=logging.INFO)
         logging.getLogger().setLevel(logging.INFO)  # Change to DEBUG for more verbosity
-        self.logger = logging.getLogger(self.name)
-
-        # Load VAD
-        self.model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False)
-        (
-            self.get_speech_timestamps,
-            _, _, _, _
-        ) = utils
-
-    def save_audio_segment(self, segment_data: np.ndarray):
-        segment_int16 = (segment_data * 32767).astype(np.int16)
-        index = len([f for f in os.listdir(self.audio_dir) if f.endswith(".wav")])
-        filename = os.path.join(self.audio_dir, f"remote_chunk_{index:04d}.wav")
-        write(filename, self.vad_sample_rate, segment_int16)
-        self.logger.info(f"Saved: {filename}")
+
+        # Segment-level VAD for flushes, on a private copy of the shared Silero model
+        self.model = copy_vad_model()
+        self.get_speech_timestamps = get_vad().get_speech_timestamps
+
+    def save_audio_segment(self, segment_data: np.ndarray, capture_start: Optional[float] = None):
+        segment = AudioSegment(
+            source=self.name,
+            name=self.store.next_name(self.name),
+            audio=segment_data.astype(np.float32),
+            sample_rate=self.vad_sample_rate,
+            capture_start=capture_start
+        )
+        self.hand_off(segment)
 
     def flush_audio_segment(self):
-        samples = np.array(self.hybrid_buffer)
-        pad_samples = int(self.pre_speech_padding * self.sample_rate)
-        start = max(0, len(samples) - pad_samples - int(self.buffer_duration * self.sample_rate))
+        with self.flush_time.time():
+            self._flush_audio_segment()
+
+    def _flush_audio_segment(self):
+        samples = self.hybrid_buffer.latest()
+        pad_samples = int(self.pre_speech_padding * self.vad_sample_rate)
+        start = max(0, len(samples) - pad_samples - self.buffer_samples)
         padded_samples = samples[start:]
 
-        padded_samples = np.concatenate((self.last_overlap, padded_samples))
-        samples_resampled = resample(padded_samples, int(len(padded_samples) * self.vad_sample_rate / self.sample_rate))
+        samples_resampled = np.concatenate((self.last_overlap, padded_samples))
         audio_tensor = torch.from_numpy(samples_resampled).float()
 
         speech_segments = self.get_speech_timestamps(audio_tensor, self.model, sampling_rate=self.vad_sample_rate)
 
+        def capture_time(index: int) -> Optional[float]:
+            # samples_resampled ends at the newest captured sample
+            if self.history_end_time is None:
+                return None
+            return self.history_end_time - (len(samples_resampled) - index) / self.vad_sample_rate
+
         if not speech_segments:
             self.logger.info("Silero found no speech; saving full segment as fallback.")
-            self.save_audio_segment(samples_resampled)
+            self.save_audio_segment(samples_resampled, capture_time(0))
         else:
             for seg in speech_segments:
                 start = max(0, seg['start'] - self.last_overlap_len)
@@ -84,30 +101,49 @@ class RemoteAudioBuffer:
                 chunk = samples_resampled[start:end]
                 if len(chunk) < self.min_save_duration * self.vad_sample_rate:
                     continue
-                self.save_audio_segment(chunk)
+                self.save_audio_segment(chunk, capture_time(start))
 
         overlap_samples = int(self.overlap_duration * self.vad_sample_rate)
         self.last_overlap = samples_resampled[-overlap_samples:] if len(samples_resampled) > overlap_samples else samples_resampled
         self.last_overlap_len = len(self.last_overlap)
 
+        if self.partials is not None:
+            self.partials.end(self.name)
+
+    def capture_channels(self, available: int) -> int:
+        return available  # Mixed down per block in process_frame
+
     def audio_callback(self, indata, frames, time_info, status):
         if self.stop_event.is_set():
+            import sounddevice as sd
             raise sd.CallbackStop()
 
-        frame = indata.mean(axis=1)
-        self.hybrid_buffer.extend(frame)
+        self.capture.callback(indata, frames, time_info, status)
 
-        rms = np.sqrt(np.mean(frame ** 2))
-        resampled = resample(frame, int(len(frame) * self.vad_sample_rate / self.sample_rate)).astype(np.int16)
-        vad_result = is_speech(resampled)
+    def process_frame(self, block: np.ndarray, capture_time: float):
+        frame = block.mean(axis=1)
+        started = time.perf_counter()
+        resampled = self.resampler.process(frame)
+        self.resample_time.observe(time.perf_counter() - started)
+        self.hybrid_buffer.extend(resampled)
+        self.history_end_time = capture_time + len(frame) / self.sample_rate
 
-        if not vad_result and rms > 0.025:
+        rms = np.sqrt(np.mean(frame ** 2))
+        started = time.perf_counter()
+        vad_result = self.vad(np.clip(resampled * 32767, -32768, 32767).astype(np.int16))
+        self.vad_time.observe(time.perf_counter() - started)
+
+        # Loud audio counts as speech even if Silero disagrees; with the energy
+        # gate the threshold follows the noise floor instead of a fixed 0.025.
+        gate = getattr(self.vad, "gate", None)
+        if not vad_result and rms > (gate.override_rms() if gate is not None else 0.025):
             # self.logger.debug("RMS override activated")
             vad_result = True
 
         # self.logger.debug(f"VAD: {vad_result} | RMS: {rms:.5f}")
 
-        now = time.time()
+        self.stream_time += len(frame) / self.sample_rate
+        now = self.stream_time
 
         if vad_result:
             if not self.speech_active:
@@ -128,23 +164,5 @@ class RemoteAudioBuffer:
             self.speech_start_time = None
             self.last_voice_time = None
 
-    def run(self):
-        device_info = sd.query_devices(self.device_index)
-        input_channels = device_info["max_input_channels"]
-        if input_channels < 1:
-            raise ValueError(f"Device '{device_info['name']}' has no input channels.")
-
-        self.logger.info(f"Starting remote buffered VAD stream on device {self.device_index} ({device_info['name']})...")
-        try:
-            with sd.InputStream(
-                samplerate=self.sample_rate,
-                channels=input_channels,
-                dtype='float32',
-                callback=self.audio_callback,
-                blocksize=0,
-                device=self.device_index
-            ):
-                while not self.stop_event.is_set():
-                    sd.sleep(100)
-        except KeyboardInterrupt:
-            self.logger.info("Stream interrupted by user. Exiting.")
+        if self.speech_active and self.partials is not None:
+            self.partials.feed(self.name, resampled)
@@ -0,0 +1,80 @@
+# resampler.py
+
+import numpy as np
+from math import gcd
+from scipy.signal import firwin
+
+
+class StreamingResampler:
+    """
+    Stateful polyphase resampler for block-by-block audio.
+
+    Uses the same Kaiser-windowed FIR as scipy.signal.resample_poly, but keeps
+    the filter history and output phase between calls, so consecutive blocks
+    join without edge artifacts and the output does not depend on how the
+    input was split. The filter's group delay is dropped from the start of
+    the stream, keeping output sample n aligned with input time n / out_rate.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        divisor = gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.passthrough = self.up == self.down
+
+        if self.passthrough:
+            return
+
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * self.up
+
+        # phases[p, j] = taps[p + j * up]: the coefficients applied to the j-th
+        # most recent input sample for an output with phase p.
+        taps_per_phase = -(-len(taps) // self.up)
+        padded = np.zeros(taps_per_phase * self.up)
+        padded[:len(taps)] = taps
+        self.phases = padded.reshape(taps_per_phase, self.up).T.copy()
+        self.taps_per_phase = taps_per_phase
+
+        self.history = np.zeros(taps_per_phase - 1, dtype=np.float64)
+        self.inputs_seen = 0
+        self.next_output = 0
+        self.delay = half_len // self.down
+
+    def reset(self):
+        if self.passthrough:
+            return
+        self.history[:] = 0
+        self.inputs_seen = 0
+        self.next_output = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Resample one block of mono samples; returns float32 at out_rate.
+        """
+        if self.passthrough:
+            return block.astype(np.float32, copy=False)
+
+        buffer = np.concatenate((self.history, block))
+        base = self.inputs_seen - len(self.history)  # absolute index of buffer[0]
+        self.inputs_seen += len(block)
+
+        # Output n reads input index (n * down) // up; it is ready once that index has arrived.
+        end = (self.inputs_seen * self.up + self.down - 1) // self.down
+        outputs = np.arange(self.next_output, end)
+        self.next_output = end
+        self.history = buffer[len(buffer) - len(self.history):]
+
+        if not len(outputs):
+            return np.zeros(0, dtype=np.float32)
+
+        position = outputs * self.down
+        newest = position // self.up - base
+        window = buffer[newest[:, None] - np.arange(self.taps_per_phase)]
+        resampled = np.einsum("ij,ij->i", window, self.phases[position % self.up])
+
+        skip = max(0, self.delay - int(outputs[0]))
+        return resampled[skip:].astype(np.float32)
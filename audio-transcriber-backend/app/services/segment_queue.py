@@ -0,0 +1,112 @@
+# segment_queue.py
+
+import os
+import logging
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Optional
+from app.services.segment_store import SegmentStore, read_audio
+from app.services.metrics import metrics
+
+
+@dataclass
+class AudioSegment:
+    """
+    A finished speech segment handed from a capture buffer to the transcriber.
+    """
+    source: str
+    name: str
+    audio: np.ndarray  # float32 mono in [-1, 1]
+    sample_rate: int
+    closed_at: float = field(default_factory=time.monotonic)  # when the buffer closed the segment
+    capture_start: Optional[float] = None  # wall-clock capture time of the first sample (epoch seconds)
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    @property
+    def capture_end(self) -> Optional[float]:
+        return None if self.capture_start is None else self.capture_start + self.duration
+
+
+def to_float32(samples: np.ndarray) -> np.ndarray:
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32768.0
+    return samples.astype(np.float32, copy=False)
+
+
+_encoder_pool: Optional[ThreadPoolExecutor] = None
+_encoder_pool_lock = threading.Lock()
+
+
+def encoder_pool(workers: int = 2) -> ThreadPoolExecutor:
+    """
+    The thread pool shared by every stream's segment writer, created on first use.
+    """
+    global _encoder_pool
+    with _encoder_pool_lock:
+        if _encoder_pool is None:
+            _encoder_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="segment-encoder")
+        return _encoder_pool
+
+
+def load_segment(path: str, source: str) -> AudioSegment:
+    """
+    Decode a stored segment (WAV, FLAC or Opus) back into an AudioSegment.
+    """
+    rate, audio = read_audio(path)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return AudioSegment(source=source, name=name, audio=audio, sample_rate=rate)
+
+
+class AsyncSegmentWriter:
+    """
+    Encodes and writes segments on the shared encoder pool so persistence
+    (and FLAC/Opus encoding) never blocks segmentation.
+    """
+
+    def __init__(self, store: SegmentStore, name: str):
+        self.store = store
+        self.pool: Optional[ThreadPoolExecutor] = None
+        self.pending: set[Future] = set()
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(name)
+        self.encode_time = metrics.histogram("segment_encode_seconds", "Encode and write time per stored segment",
+                                             source=name, format=store.audio_format)
+
+    def start(self):
+        self.pool = encoder_pool()
+
+    def submit(self, segment: AudioSegment):
+        future = self.pool.submit(self._write, segment)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self._done)
+
+    def _done(self, future: Future):
+        with self.lock:
+            self.pending.discard(future)
+
+    def stop(self):
+        """
+        Wait for this writer's outstanding segments.
+        """
+        with self.lock:
+            pending = list(self.pending)
+        wait(pending)
+
+    def _write(self, segment: AudioSegment):
+        started = time.perf_counter()
+        try:
+            data = (np.clip(segment.audio, -1.0, 1.0) * 32767).astype(np.int16)
+            filename = self.store.write(segment.name, segment.sample_rate, data)
+            self.logger.info(f"Saved: {filename}")
+        except Exception as e:
+            self.logger.error(f"Failed to save {segment.name}: {e}")
+        self.encode_time.observe(time.perf_counter() - started)
@@ -0,0 +1,189 @@
+# segment_store.py
+
+import os
+import re
+import time
+import logging
+import threading
+import numpy as np
+from collections import deque
+from typing import Optional
+from scipy.io import wavfile
+
+_CHUNK_NAME = re.compile(r"^(?P<prefix>.+)_chunk_(?P<index>\d+)\.(?:wav|flac|ogg)$")
+PARTIAL_SUFFIX = ".part"
+
+# format -> (file extension, soundfile format, soundfile subtype); only "wav" works without soundfile.
+FORMATS = {
+    "wav": (".wav", None, None),
+    "flac": (".flac", "FLAC", "PCM_16"),
+    "opus": (".ogg", "OGG", "OPUS"),
+}
+
+logger = logging.getLogger("segment_store")
+
+
+def _soundfile():
+    try:
+        import soundfile
+    except ImportError:
+        return None
+    return soundfile
+
+
+def read_audio(path: str) -> tuple[int, np.ndarray]:
+    """
+    (sample_rate, float32 samples in [-1, 1]) of a stored segment in any supported format.
+    """
+    if path.endswith(".wav"):
+        rate, data = wavfile.read(path)
+        if data.dtype == np.int16:
+            return rate, data.astype(np.float32) / 32768.0
+        return rate, data.astype(np.float32, copy=False)
+    soundfile = _soundfile()
+    if soundfile is None:
+        raise RuntimeError(f"Reading {path} needs the soundfile package (pip install soundfile)")
+    data, rate = soundfile.read(path, dtype="float32")
+    return rate, data
+
+
+class SegmentStore:
+    """
+    Names and writes segment files for one audio directory.
+
+    The directory is scanned once, when the store is created, to find the
+    highest existing index per prefix; after that names come from an
+    in-memory counter under a lock, so naming is O(1) and streams sharing a
+    directory never get the same name. Files are written under a temporary
+    name and renamed into place, so a reader never sees a partial file.
+
+    Segments are stored as WAV, or as FLAC/Opus when soundfile is installed.
+    With `max_bytes` and/or `max_age` (seconds) set, the oldest segments are
+    deleted after each write until the directory is back within both limits.
+    """
+
+    _stores: dict[str, "SegmentStore"] = {}
+    _stores_lock = threading.Lock()
+
+    @classmethod
+    def for_dir(cls, audio_dir: str, audio_format: str = "wav", max_bytes: Optional[int] = None,
+                max_age: Optional[float] = None) -> "SegmentStore":
+        """
+        The one store for a directory. Streams sharing a directory must ask
+        for the same format and retention; a mismatch raises ValueError
+        rather than silently applying the first stream's settings.
+        """
+        key = os.path.abspath(audio_dir)
+        settings = (audio_format, max_bytes, max_age)
+        with cls._stores_lock:
+            if key not in cls._stores:
+                cls._stores[key] = cls(audio_dir, audio_format, max_bytes, max_age)
+            store = cls._stores[key]
+            if store.settings != settings:
+                raise ValueError(f"{audio_dir} is already used with audio_format/retention {store.settings}, "
+                                 f"not {settings}; give streams with different settings their own path_audio")
+            return store
+
+    @classmethod
+    def for_stream(cls, config: dict) -> "SegmentStore":
+        """
+        The store for a stream config's path_audio, with its format and retention settings.
+        """
+        max_mb = config.get("retention_max_mb")
+        max_age_h = config.get("retention_max_age_h")
+        return cls.for_dir(
+            config["path_audio"],
+            config.get("audio_format", "wav"),
+            max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+            max_age=max_age_h * 3600 if max_age_h else None
+        )
+
+    def __init__(self, audio_dir: str, audio_format: str = "wav", max_bytes: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        self.settings = (audio_format, max_bytes, max_age)  # as requested, before any WAV fallback
+        if audio_format not in FORMATS:
+            raise ValueError(f"Unknown audio format: {audio_format}")
+        if audio_format != "wav" and _soundfile() is None:
+            logger.warning(f"soundfile is not installed; storing segments as WAV instead of {audio_format}.")
+            audio_format = "wav"
+
+        self.audio_dir = audio_dir
+        self.audio_format = audio_format
+        self.extension = FORMATS[audio_format][0]
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.next_index: dict[str, int] = {}
+        self.files: deque = deque()  # (mtime, size, path), oldest first
+        self.total_bytes = 0
+        self.evicted = 0
+
+        os.makedirs(self.audio_dir, exist_ok=True)
+        existing = []
+        for entry in os.scandir(self.audio_dir):
+            match = _CHUNK_NAME.match(entry.name)
+            if match:
+                prefix, index = match.group("prefix"), int(match.group("index"))
+                self.next_index[prefix] = max(self.next_index.get(prefix, 0), index + 1)
+                stat = entry.stat()
+                existing.append((stat.st_mtime, stat.st_size, entry.path))
+            elif entry.name.endswith(PARTIAL_SUFFIX):
+                os.remove(entry.path)  # Left over from an interrupted write
+        for item in sorted(existing):
+            self._track(*item)
+
+    def next_name(self, prefix: str) -> str:
+        with self.lock:
+            index = self.next_index.get(prefix, 0)
+            self.next_index[prefix] = index + 1
+        return f"{prefix}_chunk_{index:04d}"
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.audio_dir, f"{name}{self.extension}")
+
+    def write(self, name: str, sample_rate: int, data: np.ndarray) -> str:
+        """
+        Write int16 samples in the store's format, then apply the retention limits.
+        """
+        if self.audio_format == "wav":
+            return self.write_wav(name, sample_rate, data)
+
+        _, container, subtype = FORMATS[self.audio_format]
+        final_path = self.path(name)
+        partial_path = final_path + PARTIAL_SUFFIX
+        _soundfile().write(partial_path, data, sample_rate, format=container, subtype=subtype)
+        return self._commit(partial_path, final_path)
+
+    def write_wav(self, name: str, sample_rate: int, data: np.ndarray) -> str:
+        final_path = os.path.join(self.audio_dir, f"{name}.wav")
+        partial_path = final_path + PARTIAL_SUFFIX
+        with open(partial_path, "wb") as f:
+            wavfile.write(f, sample_rate, data)
+        return self._commit(partial_path, final_path)
+
+    def _commit(self, partial_path: str, final_path: str) -> str:
+        os.replace(partial_path, final_path)
+        with self.lock:
+            self._track(time.time(), os.path.getsize(final_path), final_path)
+            self._enforce_retention()
+        return final_path
+
+    def _track(self, mtime: float, size: int, path: str):
+        self.files.append((mtime, size, path))
+        self.total_bytes += size
+
+    def _enforce_retention(self):
+        cutoff = time.time() - self.max_age if self.max_age is not None else None
+        while len(self.files) > 1:
+            mtime, size, path = self.files[0]
+            over_size = self.max_bytes is not None and self.total_bytes > self.max_bytes
+            too_old = cutoff is not None and mtime < cutoff
+            if not (over_size or too_old):
+                break
+            self.files.popleft()
+            self.total_bytes -= size
+            self.evicted += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,250 @@
+# supervisor.py
+
+import os
+import json
+import time
+import logging
+import importlib
+from typing import Optional
+from app.services.capture_ring import ProcessingPool
+from app.services.capture_stream import CaptureStream
+from app.services.mic_audio_buffer import MicAudioBuffer
+from app.services.remote_audio_buffer import RemoteAudioBuffer
+from app.stream_config import MIC_CONFIG, REMOTE_CONFIG, SUPERVISOR_CONFIG
+
+logger = logging.getLogger("supervisor")
+
+# strategy name -> (capture class, default config a stream definition is laid over)
+STRATEGIES = {
+    "mic": (MicAudioBuffer, MIC_CONFIG),
+    "remote": (RemoteAudioBuffer, REMOTE_CONFIG),
+}
+
+
+def resolve_strategy(name: str) -> tuple[type, dict]:
+    """
+    A built-in strategy, or "package.module:ClassName" for a CaptureStream subclass
+    (which then starts from the mic defaults).
+    """
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown stream strategy: {name}")
+    cls = getattr(importlib.import_module(module_name), class_name)
+    if not issubclass(cls, CaptureStream):
+        raise ValueError(f"Stream strategy {name} is not a CaptureStream")
+    return cls, MIC_CONFIG
+
+
+def strategy_name(config: dict) -> str:
+    """
+    The definition's "strategy", else its name if that is a built-in strategy, else "mic".
+    """
+    return config.get("strategy") or (config["name"] if config["name"] in STRATEGIES else "mic")
+
+
+def stream_config(definition: dict) -> dict:
+    """
+    Full config for one stream definition: the strategy's defaults, then the
+    definition's own keys. Paths default to data/<name>/audio and data/<name>/transcripts.
+    """
+    name = definition["name"]
+    strategy = strategy_name(definition)
+    _, defaults = resolve_strategy(strategy)
+    config = {
+        **defaults,
+        "path_audio": f"data/{name}/audio",
+        "path_transcripts": f"data/{name}/transcripts",
+        "speaker": name,
+        **definition,
+        "strategy": strategy,
+    }
+    return config
+
+
+def load_stream_definitions(path: Optional[str]) -> list[dict]:
+    """
+    Stream configs from a JSON file ({"streams": [{"name": ..., "strategy": ..., ...}, ...]}),
+    or the built-in mic + remote pair when no file is given.
+    """
+    if path is None:
+        definitions = [
+            {**MIC_CONFIG, "strategy": "mic", "device": "select"},
+            {**REMOTE_CONFIG, "strategy": "remote", "device": "wasapi_loopback"},
+        ]
+    else:
+        with open(path, encoding="utf-8") as f:
+            definitions = json.load(f)["streams"]
+
+    configs = [stream_config(definition) for definition in definitions]
+    names = [config["name"] for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Stream names must be unique: {names}")
+    storage = {}
+    for config in configs:
+        # Streams sharing path_audio share one SegmentStore, so they must agree on how it stores segments
+        settings = tuple(config.get(key) for key in ("audio_format", "retention_max_mb", "retention_max_age_h"))
+        first = storage.setdefault(os.path.abspath(config["path_audio"]), (config["name"], settings))
+        if first[1] != settings:
+            raise ValueError(f"Streams '{first[0]}' and '{config['name']}' share path_audio {config['path_audio']} "
+                             f"but differ in audio_format or retention")
+    return configs
+
+
+def find_supported_sample_rate(device_index, rates=(48000, 44100, 32000, 16000)):
+    from sounddevice import check_input_settings
+
+    for rate in rates:
+        try:
+            check_input_settings(device=device_index, samplerate=rate)
+            logger.info(f"Sample rate {rate} is supported by device {device_index}")
+            return rate
+        except Exception as e:
+            logger.info(f"Sample rate {rate} not supported: {e}")
+    raise RuntimeError(f"No supported sample rate found for device {device_index}")
+
+
+def resolve_device(config: dict):
+    """
+    Turn a definition's "device" into device_index (and a supported sample
+    rate for loopback devices). "device" is an index, part of a device name,
+    "select" / "wasapi_loopback" to ask interactively, or absent for the
+    system default input. Replayed streams need no device.
+    """
+    device = config.get("device")
+    if config.get("input_file") or device is None:
+        return
+    if isinstance(device, int):
+        config["device_index"] = device
+        return
+
+    import sounddevice as sd
+    from app.audio_devices import select_input_device, select_wasapi_loopback_device
+
+    if device == "select":
+        print(f"[supervisor] Input device for stream '{config['name']}':")
+        config["device_index"] = select_input_device()
+    elif device == "wasapi_loopback":
+        print(f"[supervisor] Loopback device for stream '{config['name']}':")
+        index = select_wasapi_loopback_device()
+        if index is None:
+            raise RuntimeError(f"No WASAPI loopback device found for stream '{config['name']}'")
+        config["device_index"] = index
+        config["sample_rate"] = find_supported_sample_rate(index)
+    else:
+        matches = [i for i, dev in enumerate(sd.query_devices())
+                   if dev["max_input_channels"] > 0 and device.lower() in dev["name"].lower()]
+        if not matches:
+            raise RuntimeError(f"No input device matching '{device}' for stream '{config['name']}'")
+        config["device_index"] = matches[0]
+    logger.info(f"Stream '{config['name']}' uses device {config['device_index']}")
+
+
+class _Managed:
+    def __init__(self, config: dict):
+        self.config = config
+        self.stream: Optional[CaptureStream] = None
+        self.restarts = 0
+        self.next_start = 0.0
+        self.finished = False
+
+
+class StreamSupervisor:
+    """
+    Runs any number of capture streams from their configs.
+
+    Streams are opened without a thread of their own: PortAudio drives the
+    callbacks, and block processing (VAD, segmentation) runs on one shared
+    ProcessingPool of `vad_workers` threads. A monitor thread (the caller of
+    `run`) checks every stream; one whose device stopped or whose start
+    failed is rebuilt after an exponential backoff. Replayed files that
+    reached their end are not restarted, and `run` returns once every stream
+    has finished or stop_event is set.
+    """
+
+    def __init__(self, configs: list[dict], stop_event, segment_queue=None, partials=None,
+                 vad_workers: int = SUPERVISOR_CONFIG["vad_workers"],
+                 restart_backoff: tuple = tuple(SUPERVISOR_CONFIG["restart_backoff_s"]),
+                 check_interval: float = 0.5):
+        self.stop_event = stop_event
+        self.segment_queue = segment_queue
+        self.partials = partials
+        self.min_backoff, self.max_backoff = restart_backoff
+        self.check_interval = check_interval
+        self.pool = ProcessingPool(workers=vad_workers)
+        self.streams = [_Managed(config) for config in configs]
+
+    def _start(self, managed: _Managed):
+        stream = None
+        try:
+            # Building the stream can fail too (missing replay file, bad audio_format, ...)
+            cls, _ = resolve_strategy(managed.config["strategy"])
+            stream = cls(managed.config, self.stop_event, self.segment_queue, self.partials, processing_pool=self.pool)
+            stream.start()
+        except Exception as e:
+            if stream is not None:
+                stream.stop()
+            self._schedule_restart(managed, f"failed to start: {e}")
+            return
+        managed.stream = stream
+
+    def _schedule_restart(self, managed: _Managed, reason: str):
+        delay = min(self.max_backoff, self.min_backoff * 2 ** managed.restarts)
+        managed.restarts += 1
+        managed.next_start = time.monotonic() + delay
+        logger.warning(f"Stream '{managed.config['name']}' {reason}; restarting in {delay:.0f}s")
+
+    def _check(self, managed: _Managed):
+        stream = managed.stream
+        if stream is None:
+            if time.monotonic() >= managed.next_start:
+                self._start(managed)
+            return
+        if stream.is_alive():
+            return
+
+        stream.stop()
+        managed.stream = None
+        if stream.replay_done:
+            managed.finished = True
+            logger.info(f"Stream '{managed.config['name']}' finished")
+        else:
+            self._schedule_restart(managed, "stopped unexpectedly")
+
+    def start(self):
+        self.pool.start()
+        for managed in self.streams:
+            self._start(managed)
+
+    def run(self):
+        """
+        Monitor the streams until stop_event is set or all of them have finished.
+        """
+        try:
+            while not self.stop_event.is_set():
+                for managed in self.streams:
+                    if not managed.finished:
+                        self._check(managed)
+                if all(managed.finished for managed in self.streams):
+                    break
+                self.stop_event.wait(self.check_interval)
+        finally:
+            self.stop()
+
+    def stop(self):
+        for managed in self.streams:
+            if managed.stream is not None:
+                managed.stream.stop()
+                managed.stream = None
+        self.pool.stop()
+
+    def status(self) -> dict:
+        return {
+            managed.config["name"]: {
+                "running": managed.stream is not None and managed.stream.is_alive(),
+                "finished": managed.finished,
+                "restarts": managed.restarts,
+            }
+            for managed in self.streams
+        }
@@ -0,0 +1,135 @@
+# timeline.py
+
+import heapq
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+TIMELINE_NAME = "timeline.jsonl"
+
+
+def format_timestamp(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class TimelineMerger:
+    """
+    Merges transcripts from every source into one time-ordered, speaker-
+    attributed timeline as they arrive.
+
+    Entries are ordered by capture start time. Each source has a watermark
+    (the latest capture start it has delivered); an entry is emitted once
+    every source has moved past it, since no source can still deliver
+    anything earlier. A silent source would stall that forever, so an entry
+    is also emitted once it is `max_delay` seconds old, and the oldest
+    entries are forced out whenever more than `max_pending` are held, which
+    bounds memory. An entry that arrives after something later was already
+    emitted is written immediately and flagged "late".
+
+    With several Whisper replicas a source's transcripts can finish out of
+    order, so the dispatcher announces each segment with `expect` when it
+    hands it to Whisper; a source's watermark then stays below its earliest
+    segment still in flight until that one is added (or `cancel`led because
+    it produced no text).
+    """
+
+    def __init__(self, sources: list[str], on_entry: Callable[[dict], None],
+                 max_delay: float = 15.0, max_pending: int = 256):
+        self.on_entry = on_entry
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.watermarks: dict[str, float] = {source: float("-inf") for source in sources}
+        self.in_flight: dict[str, list[float]] = {source: [] for source in sources}  # heaps of expected starts
+        self.pending: list[tuple[float, int, dict]] = []
+        self.sequence = 0
+        self.emitted_until = float("-inf")
+        self.late = 0
+        self.lock = threading.Lock()
+
+    def add(self, source: str, speaker: str, start: float, end: float, text: str, **extra):
+        """
+        Queue one transcript; `start`/`end` are capture times in epoch seconds.
+        """
+        entry = {"start": format_timestamp(start), "end": format_timestamp(end),
+                 "speaker": speaker, "source": source, "text": text, **extra}
+        with self.lock:
+            self._arrived(source, start)
+            if start < self.emitted_until:
+                self.late += 1
+                self.on_entry({**entry, "late": True})
+                return
+            heapq.heappush(self.pending, (start, self.sequence, entry))
+            self.sequence += 1
+            self._emit_ready()
+
+    def expect(self, source: str, start: float):
+        """
+        A transcript starting at `start` is on its way from `source`.
+        """
+        with self.lock:
+            heapq.heappush(self.in_flight.setdefault(source, []), start)
+
+    def cancel(self, source: str, start: float):
+        """
+        An expected transcript will not be added (no text, or it failed).
+        """
+        with self.lock:
+            self._arrived(source, start)
+            self._emit_ready()
+
+    def _arrived(self, source: str, start: float):
+        self.watermarks[source] = max(self.watermarks.get(source, float("-inf")), start)
+        in_flight = self.in_flight.get(source)
+        if in_flight and start in in_flight:
+            in_flight.remove(start)
+            heapq.heapify(in_flight)
+
+    def _watermark(self, source: str) -> float:
+        in_flight = self.in_flight.get(source)
+        return in_flight[0] if in_flight else self.watermarks[source]
+
+    def poll(self, now: Optional[float] = None):
+        """
+        Emit entries that have waited `max_delay`; call periodically.
+        """
+        with self.lock:
+            self._emit_ready(time.time() if now is None else now)
+
+    def flush(self):
+        with self.lock:
+            while self.pending:
+                self._emit_oldest()
+
+    def _emit_oldest(self):
+        start, _, entry = heapq.heappop(self.pending)
+        self.emitted_until = max(self.emitted_until, start)
+        self.on_entry(entry)
+
+    def _emit_ready(self, now: Optional[float] = None):
+        low_watermark = min((self._watermark(source) for source in self.watermarks), default=float("-inf"))
+        while self.pending:
+            start = self.pending[0][0]
+            if (start <= low_watermark or len(self.pending) > self.max_pending
+                    or (now is not None and now - start >= self.max_delay)):
+                self._emit_oldest()
+            else:
+                break
+
+
+class TimelineWriter:
+    """
+    Appends merged timeline entries to a JSONL file, one line per entry.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, entry: dict):
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
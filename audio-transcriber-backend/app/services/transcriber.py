@@ -1,86 +1,268 @@
 import os
 import json
+import queue
 import time
+import threading
+import numpy as np
+from collections import deque
 from datetime import datetime
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-from faster_whisper import WhisperModel
-from app.stream_config import MIC_CONFIG, REMOTE_CONFIG
-
-WATCH_DIRS = [
-    (MIC_CONFIG["path_audio"], MIC_CONFIG["path_transcripts"], MIC_CONFIG["name"]),
-    (REMOTE_CONFIG["path_audio"], REMOTE_CONFIG["path_transcripts"], REMOTE_CONFIG["name"]),
-]
+from app.stream_config import TRANSCRIBER_CONFIG
+from app.services.segment_queue import AudioSegment
+from app.services.whisper_pool import WhisperPool, register_whisper
+from app.services.model_registry import registry
+from app.services.metrics import metrics
+from app.services.transcript_store import TranscriptStore
+from app.services.timeline import TimelineMerger, TimelineWriter, TIMELINE_NAME, format_timestamp
 
 import torch
 
 device = "cuda" if torch.cuda.is_available() else "cpu"
 compute_type = "float16" if device == "cuda" else "int8"
-model = WhisperModel("medium.en", device=device, compute_type=compute_type)
 
-class TranscriptionHandler(FileSystemEventHandler):
-    def __init__(self, input_dir, output_dir, label):
-        self.input_dir = input_dir
+register_whisper(TRANSCRIBER_CONFIG["model"])
+
+
+def resolve_capture_start(segment: AudioSegment) -> float:
+    """
+    Segments handed over without a capture clock are assumed to have ended
+    when they were closed; the estimate is kept on the segment so the
+    scheduler and the handler agree on it.
+    """
+    if segment.capture_start is None:
+        segment.capture_start = time.time() - (time.monotonic() - segment.closed_at) - segment.duration
+    return segment.capture_start
+
+
+class TranscriptionHandler:
+    def __init__(self, output_dir, label, store: TranscriptStore, per_chunk_json: bool = False,
+                 speaker: str = None, timeline: TimelineMerger = None):
         self.output_dir = output_dir
         self.label = label
-        os.makedirs(self.output_dir, exist_ok=True)
+        self.store = store
+        self.per_chunk_json = per_chunk_json
+        self.speaker = speaker or label
+        self.timeline = timeline
+        self.latencies: list[float] = []
+        self.latency_metric = metrics.histogram("transcript_latency_seconds", "Segment closed -> transcript written",
+                                                source=label)
+        if self.per_chunk_json:
+            os.makedirs(self.output_dir, exist_ok=True)
 
-    def on_created(self, event):
-        if event.is_directory or not event.src_path.endswith(".wav"):
-            return
+    def on_result(self, segment: AudioSegment, segments: list, language: str):
+        full_text = []
+        segment_list = []
 
-        filepath = event.src_path
-        fname = os.path.basename(filepath)
-        print(f"[transcriber] Detected new ({self.label}) audio: {fname}")
+        for seg in segments:
+            segment_list.append({
+                "start": round(seg["start"], 2),
+                "end": round(seg["end"], 2),
+                "text": seg["text"].strip()
+            })
+            full_text.append(seg["text"].strip())
 
-        time.sleep(0.3)
+        capture_start = resolve_capture_start(segment)
+        capture_end = capture_start + segment.duration
 
-        try:
-            segments, info = model.transcribe(filepath, beam_size=5)
-            full_text = []
-            segment_list = []
-
-            for seg in segments:
-                segment_list.append({
-                    "start": round(seg.start, 2),
-                    "end": round(seg.end, 2),
-                    "text": seg.text.strip()
-                })
-                full_text.append(seg.text.strip())
-
-            result = {
-                "filename": fname,
-                "created_at": datetime.utcnow().isoformat() + "Z",
-                "text": " ".join(full_text),
-                "segments": segment_list,
-                "language": info.language,
-                "duration": info.duration,
-                "source": self.label
-            }
-
-            outname = fname.replace(".wav", ".json")
-            outpath = os.path.join(self.output_dir, outname)
+        result = {
+            "filename": f"{segment.name}.wav",
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "captured_at": format_timestamp(capture_start),
+            "captured_until": format_timestamp(capture_end),
+            "text": " ".join(full_text),
+            "segments": segment_list,
+            "language": language,
+            "duration": segment.duration,
+            "source": self.label,
+            "speaker": self.speaker
+        }
+
+        self.store.append(result)
+        if self.timeline is not None:
+            if result["text"]:
+                self.timeline.add(self.label, self.speaker, capture_start, capture_end, result["text"],
+                                  filename=result["filename"])
+            else:
+                self.timeline.cancel(self.label, capture_start)
+        if self.per_chunk_json:
+            outpath = os.path.join(self.output_dir, f"{segment.name}.json")
             with open(outpath, "w", encoding="utf-8") as f:
                 json.dump(result, f, indent=2)
 
-            print(f"[transcriber] Transcribed ({self.label}): {outname}")
+        latency = time.monotonic() - segment.closed_at
+        self.latencies.append(latency)
+        self.latency_metric.observe(latency)
+        print(f"[transcriber] Transcribed ({self.label}): {segment.name} (speech end -> text {latency:.2f}s)")
+
+    def latency_summary(self) -> str:
+        if not self.latencies:
+            return f"{self.label}: no segments"
+        values = np.array(self.latencies)
+        return (f"{self.label}: {len(values)} segments, speech end -> text "
+                f"mean {values.mean():.2f}s, p50 {np.percentile(values, 50):.2f}s, "
+                f"p95 {np.percentile(values, 95):.2f}s, max {values.max():.2f}s")
+
+
+class TranscriptionScheduler:
+    """
+    Collects segments from every source and transcribes them in micro-batches.
+
+    A batch is dispatched when `batch_size` segments are pending or the oldest
+    pending segment has waited `max_wait` seconds, and a pool replica has room
+    for it; while every replica is busy, segments keep accumulating into the
+    next batch. Sources are drained round robin so one busy stream cannot
+    starve the others. Each dispatched segment is announced to the timeline,
+    whose merge order must not depend on which replica finishes first.
+    """
+
+    def __init__(self, segment_queue, handlers: dict, pool: WhisperPool, batch_size: int, max_wait: float,
+                 timeline: TimelineMerger = None):
+        self.segment_queue = segment_queue
+        self.timeline = timeline
+        self.handlers = handlers
+        self.pool = pool
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.pending: dict[str, deque] = {label: deque() for label in handlers}
+        self.completed = 0
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.stats_interval = 30.0
+        self.last_stats = self.started_at
+        self.queue_wait = {label: metrics.histogram("transcription_queue_wait_seconds",
+                                                    "Segment closed -> dispatched to Whisper", source=label)
+                           for label in handlers}
+        metrics.counter("transcribed_segments_total", lambda: self.completed, "Segments transcribed")
 
-        except Exception as e:
-            print(f"[transcriber] Error processing {fname}: {e}")
+    def queue_depths(self) -> dict:
+        return {label: len(items) for label, items in self.pending.items()}
 
-def run_transcription_loop(stop_event):
-    print("[transcriber] Starting watchdog for mic and remote folders...")
-    observer = Observer()
+    def throughput(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.completed / elapsed if elapsed > 0 else 0.0
 
-    for input_dir, output_dir, label in WATCH_DIRS:
-        handler = TranscriptionHandler(input_dir, output_dir, label)
-        observer.schedule(handler, input_dir, recursive=False)
+    def _collect(self, timeout: float):
+        try:
+            segment = self.segment_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while True:
+            self.pending[segment.source].append(segment)
+            try:
+                segment = self.segment_queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _oldest_wait(self) -> float:
+        oldest = min((items[0].closed_at for items in self.pending.values() if items), default=None)
+        return 0.0 if oldest is None else time.monotonic() - oldest
+
+    def _next_batch(self) -> list[AudioSegment]:
+        batch = []
+        while len(batch) < self.batch_size and any(self.pending.values()):
+            for items in self.pending.values():
+                if items and len(batch) < self.batch_size:
+                    batch.append(items.popleft())
+        return batch
+
+    def _on_done(self, batch: list[AudioSegment], results, language, error):
+        if error is not None:
+            print(f"[transcriber] Error processing batch {[s.name for s in batch]}: {error}")
+            if self.timeline is not None:
+                for segment in batch:
+                    self.timeline.cancel(segment.source, resolve_capture_start(segment))
+        else:
+            for segment, segments in zip(batch, results):
+                self.handlers[segment.source].on_result(segment, segments, language)
+        with self.lock:
+            self.completed += len(batch)
+
+    def idle(self) -> bool:
+        return self.segment_queue.empty() and not any(self.pending.values()) and not self.pool.outstanding()
+
+    def step(self):
+        total = sum(self.queue_depths().values())
+        wait = self._oldest_wait()
+        ready = total >= self.batch_size or (total and wait >= self.max_wait)
+        if not ready or not self.pool.has_capacity():
+            timeout = self.max_wait - wait if total and wait < self.max_wait else 0.05 if total else 0.5
+            self._collect(timeout=timeout)
+            return
+
+        batch = self._next_batch()
+        dispatched = time.monotonic()
+        for segment in batch:
+            self.queue_wait[segment.source].observe(dispatched - segment.closed_at)
+            if self.timeline is not None:
+                self.timeline.expect(segment.source, resolve_capture_start(segment))
+        self.pool.submit(batch, self._on_done)
+
+        now = time.monotonic()
+        if now - self.last_stats >= self.stats_interval:
+            self.last_stats = now
+            print(f"[transcriber] queue depth {self.queue_depths()} | in flight {self.pool.outstanding()} | "
+                  f"{self.throughput():.2f} segments/s")
+
+
+def run_transcription_loop(stop_event, segment_queue, streams: list[dict], ready_event=None, drain_event=None):
+    """
+    Transcribe segments from the given stream configs until stop_event is
+    set, or, once drain_event is set (no more segments will arrive), until
+    everything queued is transcribed.
+    """
+    print("[transcriber] Loading Whisper replicas...")
+    session_dir = os.path.join(TRANSCRIBER_CONFIG["session_root"], datetime.now().strftime("%Y%m%d-%H%M%S"))
+    store = TranscriptStore(session_dir)
+    print(f"[transcriber] Writing transcripts to {store.log_path}")
+    timeline_writer = TimelineWriter(os.path.join(session_dir, TIMELINE_NAME))
+    timeline = TimelineMerger(
+        [config["name"] for config in streams],
+        on_entry=timeline_writer,
+        max_delay=TRANSCRIBER_CONFIG["timeline_max_delay_s"]
+    )
+    handlers = {
+        config["name"]: TranscriptionHandler(config["path_transcripts"], config["name"], store,
+                                             TRANSCRIBER_CONFIG["per_chunk_json"],
+                                             speaker=config.get("speaker"), timeline=timeline)
+        for config in streams
+    }
+    pool = WhisperPool(
+        TRANSCRIBER_CONFIG["model"],
+        device=device,
+        compute_type=compute_type,
+        replicas=TRANSCRIBER_CONFIG["replicas"],
+        cpu_threads=TRANSCRIBER_CONFIG["cpu_threads"],
+        num_workers=TRANSCRIBER_CONFIG["num_workers"],
+        beam_size=TRANSCRIBER_CONFIG["beam_size"],
+        pin_cpus=TRANSCRIBER_CONFIG["pin_cpus"]
+    )
+    pool.start()
+    registry.mark("transcriber ready")
+    if ready_event is not None:
+        ready_event.set()
+    print(f"[transcriber] Waiting for segments from {', '.join(handlers)}...")
+    scheduler = TranscriptionScheduler(
+        segment_queue,
+        handlers,
+        pool,
+        batch_size=TRANSCRIBER_CONFIG["batch_size"],
+        max_wait=TRANSCRIBER_CONFIG["max_batch_wait_ms"] / 1000,
+        timeline=timeline
+    )
 
-    observer.start()
     try:
         while not stop_event.is_set():
-            time.sleep(1)
+            scheduler.step()
+            timeline.poll()
+            if drain_event is not None and drain_event.is_set() and scheduler.idle():
+                break
     except KeyboardInterrupt:
-        print("[transcriber] Interrupted by user. Stopping observer.")
-        observer.stop()
-    observer.join()
+        print("[transcriber] Interrupted by user. Stopping.")
+    pool.stop()
+    timeline.flush()
+    timeline_writer.close()
+    if timeline.late:
+        print(f"[transcriber] {timeline.late} timeline entries arrived late (after max delay)")
+
+    print(f"[transcriber] {scheduler.completed} segments, {scheduler.throughput():.2f} segments/s")
+    for handler in handlers.values():
+        print(f"[transcriber] {handler.latency_summary()}")
@@ -0,0 +1,173 @@
+# transcript_store.py
+
+import os
+import json
+import glob
+import argparse
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+LOG_NAME = "transcripts.jsonl"
+INDEX_NAME = "transcripts.idx"
+
+
+def parse_timestamp(value: str) -> float:
+    """
+    ISO-8601 (as written in "created_at", with or without a trailing Z) to epoch seconds.
+    """
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def record_time(record: dict) -> float:
+    return parse_timestamp(record.get("captured_at") or record["created_at"])
+
+
+class TranscriptStore:
+    """
+    Session-level append-only transcript log with an offset index.
+
+    Each transcript is one JSON line in transcripts.jsonl. For every line a
+    "source<TAB>timestamp<TAB>offset" entry is appended to transcripts.idx,
+    so a range query reads only the index plus the matching lines instead of
+    parsing the whole session. The index is rebuilt from the log if it is
+    missing or shorter than the log (e.g. after a crash between the two
+    appends). Entries are keyed by "captured_at" (when the audio was
+    captured) if the record has it, else by "created_at".
+    """
+
+    def __init__(self, session_dir: str):
+        self.session_dir = session_dir
+        self.log_path = os.path.join(session_dir, LOG_NAME)
+        self.index_path = os.path.join(session_dir, INDEX_NAME)
+        self.lock = threading.Lock()
+        self.index: dict[str, tuple[list[float], list[int]]] = {}
+
+        os.makedirs(session_dir, exist_ok=True)
+        self._load_index()
+
+    def _add_to_index(self, source: str, timestamp: float, offset: int):
+        times, offsets = self.index.setdefault(source, ([], []))
+        position = bisect_right(times, timestamp)
+        times.insert(position, timestamp)
+        offsets.insert(position, offset)
+
+    def _load_index(self):
+        indexed_to = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 3:
+                        continue  # Entry cut short by a crash; the log scan below re-indexes it
+                    source, timestamp, offset = parts
+                    self._add_to_index(source, float(timestamp), int(offset))
+                    indexed_to = max(indexed_to, int(offset) + 1)
+
+        if not os.path.exists(self.log_path):
+            return
+        # Index any log lines written after the last index entry.
+        with open(self.log_path, "r+b") as log, open(self.index_path, "a", encoding="utf-8") as index:
+            log.seek(indexed_to)
+            if indexed_to:
+                log.readline()  # Skip the remainder of the last indexed line
+            while True:
+                offset = log.tell()
+                line = log.readline()
+                if not line.endswith(b"\n"):
+                    log.truncate(offset)  # Drop a line cut short by a crash
+                    break
+                record = json.loads(line)
+                timestamp = record_time(record)
+                self._add_to_index(record["source"], timestamp, offset)
+                index.write(f"{record['source']}\t{timestamp}\t{offset}\n")
+
+    def append(self, record: dict):
+        """
+        Append one transcript; it needs "source" and "created_at" (or "captured_at").
+        """
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        timestamp = record_time(record)
+        with self.lock:
+            with open(self.log_path, "ab") as log:
+                offset = log.tell()
+                log.write(line)
+            with open(self.index_path, "a", encoding="utf-8") as index:
+                index.write(f"{record['source']}\t{timestamp}\t{offset}\n")
+            self._add_to_index(record["source"], timestamp, offset)
+
+    def sources(self) -> list[str]:
+        return sorted(self.index)
+
+    def query(self, source: Optional[str] = None, start: Optional[float] = None,
+              end: Optional[float] = None) -> Iterator[dict]:
+        """
+        Transcripts for one source (or all) with start <= timestamp < end, in time order.
+        """
+        with self.lock:
+            matches = []
+            for name in ([source] if source else self.index):
+                times, offsets = self.index.get(name, ([], []))
+                lo = bisect_left(times, start) if start is not None else 0
+                hi = bisect_left(times, end) if end is not None else len(times)
+                matches.extend(zip(times[lo:hi], offsets[lo:hi]))
+        matches.sort()
+
+        if not matches:
+            return
+        with open(self.log_path, "rb") as log:
+            for _, offset in matches:
+                log.seek(offset)
+                yield json.loads(log.readline())
+
+
+def compact(transcript_dirs: list[str], session_dir: str, remove: bool = False) -> int:
+    """
+    Move per-chunk JSON transcripts into a session store, oldest first.
+    """
+    records = []
+    for directory in transcript_dirs:
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            with open(path, encoding="utf-8") as f:
+                records.append((path, json.load(f)))
+    records.sort(key=lambda item: record_time(item[1]))
+
+    store = TranscriptStore(session_dir)
+    for path, record in records:
+        store.append(record)
+        if remove:
+            os.remove(path)
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query or build an append-only transcript store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    compact_cmd = sub.add_parser("compact", help="Convert per-chunk JSON directories into a session store.")
+    compact_cmd.add_argument("session_dir")
+    compact_cmd.add_argument("transcript_dirs", nargs="+")
+    compact_cmd.add_argument("--remove", action="store_true", help="Delete the JSON files once appended.")
+
+    query_cmd = sub.add_parser("query", help="Print transcripts in a time range.")
+    query_cmd.add_argument("session_dir")
+    query_cmd.add_argument("--source")
+    query_cmd.add_argument("--start", help="ISO-8601 time, e.g. 2025-06-01T10:05:00Z")
+    query_cmd.add_argument("--end")
+
+    args = parser.parse_args()
+    if args.command == "compact":
+        count = compact(args.transcript_dirs, args.session_dir, remove=args.remove)
+        print(f"[transcript_store] Appended {count} transcripts to {args.session_dir}")
+    else:
+        store = TranscriptStore(args.session_dir)
+        start = parse_timestamp(args.start) if args.start else None
+        end = parse_timestamp(args.end) if args.end else None
+        for record in store.query(args.source, start, end):
+            print(f"{record.get('captured_at', record['created_at'])} ({record['source']}) {record['text']}")
@@ -1,15 +1,62 @@
+import os
+import copy
 import torch
 import numpy as np
+from collections import namedtuple
+from app.services.model_registry import registry
+from app.services.energy_gate import EnergyGate, GatedVAD
 
 SAMPLE_RATE = 16000
+WINDOW_SIZE_SAMPLES = 512  # Silero VAD window at 16 kHz
+
+SileroVAD = namedtuple("SileroVAD", ["model", "get_speech_timestamps", "VADIterator"])
+
+
+def load_silero() -> SileroVAD:
+    """
+    Load Silero VAD without touching the network: from the installed
+    silero-vad package, else from the local torch.hub cache, and only as a
+    last resort from GitHub.
+    """
+    try:
+        from silero_vad import load_silero_vad, get_speech_timestamps, VADIterator
+        return SileroVAD(load_silero_vad(), get_speech_timestamps, VADIterator)
+    except ImportError:
+        pass
+
+    cached_repo = os.path.join(torch.hub.get_dir(), "snakers4_silero-vad_master")
+    if os.path.isdir(cached_repo):
+        model, utils = torch.hub.load(repo_or_dir=cached_repo, model='silero_vad', source='local')
+    else:
+        model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False)
+    (get_speech_timestamps,
+     save_audio,
+     read_audio,
+     VADIterator,
+     collect_chunks) = utils
+    return SileroVAD(model, get_speech_timestamps, VADIterator)
+
+
+def warm_up_silero(vad: SileroVAD):
+    with torch.no_grad():
+        vad.model(torch.zeros(WINDOW_SIZE_SAMPLES), SAMPLE_RATE)
+    vad.model.reset_states()
+
+
+registry.register("silero_vad", load_silero, warm_up_silero)
+
+
+def get_vad() -> SileroVAD:
+    return registry.get("silero_vad")
+
+
+def copy_vad_model():
+    """
+    A private copy of the Silero model, so callers on different threads do
+    not share its hidden state.
+    """
+    return copy.deepcopy(get_vad().model)
 
-# Load Silero VAD model from torch.hub
-model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False)
-(get_speech_timestamps,
- save_audio,
- read_audio,
- VADIterator,
- collect_chunks) = utils
 
 def is_speech(audio_chunk: np.ndarray) -> bool:
     """
@@ -18,6 +65,83 @@ def is_speech(audio_chunk: np.ndarray) -> bool:
     if audio_chunk.ndim > 1:
         audio_chunk = audio_chunk[:, 0]
 
+    vad = get_vad()
     audio_tensor = torch.from_numpy(audio_chunk.astype(np.float32)) / 32768.0
-    speech_ts = get_speech_timestamps(audio_tensor, model, sampling_rate=SAMPLE_RATE)
+    speech_ts = vad.get_speech_timestamps(audio_tensor, vad.model, sampling_rate=SAMPLE_RATE)
     return bool(speech_ts)
+
+
+class StreamingVAD:
+    """
+    Stateful per-stream VAD built on Silero's VADIterator.
+
+    Each instance owns a copy of the model so its hidden state is not shared
+    with other streams. Frames of any length are split into fixed 512-sample
+    windows; leftover samples are carried over to the next frame, so every
+    window costs a single model step.
+    """
+
+    def __init__(self, threshold: float = 0.5, min_silence_duration_ms: int = 100, speech_pad_ms: int = 30):
+        self.model = copy_vad_model()
+        self.iterator = get_vad().VADIterator(
+            self.model,
+            threshold=threshold,
+            sampling_rate=SAMPLE_RATE,
+            min_silence_duration_ms=min_silence_duration_ms,
+            speech_pad_ms=speech_pad_ms
+        )
+        self.pending = np.zeros(0, dtype=np.float32)
+
+    def reset(self):
+        self.iterator.reset_states()
+        self.pending = np.zeros(0, dtype=np.float32)
+
+    def is_speech(self, audio_chunk: np.ndarray) -> bool:
+        """
+        Feed a 16 kHz int16 frame and report whether speech was active in it.
+        """
+        if audio_chunk.ndim > 1:
+            audio_chunk = audio_chunk[:, 0]
+
+        samples = audio_chunk.astype(np.float32) / 32768.0
+        if len(self.pending):
+            samples = np.concatenate((self.pending, samples))
+
+        n_windows = len(samples) // WINDOW_SIZE_SAMPLES
+        used = n_windows * WINDOW_SIZE_SAMPLES
+        self.pending = samples[used:]
+
+        speech = self.iterator.triggered
+        windows = torch.from_numpy(samples[:used]).view(n_windows, WINDOW_SIZE_SAMPLES)
+        for window in windows:
+            self.iterator(window)
+            speech = speech or self.iterator.triggered
+        return speech
+
+    def skip(self):
+        """
+        Called instead of `is_speech` for a frame the energy gate dropped;
+        carried-over samples would otherwise be glued to audio that is not
+        contiguous with them.
+        """
+        self.pending = np.zeros(0, dtype=np.float32)
+
+
+def create_vad(mode: str = "streaming", prefilter: bool = True, name: str = "vad"):
+    """
+    Return a callable frame -> bool for the requested VAD mode.
+
+    "streaming" gives each caller its own StreamingVAD; "timestamps" keeps the
+    original stateless get_speech_timestamps pass per frame. With `prefilter`
+    the result is a GatedVAD: an EnergyGate answers clear silence and Silero
+    only sees ambiguous frames (and every frame inside an utterance).
+    """
+    if mode == "streaming":
+        vad = StreamingVAD()
+        if not prefilter:
+            return vad.is_speech
+        return GatedVAD(vad.is_speech, EnergyGate(SAMPLE_RATE), in_speech=lambda: vad.iterator.triggered,
+                        on_skip=vad.skip, name=name)
+    if mode == "timestamps":
+        return GatedVAD(is_speech, EnergyGate(SAMPLE_RATE), name=name) if prefilter else is_speech
+    raise ValueError(f"Unknown VAD mode: {mode}")
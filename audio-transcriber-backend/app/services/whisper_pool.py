@@ -0,0 +1,253 @@
+# whisper_pool.py
+
+import os
+import time
+import queue
+import logging
+import threading
+import numpy as np
+from bisect import bisect_right
+from typing import Callable, Optional
+from faster_whisper import WhisperModel, BatchedInferencePipeline
+from faster_whisper.utils import download_model
+from app.services.segment_queue import AudioSegment
+from app.services.model_registry import registry
+from app.services.metrics import metrics, profiled, RTF_BUCKETS
+
+MAX_CLIP_SECONDS = 30.0  # Whisper's window; longer segments are split into several clips
+
+logger = logging.getLogger("whisper_pool")
+
+
+def transcribe_batch(batched_model, batch: list[AudioSegment], beam_size: int) -> tuple[list[list[dict]], str]:
+    """
+    Run several segments through one batched Whisper pass.
+
+    The segments are laid end to end and passed as clip_timestamps, so each
+    clip becomes its own batch item. Returned timestamps are mapped back to
+    the owning segment and made relative to its start. Clip timestamps are in
+    seconds, which the batched pipeline accepts from faster-whisper 1.2 on
+    (1.1.x expects sample indices).
+    """
+    clip_starts: list[float] = []
+    clip_owners: list[int] = []
+    clips: list[dict] = []
+    segment_offsets: list[float] = []
+    offset = 0.0
+
+    for i, segment in enumerate(batch):
+        segment_offsets.append(offset)
+        clip_start = 0.0
+        while clip_start < segment.duration:
+            clip_end = min(segment.duration, clip_start + MAX_CLIP_SECONDS)
+            clips.append({"start": offset + clip_start, "end": offset + clip_end})
+            clip_starts.append(offset + clip_start)
+            clip_owners.append(i)
+            clip_start = clip_end
+        offset += segment.duration
+
+    audio = np.concatenate([segment.audio for segment in batch])
+    segments, info = batched_model.transcribe(
+        audio,
+        beam_size=beam_size,
+        clip_timestamps=clips,
+        batch_size=len(clips),
+        without_timestamps=False
+    )
+
+    results: list[list[dict]] = [[] for _ in batch]
+    for seg in segments:
+        owner = clip_owners[max(0, bisect_right(clip_starts, seg.start + 1e-3) - 1)]
+        base = segment_offsets[owner]
+        results[owner].append({"start": seg.start - base, "end": seg.end - base, "text": seg.text})
+    return results, info.language
+
+
+def resolve_model_path(model_name: str) -> str:
+    """
+    Local path of a Whisper model, from the Hugging Face cache when present
+    so no network check is made; downloads only if it is not cached yet.
+    """
+    if os.path.isdir(model_name):
+        return model_name
+    try:
+        return download_model(model_name, local_files_only=True)
+    except Exception:
+        logger.info(f"Whisper model '{model_name}' not cached; downloading.")
+        return download_model(model_name)
+
+
+def register_whisper(model_name: str) -> str:
+    key = f"whisper:{model_name}"
+    registry.register(key, lambda: resolve_model_path(model_name))
+    return key
+
+
+def warm_up(batched_model):
+    segments, _ = batched_model.transcribe(
+        np.zeros(16000, dtype=np.float32),
+        clip_timestamps=[{"start": 0.0, "end": 1.0}],
+        batch_size=1
+    )
+    list(segments)
+
+
+def plan_cpu_sets(replicas: int, cpu_threads: int) -> list[Optional[set]]:
+    """
+    Split the CPUs this process may use into one disjoint set per replica.
+
+    Returns None entries when pinning is unsupported (e.g. Windows/macOS) or
+    there are not enough cores to give each replica its own.
+    """
+    if not hasattr(os, "sched_getaffinity"):
+        return [None] * replicas
+
+    cpus = sorted(os.sched_getaffinity(0))
+    per_replica = cpu_threads or len(cpus) // replicas
+    if per_replica < 1 or per_replica * replicas > len(cpus):
+        logger.warning(f"Not enough CPUs ({len(cpus)}) to pin {replicas} replicas x {per_replica} threads; not pinning.")
+        return [None] * replicas
+    return [set(cpus[i * per_replica:(i + 1) * per_replica]) for i in range(replicas)]
+
+
+class WhisperWorker:
+    """
+    One model replica served by `num_workers` threads.
+
+    The model is built inside the first thread after pinning, so CTranslate2's
+    compute threads inherit the CPU set; that thread then starts the other
+    consumers, which inherit it too. CTranslate2 runs up to `num_workers`
+    transcriptions of one model in parallel, so each consumer takes its own
+    batch from the inbox.
+    """
+
+    def __init__(self, index: int, model_name: str, device: str, compute_type: str,
+                 cpu_threads: int, num_workers: int, beam_size: int, cpus: Optional[set]):
+        self.index = index
+        self.model_name = model_name
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.beam_size = beam_size
+        self.cpus = cpus
+
+        self.inbox: "queue.Queue" = queue.Queue()
+        self.outstanding = 0
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.error: Optional[Exception] = None
+        self.decode_time = metrics.histogram("whisper_decode_seconds", "Whisper decode time per batch",
+                                             replica=str(index))
+        self.rtf = metrics.histogram("whisper_rtf", "Whisper decode time / audio duration per batch",
+                                     buckets=RTF_BUCKETS, replica=str(index))
+        self.thread = threading.Thread(target=profiled(self._run, f"whisper-{index}"), name=f"whisper-{index}",
+                                       daemon=True)
+        self.consumers: list[threading.Thread] = []
+
+    def start(self):
+        self.thread.start()
+
+    def submit(self, batch: list[AudioSegment], on_done: Callable):
+        with self.lock:
+            self.outstanding += 1
+        self.inbox.put((batch, on_done))
+
+    def stop(self):
+        for _ in range(max(1, self.num_workers)):
+            self.inbox.put(None)
+        self.thread.join()
+        for consumer in self.consumers:
+            consumer.join()
+
+    def _run(self):
+        try:
+            if self.cpus:
+                os.sched_setaffinity(0, self.cpus)
+            model_path = registry.get(register_whisper(self.model_name))
+            with registry.phase(f"whisper replica {self.index}: load"):
+                model = WhisperModel(
+                    model_path,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    cpu_threads=self.cpu_threads,
+                    num_workers=self.num_workers
+                )
+                batched_model = BatchedInferencePipeline(model=model)
+            with registry.phase(f"whisper replica {self.index}: warm-up"):
+                warm_up(batched_model)
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+            return
+        logger.info(f"Replica {self.index} ready (cpus={sorted(self.cpus) if self.cpus else 'any'}, "
+                    f"workers={max(1, self.num_workers)})")
+        for n in range(1, self.num_workers):
+            # The pipeline keeps per-call state; the model itself is shared
+            name = f"whisper-{self.index}-{n}"
+            consumer = threading.Thread(target=profiled(self._consume, name),
+                                        args=(BatchedInferencePipeline(model=model),), name=name, daemon=True)
+            consumer.start()
+            self.consumers.append(consumer)
+        self.ready.set()
+        self._consume(batched_model)
+
+    def _consume(self, batched_model):
+        while True:
+            item = self.inbox.get()
+            if item is None:
+                break
+            batch, on_done = item
+            try:
+                started = time.perf_counter()
+                results, language = transcribe_batch(batched_model, batch, self.beam_size)
+                elapsed = time.perf_counter() - started
+                self.decode_time.observe(elapsed)
+                self.rtf.observe(elapsed / max(sum(segment.duration for segment in batch), 1e-6))
+                on_done(batch, results, language, None)
+            except Exception as e:
+                on_done(batch, None, None, e)
+            finally:
+                with self.lock:
+                    self.outstanding -= 1
+
+
+class WhisperPool:
+    """
+    N Whisper replicas; each batch goes to the replica with the fewest
+    outstanding batches. A replica has room for as many batches as it has
+    workers unless `max_outstanding` says otherwise.
+    """
+
+    def __init__(self, model_name: str, device: str, compute_type: str, replicas: int = 1,
+                 cpu_threads: int = 0, num_workers: int = 1, beam_size: int = 5,
+                 pin_cpus: bool = False, max_outstanding: Optional[int] = None):
+        cpu_sets = plan_cpu_sets(replicas, cpu_threads) if pin_cpus and device == "cpu" else [None] * replicas
+        self.max_outstanding = max_outstanding or max(1, num_workers)
+        self.workers = [
+            WhisperWorker(i, model_name, device, compute_type, cpu_threads, num_workers, beam_size, cpus)
+            for i, cpus in enumerate(cpu_sets)
+        ]
+
+    def start(self, wait: bool = True):
+        for worker in self.workers:
+            worker.start()
+        if wait:
+            for worker in self.workers:
+                worker.ready.wait()
+                if worker.error is not None:
+                    raise RuntimeError(f"Whisper replica {worker.index} failed to load: {worker.error}")
+
+    def has_capacity(self) -> bool:
+        return any(worker.outstanding < self.max_outstanding for worker in self.workers)
+
+    def outstanding(self) -> int:
+        return sum(worker.outstanding for worker in self.workers)
+
+    def submit(self, batch: list[AudioSegment], on_done: Callable):
+        worker = min(self.workers, key=lambda w: w.outstanding)
+        worker.submit(batch, on_done)
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stop()
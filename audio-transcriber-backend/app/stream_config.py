@@ -2,18 +2,73 @@
 
 MIC_CONFIG = {
     "name": "mic",
+    "speaker": "me",  # Speaker label in the merged timeline
     "device_index": None,  # Will be set to actual device index at runtime
     "sample_rate": 16000,
     "frame_duration_ms": 512,
+    "vad_mode": "streaming",  # "streaming" (VADIterator) or "timestamps" (per-frame get_speech_timestamps)
+    "vad_prefilter": True,  # Skip Silero on frames an adaptive energy/zero-crossing gate calls clear silence
+    "capture_buffer_seconds": 10,  # Ring buffer between the audio callback and the processing thread
+    "save_audio": True,  # Also write each segment to path_audio (in the background)
+    "audio_format": "wav",  # "wav", or "flac" / "opus" for compressed storage (needs soundfile)
+    "retention_max_mb": None,  # Delete the oldest segments once path_audio exceeds this size (None = keep all)
+    "retention_max_age_h": None,  # ...or once they are older than this
     "path_audio": "data/mic/audio",
     "path_transcripts": "data/mic/transcripts"
 }
 
 REMOTE_CONFIG = {
     "name": "remote",
+    "speaker": "remote",  # Speaker label in the merged timeline
     "device_index": None,  # Will be set via WASAPI device selector
     "sample_rate": 44100,
     "frame_duration_ms": 512,
+    "vad_mode": "streaming",  # "streaming" (VADIterator) or "timestamps" (per-frame get_speech_timestamps)
+    "vad_prefilter": True,  # Skip Silero on frames an adaptive energy/zero-crossing gate calls clear silence
+    "capture_buffer_seconds": 10,  # Ring buffer between the audio callback and the processing thread
+    "save_audio": True,  # Also write each segment to path_audio (in the background)
+    "audio_format": "wav",  # "wav", or "flac" / "opus" for compressed storage (needs soundfile)
+    "retention_max_mb": None,  # Delete the oldest segments once path_audio exceeds this size (None = keep all)
+    "retention_max_age_h": None,  # ...or once they are older than this
     "path_audio": "data/remote/audio",
     "path_transcripts": "data/remote/transcripts"
 }
+
+TRANSCRIBER_CONFIG = {
+    "model": "medium.en",
+    "beam_size": 5,
+    "batch_size": 8,  # Max segments per batched Whisper pass, across all sources
+    "max_batch_wait_ms": 250,  # Dispatch a partial batch once its oldest segment has waited this long
+    "max_queued_segments": 128,  # Segments waiting for the transcriber; live capture drops (and counts) beyond this
+    "replicas": 1,  # Independent Whisper model instances; batches go to the least-loaded one
+    "cpu_threads": 0,  # CTranslate2 threads per replica (0 = library default)
+    "num_workers": 1,  # Batches each replica decodes in parallel (CTranslate2 workers, one thread each)
+    "pin_cpus": False,  # Give each replica its own set of cpu_threads cores (Linux only)
+    "session_root": "data/sessions",  # One append-only transcript log per run: <session_root>/<start time>/
+    "per_chunk_json": False,  # Also write the legacy one-JSON-per-chunk files to path_transcripts
+    "timeline_max_delay_s": 15.0  # Merged timeline.jsonl waits at most this long for a quiet source
+}
+
+SUPERVISOR_CONFIG = {
+    "streams_file": None,  # JSON stream definitions (see streams.example.json); None = MIC_CONFIG + REMOTE_CONFIG
+    "vad_workers": 2,  # Threads shared by all streams for VAD and segmentation
+    "restart_backoff_s": [1, 30]  # A stream that stops unexpectedly is restarted after 1s, 2s, 4s, ... up to 30s
+}
+
+STORAGE_CONFIG = {
+    "encoder_workers": 2  # Threads shared by all streams for encoding and writing saved segments
+}
+
+PARTIALS_CONFIG = {
+    "enabled": False,  # Emit partial hypotheses while an utterance is still in progress
+    "model": "base.en",  # A small model keeps re-decoding cheap; finals still come from TRANSCRIBER_CONFIG["model"]
+    "interval_ms": 300,  # How often the growing window is re-decoded
+    "max_window_s": 25.0
+}
+
+METRICS_CONFIG = {
+    "snapshot_path": "data/metrics.jsonl",  # Periodic JSON snapshots of every metric (None = off)
+    "snapshot_interval_s": 30,
+    "prometheus_port": None,  # Serve Prometheus text on http://127.0.0.1:<port>/metrics (None = off)
+    "profile_dir": None  # Run the capture and Whisper threads under cProfile, one .prof per thread (or --profile DIR)
+}
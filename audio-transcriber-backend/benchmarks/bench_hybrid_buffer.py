@@ -0,0 +1,52 @@
+# bench_hybrid_buffer.py
+#
+# Memory and flush cost of the remote history buffer: deque of Python floats
+# vs the preallocated float32 HistoryRing.
+# Run from the project root:  python -m benchmarks.bench_hybrid_buffer
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from collections import deque
+from app.services.capture_ring import HistoryRing
+
+
+def fill(buffer, frames: list[np.ndarray]):
+    for frame in frames:
+        buffer.extend(frame)
+
+
+def measure(label: str, make_buffer, to_array, frames: list[np.ndarray], flushes: int):
+    tracemalloc.start()
+    buffer = make_buffer()
+    fill(buffer, frames)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = np.empty(flushes)
+    for i in range(flushes):
+        start = time.perf_counter()
+        to_array(buffer)
+        timings[i] = time.perf_counter() - start
+    timings *= 1000
+
+    print(f"{label:<12} memory={memory / 1e6:8.2f} MB  flush mean={timings.mean():8.3f} ms  "
+          f"p95={np.percentile(timings, 95):8.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the remote hybrid buffer.")
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--seconds", type=float, default=12.0)
+    parser.add_argument("--flushes", type=int, default=20)
+    args = parser.parse_args()
+
+    capacity = int(args.seconds * args.sample_rate)
+    frame_size = int(args.sample_rate * 0.512)
+    rng = np.random.default_rng(0)
+    frames = [rng.standard_normal(frame_size).astype(np.float32) for _ in range(capacity // frame_size + 2)]
+
+    print(f"{args.seconds} s @ {args.sample_rate} Hz = {capacity} samples")
+    measure("deque", lambda: deque(maxlen=capacity), np.array, frames, args.flushes)
+    measure("HistoryRing", lambda: HistoryRing(capacity), lambda b: b.latest(), frames, args.flushes)
@@ -0,0 +1,81 @@
+# bench_segment_formats.py
+#
+# Disk use and CPU cost of the segment storage formats (WAV, FLAC, Opus).
+# Run from the project root:  python -m benchmarks.bench_segment_formats --minutes 10
+# Pass --wav to use recorded speech instead of the synthetic signal; FLAC
+# and Opus need soundfile.
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from app.services.resampler import StreamingResampler
+from app.services.segment_queue import load_segment
+from app.services.segment_store import SegmentStore, FORMATS, read_audio
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+
+def synthetic_speech(seconds: float, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Voiced harmonics with a syllable-rate envelope plus background noise:
+    compresses roughly like speech, unlike a pure tone or silence.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 3.5 * t), 0, None) * (rng.random(len(t) // sample_rate + 1) > 0.2).repeat(sample_rate)[:len(t)]
+    audio = 0.15 * voiced * envelope + 0.005 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+
+def bench(audio_format: str, segments: list[np.ndarray], audio_seconds: float):
+    with tempfile.TemporaryDirectory() as audio_dir:
+        store = SegmentStore(audio_dir, audio_format)
+        paths = []
+        cpu, wall = time.process_time(), time.perf_counter()
+        for segment in segments:
+            paths.append(store.write(store.next_name("bench"), 16000, segment))
+        encode_cpu, encode_wall = time.process_time() - cpu, time.perf_counter() - wall
+
+        size = sum(os.path.getsize(path) for path in paths)
+        cpu = time.process_time()
+        for path in paths:
+            read_audio(path)
+        decode_cpu = time.process_time() - cpu
+
+    hours = audio_seconds / 3600
+    print(f"{audio_format:<5} {size / hours / 2**20:9.1f} MB/hour  {size * 8 / audio_seconds / 1000:6.1f} kbit/s  "
+          f"encode {encode_cpu / hours:6.1f} CPU-s/hour ({audio_seconds / max(encode_wall, 1e-9):7.0f}x real time)  "
+          f"decode {decode_cpu / hours:6.1f} CPU-s/hour")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare segment storage formats.")
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--segment-seconds", type=float, default=4)
+    parser.add_argument("--wav")
+    args = parser.parse_args()
+
+    if args.wav:
+        recording = load_segment(args.wav, "bench")
+        audio = StreamingResampler(recording.sample_rate, 16000).process(recording.audio)
+        audio = np.resize(audio, int(args.minutes * 60 * 16000))
+    else:
+        audio = synthetic_speech(args.minutes * 60)
+    data = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    length = int(args.segment_seconds * 16000)
+    segments = [data[i:i + length] for i in range(0, len(data), length)]
+
+    print(f"{len(data) / 16000 / 60:.1f} min of 16 kHz mono in {len(segments)} segments of {args.segment_seconds:g}s")
+    for audio_format in FORMATS:
+        if audio_format != "wav" and soundfile is None:
+            print(f"{audio_format:<5} skipped (soundfile not installed)")
+            continue
+        bench(audio_format, segments, len(data) / 16000)
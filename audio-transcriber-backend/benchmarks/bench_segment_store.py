@@ -0,0 +1,71 @@
+# bench_segment_store.py
+#
+# Soak test for segment naming and persistence: the previous os.listdir
+# scan per save vs SegmentStore's in-memory counter with write-then-rename.
+# Run from the project root:  python -m benchmarks.bench_segment_store --segments 100000
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+from scipy.io.wavfile import write
+from app.services.segment_store import SegmentStore
+
+
+def legacy_save(audio_dir: str, name: str, data: np.ndarray) -> float:
+    start = time.perf_counter()
+    index = len([f for f in os.listdir(audio_dir) if f.endswith(".wav")])
+    write(os.path.join(audio_dir, f"{name}_chunk_{index:04d}.wav"), 16000, data)
+    return time.perf_counter() - start
+
+
+def store_save(store: SegmentStore, name: str, data: np.ndarray) -> float:
+    start = time.perf_counter()
+    store.write_wav(store.next_name(name), 16000, data)
+    return time.perf_counter() - start
+
+
+def soak(label: str, save, count: int, streams: int, checkpoints: int = 5):
+    data = np.zeros(1600, dtype=np.int16)
+    per_stream = count // streams
+    timings = [np.empty(per_stream) for _ in range(streams)]
+
+    def run(stream: int):
+        for i in range(per_stream):
+            timings[stream][i] = save("shared", data)  # streams share a directory and prefix
+
+    threads = [threading.Thread(target=run, args=(s,)) for s in range(streams)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    merged = np.stack(timings, axis=1).reshape(-1) * 1000
+    step = len(merged) // checkpoints
+    windows = "  ".join(f"@{(i + 1) * step}: {merged[i * step:(i + 1) * step].mean():.3f}ms"
+                        for i in range(checkpoints))
+    print(f"{label:<8} {len(merged)} saves in {elapsed:.1f}s  mean per save by file count: {windows}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak-test segment naming and writes.")
+    parser.add_argument("--segments", type=int, default=100000)
+    parser.add_argument("--legacy-segments", type=int, default=10000,
+                        help="The listdir scan is quadratic overall; run it on fewer segments.")
+    parser.add_argument("--streams", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as audio_dir:
+        soak("listdir", lambda name, data: legacy_save(audio_dir, name, data), args.legacy_segments, args.streams)
+        names = [f for f in os.listdir(audio_dir) if f.endswith(".wav")]
+        print(f"listdir  {args.legacy_segments - len(names)} saves lost to name collisions")
+
+    with tempfile.TemporaryDirectory() as audio_dir:
+        store = SegmentStore(audio_dir)
+        soak("store", lambda name, data: store_save(store, name, data), args.segments, args.streams)
+        names = [f for f in os.listdir(audio_dir) if f.endswith(".wav")]
+        print(f"store    {args.segments - len(names)} saves lost to name collisions")
@@ -0,0 +1,60 @@
+# bench_vad.py
+#
+# Per-frame VAD latency: stateless get_speech_timestamps vs streaming VADIterator.
+# Run from the project root:  python -m benchmarks.bench_vad
+
+import argparse
+import time
+import numpy as np
+from app.services.vad_handler import SAMPLE_RATE, StreamingVAD, is_speech
+
+
+def make_frames(n_frames: int, frame_size: int, seed: int = 0) -> list[np.ndarray]:
+    """
+    Alternating tone bursts and low-level noise, as int16 frames.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(frame_size) / SAMPLE_RATE
+    frames = []
+    for i in range(n_frames):
+        noise = rng.normal(0, 300, frame_size)
+        if i % 4 < 2:
+            noise += 8000 * np.sin(2 * np.pi * 220 * t) * np.sin(2 * np.pi * 3 * t)
+        frames.append(np.clip(noise, -32768, 32767).astype(np.int16))
+    return frames
+
+
+def time_per_frame(fn, frames: list[np.ndarray]) -> np.ndarray:
+    timings = np.empty(len(frames))
+    for i, frame in enumerate(frames):
+        start = time.perf_counter()
+        fn(frame)
+        timings[i] = time.perf_counter() - start
+    return timings * 1000
+
+
+def report(label: str, timings_ms: np.ndarray, frame_ms: float):
+    p50, p95, p99 = np.percentile(timings_ms, [50, 95, 99])
+    print(f"{label:<12} mean={timings_ms.mean():7.2f} ms  p50={p50:7.2f}  p95={p95:7.2f}  "
+          f"p99={p99:7.2f}  max={timings_ms.max():7.2f}  budget used={timings_ms.mean() / frame_ms:6.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-frame VAD latency.")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--frame-ms", type=int, default=512)
+    args = parser.parse_args()
+
+    frame_size = int(SAMPLE_RATE * args.frame_ms / 1000)
+    frames = make_frames(args.frames, frame_size)
+
+    # Warm up both paths so JIT compilation is not counted.
+    streaming = StreamingVAD()
+    for frame in frames[:5]:
+        is_speech(frame)
+        streaming.is_speech(frame)
+    streaming.reset()
+
+    print(f"{args.frames} frames of {args.frame_ms} ms ({frame_size} samples @ {SAMPLE_RATE} Hz)")
+    report("timestamps", time_per_frame(is_speech, frames), args.frame_ms)
+    report("streaming", time_per_frame(streaming.is_speech, frames), args.frame_ms)
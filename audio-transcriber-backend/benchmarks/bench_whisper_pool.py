@@ -0,0 +1,73 @@
+# bench_whisper_pool.py
+#
+# Transcription throughput with 1..N Whisper replicas.
+# Run from the project root:  python -m benchmarks.bench_whisper_pool --max-replicas 4 --cpu-threads 4 --pin
+# Pass --wav to use recorded speech instead of the synthetic signal.
+
+import argparse
+import threading
+import time
+import numpy as np
+from app.services.resampler import StreamingResampler
+from app.services.segment_queue import AudioSegment, load_segment
+from app.services.whisper_pool import WhisperPool
+
+
+def load_segments(wav_path, count: int, seconds: float) -> list[AudioSegment]:
+    length = int(seconds * 16000)
+    if wav_path:
+        recording = load_segment(wav_path, "bench")
+        audio = StreamingResampler(recording.sample_rate, 16000).process(recording.audio)
+    else:
+        t = np.arange(length * 4) / 16000
+        audio = (0.3 * np.sin(2 * np.pi * 220 * t) * np.sin(2 * np.pi * 2 * t)).astype(np.float32)
+
+    segments = []
+    for i in range(count):
+        start = (i * length) % max(1, len(audio) - length)
+        segments.append(AudioSegment(source="bench", name=f"bench_{i:04d}", audio=audio[start:start + length],
+                                     sample_rate=16000))
+    return segments
+
+
+def run(pool: WhisperPool, segments: list[AudioSegment], batch_size: int) -> float:
+    done = threading.Semaphore(0)
+    batches = [segments[i:i + batch_size] for i in range(0, len(segments), batch_size)]
+
+    start = time.perf_counter()
+    for batch in batches:
+        while not pool.has_capacity():
+            time.sleep(0.005)
+        pool.submit(batch, lambda *_: done.release())
+    for _ in batches:
+        done.acquire()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Whisper pool scaling.")
+    parser.add_argument("--model", default="medium.en")
+    parser.add_argument("--max-replicas", type=int, default=4)
+    parser.add_argument("--cpu-threads", type=int, default=0)
+    parser.add_argument("--num-workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--segments", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--pin", action="store_true")
+    parser.add_argument("--wav")
+    args = parser.parse_args()
+
+    segments = load_segments(args.wav, args.segments, args.seconds)
+    baseline = None
+    for replicas in range(1, args.max_replicas + 1):
+        pool = WhisperPool(args.model, device="cpu", compute_type="int8", replicas=replicas,
+                           cpu_threads=args.cpu_threads, num_workers=args.num_workers, pin_cpus=args.pin)
+        pool.start()
+        run(pool, segments[:args.batch_size], args.batch_size)  # warm-up
+        elapsed = run(pool, segments, args.batch_size)
+        pool.stop()
+
+        throughput = len(segments) / elapsed
+        baseline = baseline or throughput
+        print(f"replicas={replicas}  {throughput:6.2f} segments/s  "
+              f"real-time factor {elapsed / (len(segments) * args.seconds):.3f}  speedup x{throughput / baseline:.2f}")
@@ -0,0 +1,55 @@
+import numpy as np
+from app.services.capture_ring import CaptureRing, CaptureStage, HistoryRing, ProcessingPool
+
+
+def test_ring_wraps_and_preserves_order():
+    ring = CaptureRing(capacity=8, channels=1, dtype=np.int16)
+    data = np.arange(20, dtype=np.int16).reshape(-1, 1)
+
+    ring.write(data[:6])
+    assert ring.read(4)[:, 0].tolist() == [0, 1, 2, 3]
+    ring.write(data[6:12])
+    assert ring.available() == 8
+    assert ring.read(8)[:, 0].tolist() == list(range(4, 12))
+    assert ring.read(1) is None
+
+
+def test_ring_drops_and_counts_when_full():
+    ring = CaptureRing(capacity=4, channels=2, dtype=np.float32)
+    written = ring.write(np.ones((6, 2), dtype=np.float32))
+    assert written == 4
+    assert ring.dropped_frames == 2
+
+
+def test_history_latest_is_contiguous_view_after_wrap():
+    history = HistoryRing(capacity=5)
+    history.extend(np.arange(3, dtype=np.float32))
+    history.extend(np.arange(3, 7, dtype=np.float32))
+
+    window = history.latest()
+    assert window.tolist() == [2, 3, 4, 5, 6]
+    assert window.base is history.data
+    assert history.latest(2).tolist() == [5, 6]
+
+
+def test_processing_pool_serves_many_stages_in_order():
+    pool = ProcessingPool(workers=2, max_blocks=2)
+    received = {i: [] for i in range(12)}
+    stages = [
+        CaptureStage(f"s{i}", channels=1, dtype=np.int16, block_size=4, capacity=64, sample_rate=16000,
+                     process_block=lambda block, t, i=i: received[i].append(block[:, 0].tolist()), pool=pool)
+        for i in range(12)
+    ]
+    pool.start()
+    for stage in stages:
+        stage.start()
+    for chunk in range(5):
+        for stage in stages:
+            stage.callback(np.arange(chunk * 8, chunk * 8 + 8, dtype=np.int16).reshape(-1, 1), 8, None, None)
+    for stage in stages:
+        stage.stop()
+    pool.stop()
+
+    expected = [list(range(i, i + 4)) for i in range(0, 40, 4)]
+    assert all(blocks == expected for blocks in received.values())
+    assert len(pool.threads) == 2
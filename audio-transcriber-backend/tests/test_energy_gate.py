@@ -0,0 +1,78 @@
+import numpy as np
+from app.services.energy_gate import EnergyGate, GatedVAD
+
+RATE = 16000
+
+
+def noise(seconds: float, level: float, seed: int = 0) -> np.ndarray:
+    return (np.random.default_rng(seed).standard_normal(int(seconds * RATE)) * level).astype(np.float32)
+
+
+def tone(seconds: float, amplitude: float) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (np.sin(2 * np.pi * 220 * t) * amplitude).astype(np.float32)
+
+
+def to_int16(samples: np.ndarray) -> np.ndarray:
+    return np.clip(samples * 32768, -32768, 32767).astype(np.int16)
+
+
+def test_digital_silence_and_noise_floor_are_skipped_but_speech_level_audio_is_not():
+    gate = EnergyGate(RATE)
+    assert gate.is_silence(np.zeros(8192, dtype=np.float32))
+    assert gate.is_silence(tone(0.5, 0.0005))  # ~-69 dBFS, under the initial floor margin
+    assert not gate.is_silence(tone(0.5, 0.1))
+    # A short burst inside an otherwise silent frame still goes to the VAD.
+    frame = np.zeros(8192, dtype=np.float32)
+    frame[4096:4608] = tone(0.032, 0.1)
+    assert not gate.is_silence(frame)
+
+
+def test_noise_floor_follows_background_only_while_vad_reports_no_speech():
+    gate = EnergyGate(RATE, rise_db_per_s=5.0)
+    hum = noise(0.5, 0.003)  # ~-50 dBFS
+    assert not gate.is_silence(hum)
+
+    for _ in range(20):
+        gate.update(hum, speech=True)
+    assert gate.floor_db == -60.0
+
+    for _ in range(20):
+        gate.update(hum, speech=False)
+    assert -53 < gate.floor_db < -49
+    assert gate.is_silence(hum)
+    assert not gate.is_silence(tone(0.5, 0.1))
+
+    gate.update(np.zeros(8192, dtype=np.float32), speech=False)  # digital silence says nothing about the room
+    assert gate.floor_db > -53
+    gate.update(noise(0.5, 0.0005), speech=False)
+    assert gate.floor_db < -63
+
+
+def test_floor_is_capped_so_loud_rooms_cannot_gate_out_speech():
+    gate = EnergyGate(RATE, rise_db_per_s=100.0)
+    for _ in range(50):
+        gate.update(noise(0.5, 0.1), speech=False)
+    assert gate.floor_db == gate.max_floor_db
+    assert gate.override_rms() > 0.025
+
+
+def test_gated_vad_skips_silence_and_defers_to_the_vad_inside_speech():
+    calls = []
+    state = {"speech": False}
+
+    def detect(frame):
+        calls.append(frame)
+        return bool(np.abs(frame).max() > 1000)
+
+    vad = GatedVAD(detect, EnergyGate(RATE), in_speech=lambda: state["speech"], name="test")
+    silence = np.zeros(8192, dtype=np.int16)
+    for _ in range(8):
+        assert vad(silence) is False
+    assert calls == [] and vad.skipped == 8
+
+    assert vad(to_int16(tone(0.5, 0.1))) is True
+    state["speech"] = True
+    assert vad(silence) is False  # the trailing silence must reach the VAD to end the utterance
+    assert len(calls) == 2
+    assert vad.skipped_fraction() == 0.8
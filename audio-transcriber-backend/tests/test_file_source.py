@@ -0,0 +1,73 @@
+import queue
+import threading
+import numpy as np
+from scipy.io.wavfile import write
+from app.services.capture_ring import CaptureStage, ProcessingPool
+from app.services.capture_stream import CaptureStream
+from app.services.file_source import FileSource, to_capture_format
+from app.services.segment_queue import AudioSegment
+
+
+def test_replay_delivers_every_block_with_file_clock(tmp_path):
+    path = str(tmp_path / "speech.wav")
+    data = np.arange(8000, dtype=np.int16)
+    write(path, 8000, data)
+
+    blocks, times = [], []
+    stage = CaptureStage("replay", channels=1, dtype=np.int16, block_size=800, capacity=1600, sample_rate=8000,
+                         process_block=lambda block, capture_time: (blocks.append(block[:, 0]), times.append(capture_time)))
+    stage.start()
+    played = FileSource(path, stage, threading.Event(), speed=0, start_time=1000.0, tail_silence_s=0.1).run()
+    stage.stop()
+
+    assert played == 1.1
+    assert stage.ring.dropped_frames == 0  # The source waits for the consumer instead of dropping
+    assert np.array_equal(np.concatenate(blocks)[:8000], data)
+    assert np.allclose(times, 1000.0 + np.arange(len(blocks)) * 0.1)
+
+
+def test_capture_format_conversion():
+    stereo = np.array([[16384, -16384], [32767, 32767]], dtype=np.int16)
+    assert to_capture_format(stereo, 1, np.int16)[:, 0].tolist() == [0, 32767]
+    assert to_capture_format(stereo, 2, np.float32).tolist() == [[0.5, -0.5], [32767 / 32768, 32767 / 32768]]
+
+
+class _CountingStream(CaptureStream):
+    def __init__(self, config, stop_event, processing_pool=None):
+        super().__init__(config, stop_event, processing_pool=processing_pool)
+        self.samples = 0
+
+    def process_frame(self, block, capture_time):
+        self.samples += len(block)
+
+
+def test_capture_stream_replays_through_shared_pool(tmp_path):
+    path = str(tmp_path / "speech.wav")
+    write(path, 16000, np.zeros(16000, dtype=np.int16))
+    config = {"name": "replayed", "sample_rate": 44100, "frame_duration_ms": 100, "path_audio": str(tmp_path / "audio"),
+              "save_audio": False, "input_file": path, "replay_speed": 0}
+
+    pool = ProcessingPool(workers=1)
+    pool.start()
+    stream = _CountingStream(config, threading.Event(), processing_pool=pool)
+    stream.start()
+    stream.replay_thread.join()
+    assert not stream.is_alive() and stream.replay_done
+    stream.stop()
+    pool.stop()
+
+    assert stream.sample_rate == 16000  # taken from the file, not the config
+    assert stream.samples == 16000 + 2 * 16000  # the file plus the closing silence
+
+
+def test_live_capture_drops_segments_when_the_transcription_queue_is_full(tmp_path):
+    config = {"name": "live", "sample_rate": 16000, "frame_duration_ms": 30, "path_audio": str(tmp_path / "audio"),
+              "save_audio": False}
+    segments = queue.Queue(maxsize=1)
+    stream = CaptureStream(config, threading.Event(), segments)
+
+    for name in ("a", "b"):
+        stream.hand_off(AudioSegment("live", name, np.zeros(160, dtype=np.float32), 16000))
+
+    assert segments.get_nowait().name == "a"
+    assert stream.dropped_segments == 1
@@ -0,0 +1,40 @@
+import json
+from app.services.metrics import Metrics, MetricsExporter, profiled
+
+
+def test_histogram_summary_and_prometheus_text():
+    registry = Metrics()
+    histogram = registry.histogram("vad_seconds", "VAD time per frame", buckets=(0.001, 0.01, 0.1), source="mic")
+    for value in [0.0005] * 90 + [0.05] * 10:
+        histogram.observe(value)
+    dropped = [3]
+    registry.counter("capture_dropped_frames_total", lambda: dropped[0], source="mic")
+
+    summary = histogram.summary()
+    assert summary["count"] == 100 and summary["max"] == 0.05
+    assert summary["p50"] <= 0.001 < summary["p95"] <= 0.05
+
+    text = registry.prometheus()
+    assert "# TYPE vad_seconds histogram" in text
+    assert 'vad_seconds_bucket{source="mic",le="0.001"} 90' in text
+    assert 'vad_seconds_bucket{source="mic",le="+Inf"} 100' in text
+    assert 'vad_seconds_count{source="mic"} 100' in text
+    assert 'capture_dropped_frames_total{source="mic"} 3' in text
+
+
+def test_exporter_writes_final_snapshot(tmp_path):
+    registry = Metrics()
+    registry.histogram("whisper_decode_seconds", replica="0").observe(1.5)
+    path = tmp_path / "metrics.jsonl"
+    exporter = MetricsExporter(registry, snapshot_path=str(path), interval=60)
+    exporter.start()
+    exporter.stop()
+
+    snapshot = json.loads(path.read_text().splitlines()[-1])
+    assert snapshot["histograms"]['whisper_decode_seconds{replica="0"}']["count"] == 1
+
+
+def test_profiled_target_is_named_after_its_stage():
+    run = profiled(lambda x: x * 2, "mic-capture")
+    assert run(21) == 42
+    assert run.__code__.co_name == "stage_mic_capture"
@@ -0,0 +1,18 @@
+import threading
+from app.services.model_registry import ModelRegistry
+
+
+def test_model_loads_once_across_threads():
+    registry = ModelRegistry()
+    calls = []
+    registry.register("model", lambda: calls.append(1) or "weights", warmup=lambda value: None)
+
+    threads = registry.preload("model") + [threading.Thread(target=registry.get, args=("model",)) for _ in range(4)]
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.get("model") == "weights"
+    assert calls == [1]
+    assert [label for label, _, _ in registry.timeline] == ["model: load", "model: warm-up"]
@@ -0,0 +1,38 @@
+from app.services.partial_transcriber import LocalAgreement
+
+
+def test_words_are_committed_once_two_hypotheses_agree():
+    agreement = LocalAgreement()
+    assert agreement.update(["I", "think"]) == ["I", "think"]
+    assert agreement.committed == []
+
+    assert agreement.update(["I", "think", "we"]) == ["we"]
+    assert agreement.committed == ["I", "think"]
+
+    assert agreement.update(["I", "think", "we", "should"]) == ["should"]
+    assert agreement.committed == ["I", "think", "we"]
+
+
+def test_committed_words_never_change():
+    agreement = LocalAgreement()
+    for words in (["I", "think", "we"], ["I", "think", "we", "should"]):
+        agreement.update(words)
+    assert agreement.committed == ["I", "think", "we"]
+
+    # A revised hypothesis is shown from where it diverges but commits nothing
+    assert agreement.update(["Hi", "thing", "we", "should", "go"]) == ["Hi", "thing", "we", "should", "go"]
+    assert agreement.update(["Hi", "thing", "we", "should", "go", "now"]) == ["Hi", "thing", "we", "should", "go", "now"]
+    assert agreement.committed == ["I", "think", "we"]
+
+    # Agreement resumes past the committed words once hypotheses start with them again
+    assert agreement.update(["I", "think", "we", "should", "go"]) == ["should", "go"]
+    assert agreement.update(["I", "think", "we", "should", "go", "now"]) == ["now"]
+    assert agreement.committed == ["I", "think", "we", "should", "go"]
+
+
+def test_shorter_hypothesis_keeps_the_committed_words():
+    agreement = LocalAgreement()
+    agreement.update(["hello", "there"])
+    agreement.update(["hello", "there", "friend"])
+    assert agreement.update(["hello"]) == []
+    assert agreement.committed == ["hello", "there"]
@@ -0,0 +1,23 @@
+import numpy as np
+from scipy.signal import resample_poly
+from app.services.resampler import StreamingResampler
+
+
+def test_block_size_does_not_change_output():
+    x = np.random.default_rng(0).standard_normal(44100)
+    whole = StreamingResampler(44100, 16000).process(x)
+
+    blocked = StreamingResampler(44100, 16000)
+    parts = np.concatenate([blocked.process(x[i:i + 1000]) for i in range(0, len(x), 1000)])
+
+    np.testing.assert_allclose(parts, whole, atol=1e-6)
+
+
+def test_matches_resample_poly_away_from_edges():
+    t = np.arange(48000) / 48000
+    x = np.sin(2 * np.pi * 440 * t)
+    resampler = StreamingResampler(48000, 16000)
+    streamed = resampler.process(x)
+    reference = resample_poly(x, resampler.up, resampler.down)
+
+    np.testing.assert_allclose(streamed[100:15000], reference[100:15000], atol=1e-5)
@@ -0,0 +1,71 @@
+import threading
+import pytest
+import numpy as np
+from app.services.segment_store import SegmentStore, read_audio
+
+
+def test_names_are_unique_across_threads(tmp_path):
+    store = SegmentStore(str(tmp_path))
+    names = []
+
+    def take():
+        for _ in range(500):
+            names.append(store.next_name("mic"))
+
+    threads = [threading.Thread(target=take) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(names)) == 2000
+
+
+def test_counter_resumes_after_existing_files(tmp_path):
+    (tmp_path / "remote_chunk_0041.wav").write_bytes(b"")
+    (tmp_path / "remote_chunk_0007.wav").write_bytes(b"")
+    store = SegmentStore(str(tmp_path))
+
+    assert store.next_name("remote") == "remote_chunk_0042"
+    assert store.next_name("mic") == "mic_chunk_0000"
+
+
+def test_write_renames_into_place(tmp_path):
+    store = SegmentStore(str(tmp_path))
+    path = store.write_wav("mic_chunk_0000", 16000, np.zeros(160, dtype=np.int16))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["mic_chunk_0000.wav"]
+    assert path == str(tmp_path / "mic_chunk_0000.wav")
+
+
+def test_retention_evicts_oldest_beyond_max_bytes(tmp_path):
+    data = np.zeros(1600, dtype=np.int16)
+    store = SegmentStore(str(tmp_path), max_bytes=3 * (2 * len(data) + 44))
+    for _ in range(5):
+        store.write(store.next_name("mic"), 16000, data)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["mic_chunk_0002.wav", "mic_chunk_0003.wav", "mic_chunk_0004.wav"]
+    assert store.evicted == 2
+
+
+def test_flac_round_trip(tmp_path):
+    pytest.importorskip("soundfile")
+    store = SegmentStore(str(tmp_path), "flac")
+    data = (np.sin(np.arange(1600) / 10) * 10000).astype(np.int16)
+    path = store.write("mic_chunk_0000", 16000, data)
+
+    rate, audio = read_audio(path)
+    assert path.endswith(".flac") and rate == 16000
+    assert np.array_equal(np.rint(audio * 32768).astype(np.int16), data)
+    assert SegmentStore(str(tmp_path)).next_name("mic") == "mic_chunk_0001"
+
+
+def test_shared_directory_rejects_different_settings(tmp_path):
+    audio_dir = str(tmp_path / "shared")
+    store = SegmentStore.for_dir(audio_dir, "wav", max_bytes=1024)
+    assert SegmentStore.for_dir(audio_dir, "wav", max_bytes=1024) is store
+
+    with pytest.raises(ValueError, match="already used"):
+        SegmentStore.for_dir(audio_dir, "flac", max_bytes=1024)
+    with pytest.raises(ValueError, match="already used"):
+        SegmentStore.for_dir(audio_dir, "wav")
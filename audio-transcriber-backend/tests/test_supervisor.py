@@ -0,0 +1,111 @@
+import threading
+import time
+import pytest
+from app.services import supervisor
+from app.services.supervisor import StreamSupervisor, stream_config, strategy_name
+from app.stream_config import MIC_CONFIG, REMOTE_CONFIG
+
+
+class FakeStream:
+    instances = []
+    fail_construction = 0  # how many of the next constructions raise
+
+    def __init__(self, config, stop_event, segment_queue=None, partials=None, processing_pool=None):
+        if FakeStream.fail_construction:
+            FakeStream.fail_construction -= 1
+            raise FileNotFoundError(config.get("input_file"))
+        self.config = config
+        self.alive = False
+        self.stopped = False
+        self.replay_done = False
+        FakeStream.instances.append(self)
+
+    def start(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def stop(self):
+        self.alive = False
+        self.stopped = True
+
+
+@pytest.fixture
+def fake_strategy(monkeypatch):
+    FakeStream.instances = []
+    FakeStream.fail_construction = 0
+    monkeypatch.setitem(supervisor.STRATEGIES, "fake", (FakeStream, MIC_CONFIG))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_definition_is_laid_over_its_strategy_defaults():
+    config = stream_config({"name": "desk", "strategy": "remote", "sample_rate": 48000})
+
+    assert config["strategy"] == "remote"
+    assert config["sample_rate"] == 48000
+    assert config["frame_duration_ms"] == REMOTE_CONFIG["frame_duration_ms"]
+    assert config["path_audio"] == "data/desk/audio"
+    assert config["speaker"] == "desk"
+    assert stream_config({"name": "desk", "path_audio": "elsewhere"})["path_audio"] == "elsewhere"
+
+
+def test_strategy_falls_back_to_the_stream_name_then_mic():
+    assert strategy_name({"name": "remote"}) == "remote"
+    assert strategy_name({"name": "desk"}) == "mic"
+    assert strategy_name({"name": "remote", "strategy": "mic"}) == "mic"
+    with pytest.raises(ValueError):
+        stream_config({"name": "desk", "strategy": "no-such-strategy"})
+
+
+def test_stopped_stream_is_restarted(fake_strategy):
+    stop_event = threading.Event()
+    sup = StreamSupervisor([stream_config({"name": "a", "strategy": "fake"})], stop_event, vad_workers=1,
+                           restart_backoff=(0, 0), check_interval=0.01)
+    sup.start()
+    monitor = threading.Thread(target=sup.run)
+    monitor.start()
+    try:
+        assert len(FakeStream.instances) == 1
+        FakeStream.instances[0].alive = False  # device went away
+        wait_for(lambda: len(FakeStream.instances) == 2 and FakeStream.instances[1].alive)
+        assert FakeStream.instances[0].stopped
+        assert sup.status()["a"]["restarts"] == 1
+    finally:
+        stop_event.set()
+        monitor.join()
+
+
+def test_constructor_error_schedules_a_restart_instead_of_raising(fake_strategy):
+    FakeStream.fail_construction = 1
+    stop_event = threading.Event()
+    configs = [stream_config({"name": "broken", "strategy": "fake", "input_file": "missing.wav"}),
+               stream_config({"name": "ok", "strategy": "fake"})]
+    sup = StreamSupervisor(configs, stop_event, vad_workers=1, restart_backoff=(0, 0), check_interval=0.01)
+
+    sup.start()  # must not raise, and the other stream still starts
+    assert [stream.config["name"] for stream in FakeStream.instances] == ["ok"]
+
+    monitor = threading.Thread(target=sup.run)
+    monitor.start()
+    try:
+        wait_for(lambda: sup.status()["broken"]["running"])
+        assert sup.status()["broken"]["restarts"] == 1
+    finally:
+        stop_event.set()
+        monitor.join()
+
+
+def test_streams_sharing_a_directory_must_agree_on_storage(tmp_path):
+    definitions = tmp_path / "streams.json"
+    definitions.write_text('{"streams": ['
+                           '{"name": "a", "path_audio": "data/shared"}, '
+                           '{"name": "b", "path_audio": "data/shared", "audio_format": "flac"}]}')
+    with pytest.raises(ValueError, match="share path_audio"):
+        supervisor.load_stream_definitions(str(definitions))
@@ -0,0 +1,68 @@
+from app.services.timeline import TimelineMerger
+
+
+def test_entries_wait_for_every_source_then_emit_in_capture_order():
+    emitted = []
+    merger = TimelineMerger(["mic", "remote"], on_entry=emitted.append, max_delay=10.0)
+
+    merger.add("mic", "me", 100.0, 101.0, "hello")
+    merger.add("mic", "me", 103.0, 104.0, "anyone there?")
+    assert emitted == []  # remote has not reported past 100 yet
+
+    merger.add("remote", "them", 102.0, 103.0, "hi")
+    assert [e["text"] for e in emitted] == ["hello", "hi"]
+
+    merger.flush()
+    assert [e["text"] for e in emitted] == ["hello", "hi", "anyone there?"]
+
+
+def test_quiet_source_times_out_and_stragglers_are_flagged_late():
+    emitted = []
+    merger = TimelineMerger(["mic", "remote"], on_entry=emitted.append, max_delay=10.0)
+
+    merger.add("mic", "me", 100.0, 101.0, "first")
+    merger.poll(now=105.0)
+    assert emitted == []
+    merger.poll(now=110.0)
+    assert [e["text"] for e in emitted] == ["first"]
+
+    merger.add("remote", "them", 99.0, 100.0, "straggler")
+    assert emitted[-1]["text"] == "straggler" and emitted[-1]["late"]
+
+
+def test_pending_entries_are_bounded():
+    emitted = []
+    merger = TimelineMerger(["mic", "remote"], on_entry=emitted.append, max_pending=3)
+    for i in range(10):
+        merger.add("mic", "me", float(i), float(i) + 1, str(i))
+    assert len(merger.pending) == 3
+    assert [e["text"] for e in emitted] == [str(i) for i in range(7)]
+
+
+def test_out_of_order_transcripts_wait_for_earlier_segments_in_flight():
+    emitted = []
+    merger = TimelineMerger(["mic", "remote"], on_entry=emitted.append, max_delay=10.0)
+    merger.expect("mic", 100.0)
+    merger.expect("mic", 105.0)
+    merger.add("remote", "them", 110.0, 111.0, "remote")
+
+    # Another replica finishes the later mic segment first
+    merger.add("mic", "me", 105.0, 106.0, "second")
+    assert emitted == []
+
+    merger.add("mic", "me", 100.0, 101.0, "first")
+    assert [e["text"] for e in emitted] == ["first", "second"]
+    assert merger.late == 0
+
+
+def test_cancelled_segment_releases_the_watermark():
+    emitted = []
+    merger = TimelineMerger(["mic", "remote"], on_entry=emitted.append, max_delay=10.0)
+    merger.expect("mic", 100.0)
+    merger.expect("mic", 105.0)
+    merger.add("remote", "them", 110.0, 111.0, "remote")
+    merger.add("mic", "me", 105.0, 106.0, "spoken")
+    assert emitted == []
+
+    merger.cancel("mic", 100.0)  # silence: no text for the earlier segment
+    assert [e["text"] for e in emitted] == ["spoken"]
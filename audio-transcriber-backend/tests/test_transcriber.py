@@ -0,0 +1,98 @@
+import queue
+import time
+import numpy as np
+from app.services.segment_queue import AudioSegment
+from app.services.transcriber import TranscriptionScheduler
+
+
+class FakeHandler:
+    def __init__(self):
+        self.results = []
+
+    def on_result(self, segment, segments, language):
+        self.results.append(segment.name)
+
+
+class FakePool:
+    """
+    Completes every batch as soon as it is submitted, unless closed.
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.open = True
+
+    def has_capacity(self) -> bool:
+        return self.open
+
+    def outstanding(self) -> int:
+        return 0
+
+    def submit(self, batch, on_done):
+        self.batches.append([segment.name for segment in batch])
+        on_done(batch, [[] for _ in batch], "en", None)
+
+
+def segment(source: str, name: str, closed_at: float = None) -> AudioSegment:
+    return AudioSegment(source=source, name=name, audio=np.zeros(1600, dtype=np.float32), sample_rate=16000,
+                        closed_at=time.monotonic() if closed_at is None else closed_at)
+
+
+def scheduler(batch_size: int, max_wait: float):
+    segments = queue.Queue()
+    handlers = {"mic": FakeHandler(), "remote": FakeHandler()}
+    pool = FakePool()
+    return TranscriptionScheduler(segments, handlers, pool, batch_size=batch_size, max_wait=max_wait), segments, pool
+
+
+def test_sources_are_drained_round_robin():
+    sched, segments, pool = scheduler(batch_size=2, max_wait=10.0)
+    for name in ("m1", "m2", "m3"):
+        segments.put(segment("mic", name))
+    segments.put(segment("remote", "r1"))
+
+    sched.step()  # collect
+    sched.step()
+    sched.step()
+
+    assert pool.batches == [["m1", "r1"], ["m2", "m3"]]
+    assert sched.handlers["mic"].results == ["m1", "m2", "m3"]
+    assert sched.completed == 4 and sched.idle()
+
+
+def test_partial_batch_waits_for_the_deadline():
+    sched, segments, pool = scheduler(batch_size=4, max_wait=0.1)
+    segments.put(segment("mic", "fresh"))
+
+    sched.step()  # collect
+    sched.step()  # oldest has not waited max_wait yet
+    assert pool.batches == []
+
+    time.sleep(0.1)
+    sched.step()
+    assert pool.batches == [["fresh"]]
+
+
+def test_overdue_segment_is_dispatched_at_once():
+    sched, segments, pool = scheduler(batch_size=4, max_wait=0.5)
+    segments.put(segment("remote", "old", closed_at=time.monotonic() - 1.0))
+
+    sched.step()  # collect
+    sched.step()
+    assert pool.batches == [["old"]]
+
+
+def test_nothing_is_dispatched_while_the_pool_is_busy():
+    sched, segments, pool = scheduler(batch_size=1, max_wait=0.0)
+    pool.open = False
+    segments.put(segment("mic", "m1"))
+    segments.put(segment("mic", "m2"))
+
+    sched.step()
+    sched.step()
+    assert pool.batches == []
+
+    pool.open = True
+    sched.step()
+    sched.step()
+    assert pool.batches == [["m1"], ["m2"]]
@@ -0,0 +1,42 @@
+import json
+from app.services.transcript_store import TranscriptStore, compact, parse_timestamp
+
+
+def record(source, created_at, text):
+    return {"source": source, "created_at": created_at, "text": text}
+
+
+def test_range_query_by_source_and_time(tmp_path):
+    store = TranscriptStore(str(tmp_path))
+    store.append(record("remote", "2025-06-01T10:04:00Z", "before"))
+    store.append(record("remote", "2025-06-01T10:10:00Z", "inside"))
+    store.append(record("mic", "2025-06-01T10:12:00Z", "other source"))
+    store.append(record("remote", "2025-06-01T10:06:00Z", "inside, out of order"))
+    store.append(record("remote", "2025-06-01T10:20:00Z", "at end"))
+
+    texts = [r["text"] for r in store.query("remote", parse_timestamp("2025-06-01T10:05:00Z"),
+                                            parse_timestamp("2025-06-01T10:20:00Z"))]
+    assert texts == ["inside, out of order", "inside"]
+
+
+def test_reopen_indexes_lines_missing_from_index(tmp_path):
+    store = TranscriptStore(str(tmp_path))
+    store.append(record("mic", "2025-06-01T10:00:00Z", "indexed"))
+    with open(store.log_path, "a", encoding="utf-8") as log:
+        log.write(json.dumps(record("mic", "2025-06-01T10:01:00Z", "not indexed")) + "\n")
+        log.write('{"source": "mic", "created')
+
+    reopened = TranscriptStore(str(tmp_path))
+    assert [r["text"] for r in reopened.query("mic")] == ["indexed", "not indexed"]
+
+
+def test_compact_per_chunk_json(tmp_path):
+    chunks = tmp_path / "mic" / "transcripts"
+    chunks.mkdir(parents=True)
+    for i, minute in enumerate([3, 1, 2]):
+        (chunks / f"mic_chunk_{i:04d}.json").write_text(
+            json.dumps(record("mic", f"2025-06-01T10:0{minute}:00Z", f"minute {minute}")))
+
+    assert compact([str(chunks)], str(tmp_path / "session"), remove=True) == 3
+    assert [r["text"] for r in TranscriptStore(str(tmp_path / "session")).query()] == ["minute 1", "minute 2", "minute 3"]
+    assert not list(chunks.iterdir())
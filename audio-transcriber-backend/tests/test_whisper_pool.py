@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from app.services.segment_queue import AudioSegment
+from app.services.whisper_pool import transcribe_batch, MAX_CLIP_SECONDS
+
+
+class FakeBatchedModel:
+    """
+    Returns one segment per clip, with timestamps on the concatenated audio
+    as BatchedInferencePipeline does.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, clip_timestamps, batch_size, **kwargs):
+        self.calls.append((len(audio), clip_timestamps, batch_size))
+        segments = [SimpleNamespace(start=clip["start"] + 0.1, end=clip["end"], text=f"clip {i}")
+                    for i, clip in enumerate(clip_timestamps)]
+        return iter(segments), SimpleNamespace(language="en")
+
+
+def segment(name: str, seconds: float) -> AudioSegment:
+    return AudioSegment(source="mic", name=name, audio=np.zeros(int(seconds * 16000), dtype=np.float32),
+                        sample_rate=16000)
+
+
+def test_clips_map_back_to_their_segments():
+    model = FakeBatchedModel()
+    batch = [segment("a", 2.0), segment("b", 3.0)]
+
+    results, language = transcribe_batch(model, batch, beam_size=5)
+
+    _, clips, batch_size = model.calls[0]
+    assert clips == [{"start": 0.0, "end": 2.0}, {"start": 2.0, "end": 5.0}]
+    assert batch_size == 2
+    assert language == "en"
+    assert [[s["text"] for s in r] for r in results] == [["clip 0"], ["clip 1"]]
+    # Timestamps are relative to the start of their own segment
+    assert results[1][0]["start"] == pytest.approx(0.1) and results[1][0]["end"] == pytest.approx(3.0)
+
+
+def test_long_segments_are_split_into_several_clips():
+    model = FakeBatchedModel()
+    batch = [segment("short", 1.0), segment("long", 2 * MAX_CLIP_SECONDS + 5), segment("after", 1.0)]
+
+    results, _ = transcribe_batch(model, batch, beam_size=5)
+
+    samples, clips, batch_size = model.calls[0]
+    assert samples == int((2 * MAX_CLIP_SECONDS + 7) * 16000)
+    assert batch_size == len(clips) == 5
+    assert all(clip["end"] - clip["start"] <= MAX_CLIP_SECONDS for clip in clips)
+    assert [[s["text"] for s in r] for r in results] == [["clip 0"], ["clip 1", "clip 2", "clip 3"], ["clip 4"]]
+    assert [s["start"] for s in results[1]] == pytest.approx([0.1, MAX_CLIP_SECONDS + 0.1, 2 * MAX_CLIP_SECONDS + 0.1])
+
+
+def test_each_replica_decodes_num_workers_batches_at_once(monkeypatch):
+    import threading
+    import time
+    from app.services import whisper_pool
+
+    class FakePipeline:
+        def __init__(self, model):
+            self.model = model
+
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def slow_batch(batched_model, batch, beam_size):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        return [[] for _ in batch], "en"
+
+    monkeypatch.setattr(whisper_pool, "WhisperModel", lambda *args, **kwargs: object())
+    monkeypatch.setattr(whisper_pool, "BatchedInferencePipeline", FakePipeline)
+    monkeypatch.setattr(whisper_pool, "warm_up", lambda batched_model: None)
+    monkeypatch.setattr(whisper_pool, "transcribe_batch", slow_batch)
+    monkeypatch.setattr(whisper_pool.registry, "get", lambda key: "model-path")
+
+    pool = whisper_pool.WhisperPool("tiny", device="cpu", compute_type="int8", num_workers=3)
+    pool.start()
+    done = []
+    for _ in range(3):
+        assert pool.has_capacity()
+        pool.submit([segment("a", 1.0)], lambda *args: done.append(args))
+    assert not pool.has_capacity()
+    pool.stop()
+
+    assert len(done) == 3 and peak[0] == 3
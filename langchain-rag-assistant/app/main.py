@@ -1,18 +1,21 @@
 import os
 import sys
+import copy
 import json
+import time
 from pathlib import Path
-from datetime import datetime
 
 import streamlit as st
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OllamaEmbeddings
-from langchain_community.chat_models import ChatOllama
-from langchain.chains import RetrievalQA
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
-from raglib.ingest import extract_text_and_images
+from raglib.ingest import default_workers, image_refs, materialize_images
+from raglib.incremental import fingerprint, is_unchanged, same_content, sync_pdf, remove_pdf
+from raglib.resources import index_version
+from app.resources import (get_embedder, get_vectorstore, get_qa_chain, get_manifest, get_answer_cache,
+                           invalidate_index_resources)
+
+script_started = time.perf_counter()  # Streamlit re-runs the whole script on every interaction
 
 # --- Streamlit Setup ---
 st.set_page_config(page_title="Document Search Assistant", layout="wide")
@@ -21,6 +24,32 @@ with st.sidebar:
 
 # --- Embedding Model ---
 embedding_model = "nomic-embed-text"  # Replace with another Ollama embedding model if needed
+ollama_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")  # Point at a stub server to test ingestion
+embed_batch_size = 32  # Chunks per /api/embed request
+embed_concurrency = 4  # Embedding requests in flight; match OLLAMA_NUM_PARALLEL on the server
+embedding_cache_mb = 512  # Size bound of the embedding cache shared by all containers (LRU eviction)
+
+# --- PDF Extraction ---
+extract_workers = default_workers()  # Processes extracting page ranges in parallel; 1 = sequential
+# Chunks embedded and written to Chroma per batch; bounds ingest memory. Each batch is one embed_documents
+# call, so it must span embed_concurrency requests for them to run in parallel.
+ingest_batch_size = embed_batch_size * embed_concurrency
+image_mode = "lazy"  # "lazy": record image references, write PNGs when shown; "eager": write them at ingest
+
+# --- LLM ---
+llm_model = "mistral"
+retriever_k = 3  # Chunks retrieved per question
+
+# --- Answer Cache ---
+answer_cache_threshold = 0.93  # Cosine similarity at which a rephrased question reuses a cached answer
+answer_cache_ttl_s = 3600  # Seconds an answer is reused before the question is answered again
+answer_cache_entries = 512  # Answers kept across all containers (LRU eviction)
+
+# Keys of the cached resources in app/resources.py
+embedder_settings = (embedding_model, ollama_url, embed_batch_size, embed_concurrency,
+                     "containers/embedding_cache.sqlite", embedding_cache_mb)
+llm_settings = (llm_model, ollama_url, 0.2)
+answer_cache = get_answer_cache(answer_cache_threshold, answer_cache_ttl_s, answer_cache_entries)
 
 # --- Container Management ---
 with st.sidebar:
@@ -43,9 +72,11 @@ with st.sidebar:
     else:
         container_path = container_root / selected_container
         data_dir = container_path / "data"
+        image_dir = data_dir / "images"  # One PNG per distinct image, shared by every PDF in the container
         index_dir = container_path / "chroma_index"
         ingested_path = container_path / "ingested_files.json"
-        ingested_data = json.load(open(ingested_path)) if ingested_path.exists() else {}
+        version = index_version(container_path)
+        ingested_data = get_manifest(str(container_path), version)
 
 # --- Display Ingested Files ---
 if ingested_data:
@@ -56,72 +87,109 @@ if ingested_data:
 # --- File Upload ---
 uploaded_files = st.file_uploader("Upload PDF files", type=["pdf"], accept_multiple_files=True)
 if uploaded_files:
+    # The uploader keeps its files across reruns: handle each upload once per session, not on every query
+    handled = st.session_state.setdefault("handled_uploads", set())
     for file in uploaded_files:
+        if (str(data_dir), file.file_id) in handled:
+            continue
         out_path = data_dir / file.name
-        if not out_path.exists():
+        # Replace a PDF when a new version is uploaded, but leave it (and its mtime) alone if it is identical
+        if not same_content(out_path, file.getbuffer()):
             with open(out_path, "wb") as f:
                 f.write(file.getbuffer())
+        handled.add((str(data_dir), file.file_id))
     st.success("File(s) uploaded.")
 
 # --- Ingestion ---
 if st.button("Ingest Uploaded Files"):
-    embedder = OllamaEmbeddings(model=embedding_model)
-    db = Chroma(persist_directory=str(index_dir), embedding_function=embedder)
+    embedder = get_embedder(*embedder_settings)
+    hits, misses = embedder.hits, embedder.misses
+    db = get_vectorstore(str(index_dir), version, embedder_settings)
+    ingested_data = copy.deepcopy(ingested_data)  # the cached manifest stays as loaded until the new one is written
     splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
 
     pdfs = [f for f in os.listdir(data_dir) if f.endswith(".pdf")]
     progress = st.progress(0)
     errors = []
+    summary = []
+
+    for fname in [f for f in ingested_data if f not in pdfs]:
+        try:
+            removed = remove_pdf(str(data_dir / fname), ingested_data[fname], db)
+            del ingested_data[fname]  # kept in the manifest on failure, so the removal is retried next time
+            summary.append(f"{fname}: removed ({removed} chunks)")
+        except Exception as e:
+            errors.append(f"{fname}: {e}")
 
     for i, fname in enumerate(pdfs):
-        if fname in ingested_data:
-            progress.progress((i + 1) / len(pdfs))
-            continue
+        pdf_path = str(data_dir / fname)
+        entry = ingested_data.get(fname)
         try:
-            pdf_path = str(data_dir / fname)
-            docs = extract_text_and_images(pdf_path, image_dir=str(data_dir))
-            chunks = splitter.split_documents(docs)
-            db.add_documents(chunks)
+            current = fingerprint(pdf_path, entry)
+            if is_unchanged(entry, current):
+                entry.update(current)  # a touched but identical file only gets its new mtime
+                progress.progress((i + 1) / len(pdfs))
+                continue
+            ingested_data[fname], stats = sync_pdf(pdf_path, entry, current, image_dir=str(image_dir), db=db,
+                                                   splitter=splitter, workers=extract_workers,
+                                                   batch_size=ingest_batch_size, image_mode=image_mode)
             db.persist()
-
-            ingested_data[fname] = {
-                "timestamp": datetime.now().isoformat(),
-                "pages": len(docs)
-            }
+            summary.append(f"{fname}: {stats}")
         except Exception as e:
             errors.append(f"{fname}: {e}")
         progress.progress((i + 1) / len(pdfs))
 
     with open(ingested_path, "w") as f:
         json.dump(ingested_data, f, indent=2)
+    invalidate_index_resources(str(container_path), str(index_dir), version, embedder_settings, llm_settings,
+                               retriever_k)
+    answer_cache.invalidate(str(container_path))
+    version = index_version(container_path)
 
     if errors:
         st.error("Some files failed:\n" + "\n".join(errors))
     else:
         st.success("All files ingested.")
+    if summary:
+        st.markdown("\n".join(f"- {line}" for line in summary))
+    hits, misses = embedder.hits - hits, embedder.misses - misses
+    if hits or misses:
+        st.info(f"Embedding cache: {hits} of {hits + misses} chunks reused "
+                f"({hits / (hits + misses):.0%}), {misses} embedded by Ollama.")
 
 # --- Query Interface ---
 st.subheader("Ask a Question")
 query = st.text_input("Enter your question:")
 
 if query and index_dir.exists():
-    embedder = OllamaEmbeddings(model=embedding_model)
-    db = Chroma(persist_directory=str(index_dir), embedding_function=embedder)
-
-    llm = ChatOllama(model="mistral", temperature=0.2)
-    qa = RetrievalQA.from_chain_type(
-        llm=llm,
-        retriever=db.as_retriever(search_kwargs={"k": 3}),
-        return_source_documents=True
-    )
-
-    result = qa(query)
+    # Queries are embedded by the same client as the indexed chunks (/api/embed returns normalized vectors)
+    qa = get_qa_chain(str(index_dir), version, embedder_settings, llm_settings, retriever_k)
+    setup_ms = (time.perf_counter() - script_started) * 1000
+
+    started = time.perf_counter()
+    # The embedder keeps recent query vectors in memory, so the retriever does not embed the question again
+    scope = (str(container_path), version)
+    vector = get_embedder(*embedder_settings).embed_query(query)
+    cached = answer_cache.lookup(scope, query, vector)
+    result = cached.result if cached else qa(query)
+    if not cached:
+        answer_cache.store(scope, query, vector, result)
     st.subheader("Answer")
     st.write(result["result"])
+    if cached and cached.question != query:
+        st.caption(f"Cached answer to a similar question: \"{cached.question}\"")
+    st.caption(f"Script overhead before the QA call: {setup_ms:.1f} ms; retrieval and answer: "
+               f"{time.perf_counter() - started:.1f} s" + (" (from the answer cache)" if cached else ""))
 
     st.subheader("Sources")
-    for doc in result["source_documents"]:
+    for i, doc in enumerate(result["source_documents"]):
         meta = doc.metadata
         st.markdown(f"**{Path(meta.get('source', '')).name}**, Page {meta.get('page')}")
         snippet = doc.page_content[:500] + "..." if len(doc.page_content) > 500 else doc.page_content
         st.markdown(snippet)
+        if meta.get("images") and st.checkbox("Show page images", key=f"images_{i}"):
+            paths = materialize_images(meta["source"], meta["images"], str(image_dir), page=meta.get("page"))
+            for path in paths:
+                st.image(path)
+            if len(paths) < len(image_refs(meta["images"])):
+                st.warning("Some images changed since this file was ingested; ingest it again to show them.")
@@ -0,0 +1,56 @@
+import streamlit as st
+from raglib.answer_cache import AnswerCache
+from raglib.embedding_cache import EmbeddingCache
+from raglib.resources import load_manifest, build_embedder, open_vectorstore, build_llm, build_qa_chain
+
+# Streamlit-cached resources, built once per server process and shared by reruns and sessions.
+# They live in a module rather than in main.py so a rerun does not re-decorate them.
+# Everything tied to a container's index takes its index_version, which changes when an
+# ingest finishes, so other processes pick up new documents too.
+
+
+@st.cache_resource
+def get_embedding_cache(path: str, max_mb: int) -> EmbeddingCache:
+    return EmbeddingCache(path, max_bytes=max_mb * 1024 * 1024)
+
+
+@st.cache_resource
+def get_embedder(model: str, base_url: str, batch_size: int, concurrency: int, cache_path: str, cache_mb: int):
+    return build_embedder(model, base_url, get_embedding_cache(cache_path, cache_mb), batch_size, concurrency)
+
+
+@st.cache_resource
+def get_llm(model: str, base_url: str, temperature: float):
+    return build_llm(model, base_url, temperature)
+
+
+@st.cache_resource(max_entries=16)
+def get_vectorstore(index_dir: str, version: int, embedder_settings: tuple):
+    return open_vectorstore(index_dir, get_embedder(*embedder_settings))
+
+
+@st.cache_resource(max_entries=16)
+def get_qa_chain(index_dir: str, version: int, embedder_settings: tuple, llm_settings: tuple, k: int):
+    return build_qa_chain(get_llm(*llm_settings), get_vectorstore(index_dir, version, embedder_settings), k=k)
+
+
+@st.cache_resource
+def get_answer_cache(threshold: float, ttl: float, max_entries: int) -> AnswerCache:
+    # Scoped per (container, index version) internally, so one cache serves every container
+    return AnswerCache(threshold=threshold, ttl=ttl, max_entries=max_entries)
+
+
+@st.cache_resource(max_entries=16)
+def get_manifest(container_path: str, version: int) -> dict:
+    return load_manifest(container_path)
+
+
+def invalidate_index_resources(container_path: str, index_dir: str, version: int, embedder_settings: tuple,
+                               llm_settings: tuple, k: int):
+    """
+    Drop what was built for one container's index at `version`; called after
+    an ingest into it. Other containers keep theirs.
+    """
+    get_vectorstore.clear(index_dir, version, embedder_settings)
+    get_qa_chain.clear(index_dir, version, embedder_settings, llm_settings, k)
+    get_manifest.clear(container_path, version)
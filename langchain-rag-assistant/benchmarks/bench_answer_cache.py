@@ -0,0 +1,117 @@
+# bench_answer_cache.py
+#
+# Answer cache on a skewed stream of questions: a few popular questions asked
+# again verbatim, re-typed (case/punctuation) or reworded, plus questions that
+# only differ in a number. Reports hit rate by kind, wrong hits and mean latency
+# per question with and without the cache. Runs against the local Ollama stub
+# (bag-of-words embeddings, fixed-latency chat) unless --base-url is given.
+# Run from the project root:  python -m benchmarks.bench_answer_cache [--questions 300]
+
+import argparse
+import random
+import time
+
+import requests
+from benchmarks.ollama_stub import OllamaStub
+from raglib.answer_cache import AnswerCache
+from raglib.embeddings import OllamaBatchEmbeddings
+
+TOPICS = [
+    ("What are the nutritional benefits of oyster mushrooms?",
+     "what are the nutritional benefits of oyster mushrooms",
+     "What nutritional benefits do oyster mushrooms have?"),
+    ("How do I reset the device to factory settings?",
+     "how do i reset the device to factory settings",
+     "How can I reset the device to its factory settings?"),
+    ("Which warranty terms apply to the battery?",
+     "WHICH WARRANTY TERMS APPLY TO THE BATTERY",
+     "Which warranty terms apply for the battery?"),
+    ("What is the recommended cleaning schedule for the filter?",
+     "what is the recommended cleaning schedule for the filter??",
+     "What is the recommended schedule for cleaning the filter?"),
+]
+NUMBERED = "What does section {} of the manual say about installation?"
+
+
+def question_stream(n: int, seed: int = 0) -> list:
+    """
+    (question, topic id, kind) tuples; popular topics follow a Zipf-like skew.
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(TOPICS))]
+    stream = []
+    for _ in range(n):
+        if rng.random() < 0.2:
+            section = rng.choice(["3.1", "3.2", "4.1", "7.5"])
+            stream.append((NUMBERED.format(section), f"section {section}", "numbered"))
+            continue
+        topic = rng.choices(range(len(TOPICS)), weights)[0]
+        kind = rng.choices(["verbatim", "retyped", "reworded"], [0.5, 0.25, 0.25])[0]
+        text = TOPICS[topic][{"verbatim": 0, "retyped": 1, "reworded": 2}[kind]]
+        stream.append((text, f"topic {topic}", kind))
+    return stream
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the semantic answer cache.")
+    parser.add_argument("--questions", type=int, default=300)
+    parser.add_argument("--threshold", type=float, default=0.93)
+    parser.add_argument("--base-url", help="Ollama server (default: start a local stub)")
+    parser.add_argument("--chat-latency", type=float, default=0.5, help="Stub only: seconds per answer")
+    args = parser.parse_args()
+
+    stub = None
+    base_url = args.base_url
+    if base_url is None:
+        stub = OllamaStub(chat_latency=args.chat_latency).__enter__()
+        base_url = stub.url
+
+    embedder = OllamaBatchEmbeddings(base_url=base_url)
+    session = requests.Session()
+
+    def answer(question: str) -> dict:
+        reply = session.post(f"{base_url}/api/chat", json={
+            "model": "mistral", "stream": False, "messages": [{"role": "user", "content": question}]
+        }, timeout=300).json()
+        return {"result": reply["message"]["content"], "topic": None}
+
+    try:
+        stream = question_stream(args.questions)
+        cache = AnswerCache(threshold=args.threshold)
+        scope = ("bench", 1)
+        asked = {kind: 0 for kind in ("verbatim", "retyped", "reworded", "numbered")}
+        hits = dict.fromkeys(asked, 0)
+        wrong = 0
+        started = time.perf_counter()
+        for question, topic, kind in stream:
+            asked[kind] += 1
+            vector = embedder.embed_query(question)
+            entry = cache.lookup(scope, question, vector)
+            if entry is not None:
+                hits[kind] += 1
+                wrong += entry.result["topic"] != topic
+                continue
+            result = answer(question)
+            result["topic"] = topic
+            cache.store(scope, question, vector, result)
+        cached_time = (time.perf_counter() - started) / len(stream)
+
+        sample = stream[:20]
+        started = time.perf_counter()
+        for question, _, _ in sample:
+            answer(question)
+        uncached_time = (time.perf_counter() - started) / len(sample)
+
+        stats = cache.stats()
+        print(f"{len(stream)} questions, threshold {args.threshold}")
+        for kind in asked:
+            print(f"  {kind:<9s} asked={asked[kind]:<5d} answered from cache={hits[kind]:<5d} "
+                  f"({hits[kind] / max(asked[kind], 1):.0%})")
+        print(f"hit rate={stats['hit_rate']:.1%} (exact {stats['exact_hits']}, semantic {stats['semantic_hits']}), "
+              f"wrong answers from cache={wrong}, entries={stats['entries']}")
+        print(f"mean latency per question: {uncached_time * 1000:.0f} ms uncached, {cached_time * 1000:.0f} ms cached "
+              f"({uncached_time / cached_time:.1f}x)")
+    finally:
+        embedder.close()
+        if stub:
+            stub.__exit__(None, None, None)
@@ -0,0 +1,59 @@
+# bench_embedding_cache.py
+#
+# Re-ingesting slightly changed text with the content-addressed embedding cache:
+# hit rate, embedding requests and time for a cold run, an edited re-ingest and a
+# second container holding the same document. Runs against the local Ollama stub.
+# Run from the project root:  python -m benchmarks.bench_embedding_cache [--chunks 2000 --changed 0.05]
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_embeddings import make_chunks
+from benchmarks.ollama_stub import OllamaStub
+from raglib.embedding_cache import CachedEmbeddings, EmbeddingCache, text_hash
+from raglib.embeddings import OllamaBatchEmbeddings
+
+
+def ingest(label: str, chunks: list, cache: EmbeddingCache, stub: OllamaStub, batch_size: int = 64):
+    embedder = CachedEmbeddings(OllamaBatchEmbeddings(base_url=stub.url, batch_size=16, concurrency=4),
+                                cache, model="nomic-embed-text")
+    requests = stub.requests
+    started = time.perf_counter()
+    for start in range(0, len(chunks), batch_size):  # the batches ingest_pdf hands to the vector store
+        embedder.embed_documents(chunks[start:start + batch_size])
+    elapsed = time.perf_counter() - started
+    embedder.close()
+    print(f"{label:<28s} {elapsed:7.2f}s  {len(chunks) / elapsed:8.1f} chunks/s  hit rate={embedder.hit_rate():6.1%}  "
+          f"embedding requests={stub.requests - requests}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the embedding cache on re-ingestion.")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--changed", type=float, default=0.05, help="Fraction of chunks edited before re-ingest")
+    parser.add_argument("--max-mb", type=float, default=512)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    edited = list(chunks)
+    for i in random.Random(0).sample(range(len(chunks)), int(len(chunks) * args.changed)):
+        edited[i] = edited[i].replace("lorem", "revised", 1)
+    reflowed = [chunk.replace(" ", "\n", 3) for chunk in chunks]  # same text, different line breaks
+
+    with tempfile.TemporaryDirectory() as tmp, OllamaStub() as stub:
+        cache = EmbeddingCache(Path(tmp) / "embedding_cache.sqlite", max_bytes=int(args.max_mb * 1024 * 1024))
+        ingest("cold", chunks, cache, stub)
+        ingest(f"re-ingest, {args.changed:.0%} edited", edited, cache, stub)
+        ingest("other container, reflowed", reflowed, cache, stub)
+
+        started = time.perf_counter()
+        for start in range(0, len(chunks), 64):
+            cache.get_many("nomic-embed-text", [text_hash(chunk) for chunk in chunks[start:start + 64]])
+        lookup = (time.perf_counter() - started) / len(chunks)
+        size = Path(tmp, "embedding_cache.sqlite").stat().st_size
+        print(f"cache: {cache.entries()} vectors, {size / 1e6:.1f} MB on disk, "
+              f"{lookup * 1e6:.0f} us per cached chunk, {cache.evicted} evicted")
+        cache.close()
@@ -0,0 +1,65 @@
+# bench_embeddings.py
+#
+# Chunks/second of OllamaBatchEmbeddings across batch sizes and concurrency.
+# batch=1 / concurrency=1 is the one-request-per-chunk pattern of plain OllamaEmbeddings.
+# Run from the project root:
+#   python -m benchmarks.bench_embeddings                       # against a local stub server
+#   python -m benchmarks.bench_embeddings --base-url http://localhost:11434 --chunks 256
+
+import argparse
+import time
+
+from benchmarks.ollama_stub import OllamaStub
+from raglib.embeddings import OllamaBatchEmbeddings
+
+
+def make_chunks(n: int) -> list:
+    return [f"Chunk {i}: " + "lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 14 for i in range(n)]
+
+
+def run(base_url: str, model: str, chunks: list, batch_size: int, concurrency: int) -> tuple[float, dict]:
+    embedder = OllamaBatchEmbeddings(model=model, base_url=base_url, batch_size=batch_size,
+                                     concurrency=concurrency, backoff=0.05)
+    try:
+        started = time.perf_counter()
+        vectors = embedder.embed_documents(chunks)
+        elapsed = time.perf_counter() - started
+        assert len(vectors) == len(chunks)
+        return len(chunks) / elapsed, embedder.stats()
+    finally:
+        embedder.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched, concurrent Ollama embedding.")
+    parser.add_argument("--base-url", help="Ollama server (default: start a local stub)")
+    parser.add_argument("--model", default="nomic-embed-text")
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="Stub only: fraction of 503 replies")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    stub = None
+    base_url = args.base_url
+    if base_url is None:
+        stub = OllamaStub(failure_rate=args.failure_rate).__enter__()
+        base_url = stub.url
+        print(f"Stub server at {base_url}: {stub.request_latency * 1000:.0f} ms/request + "
+              f"{stub.text_latency * 1000:.0f} ms/text, 4 parallel slots, {args.failure_rate:.0%} failures")
+
+    try:
+        baseline = None
+        for batch_size in args.batch_sizes:
+            for concurrency in args.concurrency:
+                connections = stub.connections if stub else 0
+                rate, stats = run(base_url, args.model, chunks, batch_size, concurrency)
+                baseline = baseline or rate
+                opened = f"  connections={stub.connections - connections}" if stub else ""
+                print(f"batch={batch_size:<4d} concurrency={concurrency:<3d} {rate:8.1f} chunks/s  "
+                      f"speedup={rate / baseline:5.2f}x  requests={stats['requests']:<5d} "
+                      f"retries={stats['retries']}{opened}")
+    finally:
+        if stub:
+            stub.__exit__(None, None, None)
@@ -0,0 +1,71 @@
+# bench_extract.py
+#
+# PDF extraction throughput (pages/second) for different worker counts.
+# Run from the project root:
+#   python -m benchmarks.bench_extract                     # synthetic 1,000-page PDF
+#   python -m benchmarks.bench_extract --pdf manual.pdf --workers 1 2 4 8
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from raglib.ingest import iter_pages
+
+
+def make_pdf(path: Path, pages: int):
+    """
+    A text-heavy PDF with a repeated logo and a page-specific figure on every page.
+    """
+    logo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    logo.clear_with(200)
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_image(fitz.Rect(20, 20, 84, 84), pixmap=logo)
+        figure = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 128, 96), False)
+        figure.clear_with(number % 256)
+        page.insert_image(fitz.Rect(72, 500, 328, 692), pixmap=figure)
+        text = " ".join(f"Section {number}.{line}: lorem ipsum dolor sit amet, consectetur adipiscing elit."
+                        for line in range(30))
+        page.insert_textbox(fitz.Rect(72, 100, 540, 490), text, fontsize=9)
+    doc.save(str(path))
+
+
+def run(pdf_path: str, workers: int) -> tuple[int, float]:
+    image_dir = Path(tempfile.mkdtemp(prefix="bench_extract_"))
+    try:
+        started = time.perf_counter()
+        pages = 0
+        last = 0
+        for document in iter_pages(pdf_path, str(image_dir), workers=workers):
+            assert document.metadata["page"] == last + 1, "pages out of order"
+            last = document.metadata["page"]
+            pages += 1
+        return pages, time.perf_counter() - started
+    finally:
+        shutil.rmtree(image_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark PDF page extraction across worker counts.")
+    parser.add_argument("--pdf", help="PDF to extract (default: a generated one)")
+    parser.add_argument("--pages", type=int, default=1000, help="Pages in the generated PDF")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = str(Path(tmp) / "synthetic.pdf")
+            make_pdf(Path(pdf_path), args.pages)
+
+        baseline = None
+        for workers in args.workers:
+            pages, elapsed = run(pdf_path, workers)
+            rate = pages / elapsed
+            baseline = baseline or rate
+            print(f"workers={workers:<3d} pages={pages:<6d} {elapsed:7.2f}s  {rate:8.1f} pages/s  "
+                  f"speedup={rate / baseline:4.2f}x")
@@ -0,0 +1,70 @@
+# bench_images.py
+#
+# Image handling cost during extraction: the original per-page PNG export vs
+# content-hash deduplication vs lazy (reference-only) extraction, over a
+# container of PDFs that share a logo and repeat figures.
+# Run from the project root:  python -m benchmarks.bench_images [--pdfs 2 --pages 500]
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from benchmarks.bench_extract import make_pdf
+from raglib.ingest import iter_pages
+
+
+def legacy_export(pdf_path: str, image_dir: Path) -> int:
+    """
+    The original behaviour: every image on every page re-encoded as <pdf>_p<page>_<index>.png.
+    """
+    image_dir.mkdir(parents=True, exist_ok=True)
+    pdf_name = Path(pdf_path).stem
+    pages = 0
+    with fitz.open(pdf_path) as doc:
+        for page_number, page in enumerate(doc, start=1):
+            page.get_text()
+            for idx, img in enumerate(page.get_images(full=True)):
+                pix = fitz.Pixmap(doc, img[0])
+                if pix.n not in (1, 3):
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+                pix.save(str(image_dir / f"{pdf_name}_p{page_number}_{idx}.png"))
+            pages += 1
+    return pages
+
+
+def disk_usage(image_dir: Path) -> tuple[int, int]:
+    files = list(image_dir.glob("*.png")) if image_dir.exists() else []
+    return len(files), sum(f.stat().st_size for f in files)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark image export modes during extraction.")
+    parser.add_argument("--pdfs", type=int, default=2, help="PDFs in the container (they share a logo)")
+    parser.add_argument("--pages", type=int, default=500, help="Pages per PDF")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdfs = []
+        for n in range(args.pdfs):
+            pdfs.append(str(Path(tmp) / f"manual_{n}.pdf"))
+            make_pdf(Path(pdfs[-1]), args.pages)
+
+        results = {}
+        for mode in ("legacy", "eager", "lazy"):
+            image_dir = Path(tmp) / f"images_{mode}"
+            started = time.perf_counter()
+            for pdf in pdfs:
+                if mode == "legacy":
+                    legacy_export(pdf, image_dir)
+                else:
+                    for _ in iter_pages(pdf, str(image_dir), image_mode=mode):
+                        pass
+            results[mode] = (time.perf_counter() - started, *disk_usage(image_dir))
+
+        legacy_time, _, legacy_bytes = results["legacy"]
+        print(f"{args.pdfs} PDFs x {args.pages} pages")
+        for mode, (elapsed, files, size) in results.items():
+            print(f"{mode:<7s} {elapsed:7.2f}s  files={files:<6d} disk={size / 1e6:8.2f} MB  "
+                  f"time saved={1 - elapsed / legacy_time:6.1%}  disk saved={1 - size / max(legacy_bytes, 1):6.1%}")
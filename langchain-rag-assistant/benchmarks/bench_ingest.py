@@ -0,0 +1,80 @@
+# bench_ingest.py
+#
+# Peak RSS of ingesting PDFs of growing size: the old path (extract every page,
+# split everything, one add_documents call) vs the streaming pipeline.
+# Each measurement runs in a fresh process so peak RSS is not shared.
+# Run from the project root:  python -m benchmarks.bench_ingest --pages 250 1000 4000
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_extract import make_pdf
+
+EMBEDDING_DIM = 768  # nomic-embed-text
+
+
+class NullStore:
+    """
+    Stands in for Chroma: "embeds" each chunk into a vector of the real size, then drops it.
+    """
+
+    def __init__(self):
+        self.chunks = 0
+
+    def add_documents(self, documents):
+        vectors = [[float(len(doc.page_content))] * EMBEDDING_DIM for doc in documents]
+        self.chunks += len(vectors)
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def child(mode: str, pdf_path: str, image_dir: str, batch_size: int):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from raglib.ingest import extract_text_and_images
+    from raglib.pipeline import ingest_pdf
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+    store = NullStore()
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    if mode == "list":
+        docs = extract_text_and_images(pdf_path, image_dir)
+        store.add_documents(splitter.split_documents(docs))
+    else:
+        ingest_pdf(pdf_path, image_dir, store, splitter, batch_size=batch_size)
+    print(f"{peak_rss_mb():.1f} {peak_rss_mb() - baseline:.1f} {store.chunks} {time.perf_counter() - started:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark peak memory of list vs streaming ingestion.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[250, 1000, 4000])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "PDF", "IMAGE_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, batch_size=args.batch_size)
+        sys.exit()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = Path(tmp) / f"synthetic_{pages}.pdf"
+            make_pdf(pdf_path, pages)
+            for mode in ("list", "stream"):
+                image_dir = Path(tmp) / f"images_{pages}_{mode}"
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_ingest", "--batch-size", str(args.batch_size),
+                     "--child", mode, str(pdf_path), str(image_dir)],
+                    capture_output=True, text=True, check=True
+                ).stdout.split()
+                peak, growth, chunks, elapsed = out[-4:]
+                print(f"pages={pages:<6d} mode={mode:<7s} chunks={chunks:<7s} peak RSS={peak:>7s} MB  "
+                      f"growth={growth:>7s} MB  time={elapsed}s")
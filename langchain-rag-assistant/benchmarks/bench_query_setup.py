@@ -0,0 +1,66 @@
+# bench_query_setup.py
+#
+# Per-query overhead of the Streamlit app before the QA call, with the cached
+# resource layer warm vs rebuilt on every rerun (as before caching). Drives
+# app/main.py through Streamlit's AppTest against the local Ollama stub, so no
+# browser or model is needed.
+# Run from the project root:  python -m benchmarks.bench_query_setup [--queries 20]
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from benchmarks.bench_extract import make_pdf
+from benchmarks.ollama_stub import OllamaStub
+
+APP = str(Path(__file__).resolve().parent.parent / "app" / "main.py")
+
+
+def overhead_ms(app: AppTest) -> float:
+    for caption in app.caption:
+        match = re.search(r"before the QA call: ([\d.]+) ms", caption.value)
+        if match:
+            return float(match.group(1))
+    raise RuntimeError(f"No timing caption; exceptions: {app.exception}")
+
+
+def run_queries(app: AppTest, queries: int, rebuild: bool) -> list:
+    timings = []
+    for i in range(queries):
+        if rebuild:
+            st.cache_resource.clear()
+        app.text_input[0].set_value(f"What does section {i}.1 say?").run()
+        timings.append(overhead_ms(app))
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-query setup overhead of the Streamlit app.")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, OllamaStub(chat_latency=0.05) as stub:
+        os.chdir(tmp)
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+        data_dir = Path("containers/bench/data")
+        data_dir.mkdir(parents=True)
+        Path("containers/bench/chroma_index").mkdir()
+        make_pdf(data_dir / "manual.pdf", args.pages)
+
+        app = AppTest.from_file(APP, default_timeout=300)
+        app.run()
+        next(button for button in app.button if button.label == "Ingest Uploaded Files").click().run()
+        if app.exception:
+            sys.exit(f"Ingest failed: {app.exception}")
+
+        for label, rebuild in (("rebuilt every rerun", True), ("cached resources", False)):
+            timings = run_queries(app, args.queries, rebuild)
+            print(f"{label:<20s} mean={statistics.mean(timings):7.1f} ms  median={statistics.median(timings):7.1f} ms  "
+                  f"max={max(timings):7.1f} ms  (first: {timings[0]:.1f} ms)")
@@ -0,0 +1,133 @@
+# ollama_stub.py
+#
+# A local stand-in for Ollama's /api/embed and /api/chat, for benchmarking and exercising
+# the app without a model. Embedding latency is modelled as a fixed cost per request plus a
+# cost per text, with requests served by at most `parallel` threads (like OLLAMA_NUM_PARALLEL),
+# and a fraction of embedding requests can fail with 503 to exercise retries. Chat replies
+# are a canned answer after `chat_latency` seconds.
+# Standalone:  python -m benchmarks.ollama_stub --port 11435
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import socket
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+@lru_cache(maxsize=65536)
+def _word_vector(word: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha1(word.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dim)
+
+
+def fake_embedding(text: str, dim: int) -> list:
+    """
+    Deterministic bag-of-words vector: texts sharing most of their words are
+    close, so near-duplicate questions behave roughly as with a real model.
+    """
+    words = re.findall(r"\w+", text.lower()) or [""]
+    vector = sum(_word_vector(word, dim) for word in words)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class OllamaStub:
+    def __init__(self, port: int = 0, dim: int = 768, request_latency: float = 0.02,
+                 text_latency: float = 0.004, parallel: int = 4, failure_rate: float = 0.0,
+                 chat_latency: float = 1.0):
+        self.dim = dim
+        self.request_latency = request_latency
+        self.text_latency = text_latency
+        self.failure_rate = failure_rate
+        self.fail_next = 0  # the next this many embedding requests fail with 503 (deterministic failures for tests)
+        self.chat_latency = chat_latency
+        self.chats = 0
+        self.slots = threading.Semaphore(parallel)
+        self.requests = 0
+        self.connections = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                stub.connections += 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.path == "/api/chat":
+                    self._chat(body)
+                    return
+                stub.requests += 1
+                texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                with stub.slots:
+                    failing = stub.fail_next > 0
+                    stub.fail_next -= failing
+                if failing or random.random() < stub.failure_rate:
+                    self._reply(503, {"error": "busy"})
+                    return
+                with stub.slots:
+                    time.sleep(stub.request_latency + stub.text_latency * len(texts))
+                self._reply(200, {"model": body["model"],
+                                  "embeddings": [fake_embedding(text, stub.dim) for text in texts]})
+
+            def _chat(self, body: dict):
+                stub.chats += 1
+                time.sleep(stub.chat_latency)
+                question = body["messages"][-1]["content"].strip().splitlines()[-1]
+                message = {"role": "assistant", "content": f"Stub answer to: {question}"}
+                reply = {"model": body["model"], "message": message, "done": True, "done_reason": "stop"}
+                if body.get("stream", True):  # newline-delimited chunks, ending with done=true
+                    data = (json.dumps({**reply, "done": False}) + "\n" +
+                            json.dumps({**reply, "message": {"role": "assistant", "content": ""}}) + "\n")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Content-Length", str(len(data.encode("utf-8"))))
+                    self.end_headers()
+                    self.wfile.write(data.encode("utf-8"))
+                else:
+                    self._reply(200, reply)
+
+            def _reply(self, status: int, payload: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake Ollama /api/embed endpoint.")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    with OllamaStub(args.port, failure_rate=args.failure_rate) as stub:
+        print(f"Ollama stub on {stub.url}; Ctrl+C to stop")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
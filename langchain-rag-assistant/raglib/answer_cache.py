@@ -0,0 +1,141 @@
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def question_key(question: str) -> str:
+    """
+    Exact-match key: lowercase words without punctuation, so "What is X?" and "what is x" match.
+    """
+    return " ".join(re.findall(r"\w+", question.lower()))
+
+
+def question_numbers(question: str) -> tuple:
+    return tuple(sorted(re.findall(r"\d+(?:\.\d+)*", question)))
+
+
+class CachedAnswer:
+    def __init__(self, question: str, vector: np.ndarray, result: dict):
+        self.question = question
+        self.numbers = question_numbers(question)
+        self.vector = vector
+        self.result = result
+        self.created = time.time()
+        self.hits = 0
+
+
+class AnswerCache:
+    """
+    In-memory cache of QA results for exact and near-duplicate questions.
+
+    Entries are scoped by (container, index version): a question is only
+    answered from results computed against the same index, and storing into
+    a newer version of a container drops that container's older entries.
+    A question matches an entry if its normalized words are identical, or
+    if the cosine similarity of the question embeddings is at least
+    `threshold` and both mention the same numbers ("section 3.2" is not
+    "section 3.3", however similar the embeddings). Entries expire after
+    `ttl` seconds and the least recently used are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, threshold: float = 0.93, ttl: float = 3600.0, max_entries: int = 512):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: OrderedDict = OrderedDict()  # (scope, question_key) -> CachedAnswer, oldest first
+        self.versions = {}  # container -> index version of its entries
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self, now: float):
+        while self.entries:
+            key, entry = next(iter(self.entries.items()))
+            if now - entry.created < self.ttl:
+                # Entries are in use order, not creation order; expired ones further in are caught on lookup.
+                break
+            del self.entries[key]
+
+    def lookup(self, scope: tuple, question: str, vector) -> Optional[CachedAnswer]:
+        container, version = scope
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            if self.versions.get(container) != version:
+                self.misses += 1
+                return None
+
+            key = (scope, question_key(question))
+            entry = self.entries.get(key)
+            if entry is not None and now - entry.created < self.ttl:
+                self.exact_hits += 1
+            else:
+                entry = self._nearest(scope, question, self._unit(vector), now)
+                if entry is None:
+                    self.misses += 1
+                    return None
+                key = (scope, question_key(entry.question))
+                self.semantic_hits += 1
+
+            entry.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+    def _nearest(self, scope: tuple, question: str, vector: np.ndarray, now: float) -> Optional[CachedAnswer]:
+        numbers = question_numbers(question)
+        candidates = [entry for (entry_scope, _), entry in self.entries.items()
+                      if entry_scope == scope and entry.numbers == numbers and now - entry.created < self.ttl]
+        if not candidates:
+            return None
+        similarities = np.stack([entry.vector for entry in candidates]) @ vector
+        best = int(np.argmax(similarities))
+        return candidates[best] if similarities[best] >= self.threshold else None
+
+    def store(self, scope: tuple, question: str, vector, result: dict):
+        container, version = scope
+        with self.lock:
+            if self.versions.get(container) != version:
+                self._drop(container)
+                self.versions[container] = version
+            key = (scope, question_key(question))
+            self.entries[key] = CachedAnswer(question, self._unit(vector), result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def _drop(self, container: str):
+        for key in [key for key in self.entries if key[0][0] == container]:
+            del self.entries[key]
+
+    def invalidate(self, container: str):
+        """
+        Forget every answer for a container, e.g. after new documents were ingested.
+        """
+        with self.lock:
+            self._drop(container)
+            self.versions.pop(container, None)
+        logger.info(f"Answer cache cleared for {container}")
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.semantic_hits) / total if total else 0.0,
+            }
@@ -0,0 +1,181 @@
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """
+    Unicode NFC with runs of whitespace collapsed, so re-extracted text that
+    only differs in line breaks or spacing maps to the same cache entry.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding store in SQLite, keyed by (model, hash of normalized text).
+
+    One file serves every container, so the same chunk embedded for two
+    containers (or two versions of a PDF) is computed once. Vectors are
+    stored as float32. Lookups refresh `last_used`; once the stored vectors
+    exceed `max_bytes` the least recently used ones are deleted.
+    """
+
+    def __init__(self, path, max_bytes: int = 512 * 1024 * 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")  # Readers in other Streamlit sessions do not block writers
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+        self.evicted = 0
+
+    def get_many(self, model: str, hashes: list) -> dict:
+        """
+        {text_hash: vector} for the hashes that are cached.
+        """
+        found = {}
+        with self.lock:
+            for start in range(0, len(hashes), 500):  # stay under SQLite's bound-parameter limit
+                batch = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.db.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self.db.executemany("UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                                    [(now, model, key) for key in found])
+                self.db.commit()
+        return found
+
+    def put_many(self, model: str, items: dict):
+        """
+        Store {text_hash: vector} and evict least recently used entries if over max_bytes.
+        """
+        now = time.time()
+        rows = [(model, key, array("f", vector).tobytes(), now) for key, vector in items.items()]
+        with self.lock:
+            replaced = 0
+            for start in range(0, len(rows), 500):
+                batch = [key for _, key, _, _ in rows[start:start + 500]]
+                replaced += self.db.execute(
+                    f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(batch))})", [model, *batch]
+                ).fetchone()[0]
+            self.db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self.total_bytes += sum(len(blob) for _, _, blob, _ in rows) - replaced
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.db.commit()
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9)  # Free a little extra so eviction does not run on every insert
+        rows = self.db.execute("SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_used")
+        victims = []
+        freed = 0
+        for model, key, size in rows:
+            if self.total_bytes - freed <= target:
+                break
+            victims.append((model, key))
+            freed += size
+        self.db.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", victims)
+        self.total_bytes -= freed
+        self.evicted += len(victims)
+        logger.info(f"Embedding cache evicted {len(victims)} vectors ({freed / 1e6:.1f} MB)")
+
+    def entries(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings implementation with an EmbeddingCache: only texts
+    missing from the cache (and each of them once) reach the embedder.
+
+    Queries are user questions, not document text: they are kept in a small
+    in-memory LRU of `query_cache_size` entries instead of the shared file,
+    so they are neither persisted nor compete with chunk vectors for space.
+    """
+
+    def __init__(self, embedder: Embeddings, cache: EmbeddingCache, model: str, query_cache_size: int = 256):
+        self.embedder = embedder
+        self.cache = cache
+        self.model = model
+        self.query_cache_size = query_cache_size
+        self.queries: OrderedDict = OrderedDict()  # text_hash -> vector, least recently used first
+        self.query_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: list) -> list:
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.model, list(dict.fromkeys(hashes)))
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            embedded = dict(zip(missing, self.embedder.embed_documents(list(missing.values()))))
+            self.cache.put_many(self.model, embedded)
+            vectors.update(embedded)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return [vectors[key] for key in hashes]
+
+    def embed_query(self, text: str) -> list:
+        key = text_hash(text)
+        with self.query_lock:
+            if key in self.queries:
+                self.queries.move_to_end(key)
+                return self.queries[key]
+        vector = self.embedder.embed_query(text)
+        with self.query_lock:
+            self.queries[key] = vector
+            while len(self.queries) > self.query_cache_size:
+                self.queries.popitem(last=False)
+        return vector
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self):
+        if hasattr(self.embedder, "close"):
+            self.embedder.close()
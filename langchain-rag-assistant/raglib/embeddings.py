@@ -0,0 +1,94 @@
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class EmbeddingError(RuntimeError):
+    pass
+
+
+class OllamaBatchEmbeddings(Embeddings):
+    """
+    Ollama embeddings for bulk ingestion.
+
+    Texts are sent `batch_size` at a time to Ollama's batch endpoint
+    (/api/embed), with up to `concurrency` requests in flight over one
+    pooled keep-alive session. Connection errors, timeouts and 429/5xx
+    responses are retried up to `max_retries` times with exponential
+    backoff and jitter. Results come back in input order.
+    """
+
+    def __init__(self, model: str = "nomic-embed-text", base_url: str = "http://localhost:11434",
+                 batch_size: int = 32, concurrency: int = 4, max_retries: int = 4,
+                 backoff: float = 0.5, max_backoff: float = 8.0, timeout: float = 120.0):
+        self.model = model
+        self.url = base_url.rstrip("/") + "/api/embed"
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed")
+
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.texts = 0
+
+    def _post(self, texts: list) -> list:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.url, json={"model": self.model, "input": texts},
+                                             timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    embeddings = response.json()["embeddings"]
+                    if len(embeddings) != len(texts):
+                        raise EmbeddingError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+                    with self.lock:
+                        self.requests += 1
+                        self.texts += len(texts)
+                    return embeddings
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+
+            if attempt == self.max_retries:
+                raise EmbeddingError(f"Embedding {len(texts)} texts failed after {attempt + 1} attempts: {error}")
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+            with self.lock:
+                self.retries += 1
+            logger.warning(f"Embedding request failed ({error}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def embed_documents(self, texts: list) -> list:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._post(batches[0])
+        return [vector for batch in self.pool.map(self._post, batches) for vector in batch]
+
+    def embed_query(self, text: str) -> list:
+        return self._post([text])[0]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"requests": self.requests, "retries": self.retries, "texts": self.texts}
+
+    def close(self):
+        self.pool.shutdown()
+        self.session.close()
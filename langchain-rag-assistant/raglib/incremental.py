@@ -0,0 +1,164 @@
+import os
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from raglib.embedding_cache import text_hash
+from raglib.ingest import iter_pages
+from raglib.pipeline import BATCH_SIZE, batched
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def same_content(path, data) -> bool:
+    """
+    Whether the file at `path` holds exactly `data`; sizes are compared first,
+    so a differing upload is usually told apart without reading the file.
+    """
+    path = Path(path)
+    if not path.exists() or path.stat().st_size != len(data):
+        return False
+    return file_sha256(str(path)) == hashlib.sha256(data).hexdigest()
+
+
+def fingerprint(path: str, previous: dict = None) -> dict:
+    """
+    (size, mtime, sha256) of a file. The hash is reused from `previous` when
+    size and mtime are unchanged, so an untouched file is not read at all.
+    """
+    stat = os.stat(path)
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime") == stat.st_mtime:
+        return {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": previous.get("sha256")}
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": file_sha256(path)}
+
+
+def is_unchanged(entry: dict, current: dict) -> bool:
+    return bool(entry) and entry.get("sha256") is not None and entry.get("sha256") == current["sha256"]
+
+
+def page_hash(page) -> str:
+    return hashlib.sha1(f"{page.page_content}\0{page.metadata.get('images', '')}".encode("utf-8")).hexdigest()
+
+
+def chunk_ids(file_key: str, page_number: int, chunks: list) -> list:
+    """
+    Stable IDs from the chunk text: an unchanged chunk keeps its ID (and its
+    vector) when its page is re-indexed. Repeated chunks on one page are numbered.
+    """
+    seen = Counter()
+    ids = []
+    for chunk in chunks:
+        digest = text_hash(chunk.page_content)[:16]
+        ids.append(f"{file_key}-p{page_number}-{digest}-{seen[digest]}")
+        seen[digest] += 1
+    return ids
+
+
+def file_key(name: str) -> str:
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()[:12]
+
+
+class SyncStats:
+    def __init__(self):
+        self.pages = 0
+        self.pages_changed = 0
+        self.chunks_added = 0
+        self.chunks_kept = 0
+        self.chunks_deleted = 0
+
+    def __str__(self):
+        return (f"{self.pages_changed}/{self.pages} pages changed, {self.chunks_added} chunks added, "
+                f"{self.chunks_kept} kept, {self.chunks_deleted} deleted")
+
+
+def _legacy_ids(db, pdf_path: str) -> list:
+    """
+    IDs of chunks indexed before stable IDs existed, found by their source path.
+    """
+    return db.get(where={"source": pdf_path})["ids"]
+
+
+def sync_pdf(pdf_path: str, entry: dict, current: dict, image_dir: str, db, splitter, workers: int = 1,
+             batch_size: int = BATCH_SIZE, image_mode: str = "eager") -> tuple:
+    """
+    Bring the index in line with a new version of a PDF; returns (new manifest entry, SyncStats).
+
+    Every page is extracted and hashed, but only pages whose hash changed are
+    split. All their chunks are upserted in batches, since a page whose images
+    changed keeps its chunk IDs but needs its metadata rewritten; chunks whose
+    text did not change reuse their vectors from the embedding cache. IDs that
+    disappeared (including those of pages no longer in the PDF) are deleted,
+    so a re-ingest costs embeddings in proportion to the diff.
+    """
+    name = Path(pdf_path).name
+    key = file_key(name)
+    old_pages = entry.get("page_hashes", []) if entry else []
+    old_chunks = entry.get("chunks", {}) if entry else {}
+    stats = SyncStats()
+
+    legacy = bool(entry) and "page_hashes" not in entry
+    stale = _legacy_ids(db, pdf_path) if legacy else []  # Indexed with random IDs: replace everything once
+
+    page_hashes = []
+    chunks = {}
+
+    def changed_chunks():
+        for page in iter_pages(pdf_path, image_dir, workers=workers, image_mode=image_mode):
+            number = page.metadata["page"]
+            digest = page_hash(page)
+            page_hashes.append(digest)
+            stats.pages += 1
+            previous = old_chunks.get(str(number), [])
+            if number <= len(old_pages) and old_pages[number - 1] == digest and not legacy:
+                chunks[str(number)] = previous
+                stats.chunks_kept += len(previous)
+                continue
+
+            stats.pages_changed += 1
+            page_chunks = splitter.split_documents([page])
+            ids = chunk_ids(key, number, page_chunks)
+            chunks[str(number)] = ids
+            stale.extend(set(previous) - set(ids))
+            yield from zip(ids, page_chunks)
+
+    for batch in batched(changed_chunks(), batch_size):
+        db.add_documents([chunk for _, chunk in batch], ids=[chunk_id for chunk_id, _ in batch])
+        stats.chunks_added += len(batch)
+
+    for number in range(stats.pages + 1, len(old_pages) + 1):  # pages removed from the end of the PDF
+        stale.extend(old_chunks.get(str(number), []))
+    if stale:
+        db.delete(ids=stale)
+        stats.chunks_deleted = len(stale)
+
+    logger.info(f"Synced '{name}': {stats}")
+    new_entry = {
+        "timestamp": datetime.now().isoformat(),
+        "pages": stats.pages,
+        **current,
+        "page_hashes": page_hashes,
+        "chunks": chunks,
+    }
+    return new_entry, stats
+
+
+def remove_pdf(pdf_path: str, entry: dict, db) -> int:
+    """
+    Delete every chunk of a PDF that is no longer in the container; returns how many.
+    """
+    ids = [chunk_id for page_ids in entry.get("chunks", {}).values() for chunk_id in page_ids]
+    if "chunks" not in entry:
+        ids = _legacy_ids(db, pdf_path)
+    if ids:
+        db.delete(ids=ids)
+    logger.info(f"Removed '{Path(pdf_path).name}' from the index ({len(ids)} chunks)")
+    return len(ids)
@@ -1,7 +1,11 @@
 import os
 import fitz  # PyMuPDF
+import hashlib
 import logging
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from typing import Iterator
 from langchain_core.documents import Document
 from langchain_community.vectorstores.utils import filter_complex_metadata
 
@@ -15,41 +19,201 @@ if not logger.handlers:
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
-def extract_text_and_images(pdf_path: str, image_dir: str) -> list:
+PAGES_PER_TASK = 16  # Pages a worker extracts per task; small enough to keep results flowing in order
+IMAGE_MODES = ("eager", "lazy")
+
+# Per-process cache of open documents, so a worker opens each PDF once rather than once per task
+# (only used in pool workers), and of image digests by xref, so an image repeated on every page is hashed once
+_open_docs = {}
+_image_digests = {}
+
+
+def _open_document(pdf_path: str):
+    doc = _open_docs.get(pdf_path)
+    if doc is None:
+        for old in _open_docs.values():
+            old.close()
+        _open_docs.clear()
+        _image_digests.clear()
+        doc = _open_docs[pdf_path] = fitz.open(pdf_path)
+    return doc
+
+
+def _image_digest(doc, img: tuple, cached: bool = True) -> str:
     """
-    Extracts clean text and any embedded images from the PDF.
-    Returns a list of LangChain Document objects with sanitized metadata.
+    Content hash of an embedded image: its raw (still compressed) stream,
+    its soft mask and its geometry, so identical logos in different PDFs
+    share one digest without decoding either.
+    """
+    xref, smask, width, height, bpc, colorspace = img[:6]
+    key = (doc.name, xref)
+    digest = _image_digests.get(key) if cached else None
+    if digest is None:
+        h = hashlib.sha1(f"{width}x{height}x{bpc}:{colorspace}".encode())
+        h.update(doc.xref_stream_raw(xref) or b"")
+        if smask:
+            h.update(doc.xref_stream_raw(smask) or b"")
+        digest = h.hexdigest()[:20]
+        if cached:
+            _image_digests[key] = digest
+    return digest
+
+
+def image_path(image_dir, digest: str) -> Path:
+    return Path(image_dir) / f"{digest}.png"
+
+
+def _save_image(doc, xref: int, path: Path) -> bool:
+    """
+    Encode an image as PNG unless a file with its digest already exists;
+    returns True if it had to be written.
+    """
+    if path.exists():
+        return False
+    pix = fitz.Pixmap(doc, xref)
+    if pix.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    # Parallel workers may meet the same image; write under a private name and rename into place.
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+    pix.save(str(tmp_path), output="png")
+    os.replace(tmp_path, path)
+    return True
+
+
+def _extract_page(doc, page, page_number: int, pdf_path: str, image_dir: Path,
+                  image_mode: str = "eager") -> Document:
+    text = page.get_text().strip()
+    image_refs = []
+
+    for img in page.get_images(full=True):
+        xref = img[0]
+        try:
+            digest = _image_digest(doc, img)
+            ref = f"{xref}:{digest}"
+            if ref in image_refs:
+                continue
+            if image_mode == "eager":
+                _save_image(doc, xref, image_path(image_dir, digest))
+            image_refs.append(ref)
+        except Exception as e:
+            logger.warning(f"Image save failed on page {page_number}: {e}")
+
+    # Chroma metadata cannot hold lists, so image references are stored as "xref:digest;xref:digest"
+    document = Document(page_content=text, metadata={
+        "source": pdf_path,
+        "page": page_number,
+        "images": ";".join(image_refs)
+    })
+
+    return filter_complex_metadata([document])[0]
+
+
+def _extract_range(pdf_path: str, image_dir: str, start: int, stop: int, image_mode: str = "eager") -> list:
+    """
+    Worker task: extract pages [start, stop) (0-based) with this process's own fitz document.
+    """
+    doc = _open_document(pdf_path)
+    image_dir = Path(image_dir)
+    return [_extract_page(doc, doc[i], i + 1, pdf_path, image_dir, image_mode) for i in range(start, stop)]
+
+
+def page_count(pdf_path: str) -> int:
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def iter_pages(pdf_path: str, image_dir: str, workers: int = 1, pages_per_task: int = PAGES_PER_TASK,
+               image_mode: str = "eager") -> Iterator[Document]:
     """
-    documents = []
-    pdf_name = Path(pdf_path).stem
+    Yields one Document per page, in page order.
+
+    Embedded images are identified by a content hash and stored once as
+    <image_dir>/<digest>.png, however many pages or PDFs repeat them. With
+    image_mode="lazy" nothing is written: the page metadata only records
+    the references, and materialize_images() writes the PNGs when asked.
+
+    With workers > 1 the page ranges are spread over a process pool, each
+    worker opening its own fitz document (PyMuPDF is not thread-safe and
+    text extraction holds the GIL). At most two tasks per worker are in
+    flight, so a large PDF is never held in memory all at once.
+    """
+    if image_mode not in IMAGE_MODES:
+        raise ValueError(f"Unknown image mode: {image_mode}")
     image_dir = Path(image_dir)
-    image_dir.mkdir(parents=True, exist_ok=True)
-
-    doc = fitz.open(pdf_path)
-
-    for page_number, page in enumerate(doc, start=1):
-        text = page.get_text().strip()
-        image_paths = []
-
-        for idx, img in enumerate(page.get_images(full=True)):
-            xref = img[0]
-            try:
-                pix = fitz.Pixmap(doc, xref)
-                if pix.n not in (1, 3):
-                    pix = fitz.Pixmap(fitz.csRGB, pix)
-                img_path = image_dir / f"{pdf_name}_p{page_number}_{idx}.png"
-                pix.save(str(img_path))
-                image_paths.append(str(img_path))
-            except Exception as e:
-                logger.warning(f"Image save failed on page {page_number}: {e}")
-
-        metadata = filter_complex_metadata({
-            "source": pdf_path,
-            "page": page_number,
-            "images": image_paths
-        })
-
-        documents.append(Document(page_content=text, metadata=metadata))
+    if image_mode == "eager":
+        image_dir.mkdir(parents=True, exist_ok=True)
+    n_pages = page_count(pdf_path)
+
+    if workers <= 1 or n_pages <= pages_per_task:
+        try:
+            with fitz.open(pdf_path) as doc:
+                for page_number, page in enumerate(doc, start=1):
+                    yield _extract_page(doc, page, page_number, pdf_path, image_dir, image_mode)
+        finally:
+            _image_digests.clear()
+        return
 
+    ranges = iter([(start, min(start + pages_per_task, n_pages)) for start in range(0, n_pages, pages_per_task)])
+    workers = min(workers, -(-n_pages // pages_per_task))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, stop in ranges:
+            pending.append(pool.submit(_extract_range, pdf_path, str(image_dir), start, stop, image_mode))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            documents = pending.popleft().result()
+            next_range = next(ranges, None)
+            if next_range is not None:
+                pending.append(pool.submit(_extract_range, pdf_path, str(image_dir), *next_range, image_mode))
+            yield from documents
+
+
+def extract_text_and_images(pdf_path: str, image_dir: str, workers: int = 1, image_mode: str = "eager") -> list:
+    """
+    Extracts clean text and any embedded images from the PDF.
+    Returns a list of LangChain Document objects with sanitized metadata.
+    Set workers > 1 to extract page ranges in parallel processes, and
+    image_mode="lazy" to defer writing images (see iter_pages).
+    """
+    documents = list(iter_pages(pdf_path, image_dir, workers=workers, image_mode=image_mode))
     logger.info(f"Extracted {len(documents)} pages from '{Path(pdf_path).name}'")
     return documents
+
+
+def default_workers() -> int:
+    return max(1, min(4, (os.cpu_count() or 1) - 1))
+
+
+def image_refs(images: str) -> list:
+    """
+    [(xref, digest), ...] from a page's "images" metadata.
+    """
+    return [(int(xref), digest) for xref, digest in (ref.split(":") for ref in images.split(";") if ref)]
+
+
+def materialize_images(pdf_path: str, images: str, image_dir: str, page: int = None) -> list:
+    """
+    PNG paths for a page's "images" metadata, writing any that do not exist yet.
+
+    PNGs are named by content and shared by every PDF in the container, so an
+    image is only written if the PDF still holds the image recorded at ingest
+    (same digest). If the file was replaced since, such images are skipped
+    and left out of the result until the PDF is re-ingested.
+    """
+    image_dir = Path(image_dir)
+    refs = image_refs(images)
+    missing = [(xref, digest) for xref, digest in refs if not image_path(image_dir, digest).exists()]
+    if missing:
+        image_dir.mkdir(parents=True, exist_ok=True)
+        with fitz.open(pdf_path) as doc:
+            pages = [doc[page - 1]] if page and page <= doc.page_count else doc
+            found = {img[0]: img for p in pages for img in p.get_images(full=True)}
+            for xref, digest in missing:
+                img = found.get(xref)
+                if img is None or _image_digest(doc, img, cached=False) != digest:
+                    logger.warning(f"Image {xref} of '{Path(pdf_path).name}' changed since ingestion; "
+                                   f"re-ingest the file to show it")
+                    continue
+                _save_image(doc, xref, image_path(image_dir, digest))
+    return [str(image_path(image_dir, digest)) for _, digest in refs if image_path(image_dir, digest).exists()]
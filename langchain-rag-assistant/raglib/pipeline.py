@@ -0,0 +1,63 @@
+import logging
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+from langchain_core.documents import Document
+from raglib.ingest import iter_pages
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 64  # Chunks embedded and written to the vector store per call
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Consecutive lists of up to `size` items, pulled lazily from `items`.
+    """
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def split_pages(pages: Iterable[Document], splitter) -> Iterator[Document]:
+    """
+    Chunks of each page as it arrives. Splitting page by page gives the same
+    chunks as split_documents() on the whole list, which also splits each
+    Document on its own.
+    """
+    for page in pages:
+        yield from splitter.split_documents([page])
+
+
+class IngestStats:
+    def __init__(self):
+        self.pages = 0
+        self.chunks = 0
+        self.batches = 0
+
+    def count_pages(self, pages: Iterable[Document]) -> Iterator[Document]:
+        for page in pages:
+            self.pages += 1
+            yield page
+
+
+def ingest_pdf(pdf_path: str, image_dir: str, db, splitter, workers: int = 1,
+               batch_size: int = BATCH_SIZE, image_mode: str = "eager") -> IngestStats:
+    """
+    Streams a PDF through extract -> split -> embed -> upsert.
+
+    Every stage is a generator and the vector store pulls one batch of
+    `batch_size` chunks at a time, so extraction only runs ahead of
+    embedding by one batch plus the pages its workers have in flight. Peak
+    memory depends on the batch size, not on the length of the PDF.
+    """
+    stats = IngestStats()
+    pages = stats.count_pages(iter_pages(pdf_path, image_dir, workers=workers, image_mode=image_mode))
+    for batch in batched(split_pages(pages, splitter), batch_size):
+        db.add_documents(batch)
+        stats.chunks += len(batch)
+        stats.batches += 1
+
+    logger.info(f"Ingested {stats.pages} pages ({stats.chunks} chunks in {stats.batches} batches) "
+                f"from '{Path(pdf_path).name}'")
+    return stats
@@ -0,0 +1,52 @@
+import json
+import logging
+from pathlib import Path
+from langchain_community.vectorstores import Chroma
+from langchain_community.chat_models import ChatOllama
+from langchain.chains import RetrievalQA
+from raglib.embeddings import OllamaBatchEmbeddings
+from raglib.embedding_cache import EmbeddingCache, CachedEmbeddings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "ingested_files.json"
+
+
+def index_version(container_path) -> int:
+    """
+    Changes whenever an ingest finishes (it rewrites ingested_files.json), in
+    this process or any other; resources built for an older version are stale.
+    """
+    manifest = Path(container_path) / MANIFEST_NAME
+    return manifest.stat().st_mtime_ns if manifest.exists() else 0
+
+
+def load_manifest(container_path) -> dict:
+    manifest = Path(container_path) / MANIFEST_NAME
+    if not manifest.exists():
+        return {}
+    with open(manifest) as f:
+        return json.load(f)
+
+
+def build_embedder(model: str, base_url: str, cache: EmbeddingCache, batch_size: int = 32,
+                   concurrency: int = 4) -> CachedEmbeddings:
+    return CachedEmbeddings(OllamaBatchEmbeddings(model=model, base_url=base_url, batch_size=batch_size,
+                                                  concurrency=concurrency), cache, model=model)
+
+
+def open_vectorstore(index_dir, embedder) -> Chroma:
+    logger.info(f"Opening Chroma index at {index_dir}")
+    return Chroma(persist_directory=str(index_dir), embedding_function=embedder)
+
+
+def build_llm(model: str = "mistral", base_url: str = "http://localhost:11434", temperature: float = 0.2):
+    return ChatOllama(model=model, base_url=base_url, temperature=temperature)
+
+
+def build_qa_chain(llm, db: Chroma, k: int = 3) -> RetrievalQA:
+    return RetrievalQA.from_chain_type(
+        llm=llm,
+        retriever=db.as_retriever(search_kwargs={"k": k}),
+        return_source_documents=True
+    )
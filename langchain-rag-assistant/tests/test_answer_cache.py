@@ -0,0 +1,84 @@
+import time
+import numpy as np
+from raglib.answer_cache import AnswerCache, question_key, question_numbers
+
+SCOPE = ("containers/manuals", 1)
+
+
+def vector(*values) -> np.ndarray:
+    return np.array(values, dtype=np.float32)
+
+
+def test_exact_hit_after_normalisation():
+    cache = AnswerCache()
+    cache.store(SCOPE, "What are the benefits of oyster mushrooms?", vector(1, 0, 0), {"result": "answer"})
+
+    entry = cache.lookup(SCOPE, "  what ARE the benefits of oyster-mushrooms", vector(0, 1, 0))
+
+    assert question_key("What is X?") == question_key("what is x")
+    assert entry is not None and entry.result == {"result": "answer"}
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_similar_question_hits_unless_the_numbers_differ():
+    cache = AnswerCache(threshold=0.9)
+    cache.store(SCOPE, "What does section 3.1 say?", vector(1, 0, 0), {"result": "3.1"})
+
+    assert cache.lookup(SCOPE, "What is in section 3.1?", vector(0.98, 0.2, 0)).result == {"result": "3.1"}
+    assert cache.lookup(SCOPE, "What does section 3.2 say?", vector(1, 0, 0)) is None
+    assert cache.lookup(SCOPE, "How do I clean the filter?", vector(0, 1, 0)) is None
+    assert question_numbers("section 3.1, page 12") == ("12", "3.1")
+
+    stats = cache.stats()
+    assert (stats["semantic_hits"], stats["misses"]) == (1, 2)
+
+
+def test_new_index_version_drops_the_container_entries():
+    cache = AnswerCache()
+    other = ("containers/recipes", 1)
+    cache.store(SCOPE, "question", vector(1, 0), {"result": "old"})
+    cache.store(other, "question", vector(1, 0), {"result": "recipes"})
+
+    assert cache.lookup(("containers/manuals", 2), "question", vector(1, 0)) is None
+    cache.store(("containers/manuals", 2), "question", vector(1, 0), {"result": "new"})
+
+    assert cache.lookup(SCOPE, "question", vector(1, 0)) is None
+    assert cache.lookup(("containers/manuals", 2), "question", vector(1, 0)).result == {"result": "new"}
+    assert cache.lookup(other, "question", vector(1, 0)).result == {"result": "recipes"}
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_expire_after_the_ttl():
+    cache = AnswerCache(ttl=0.05)
+    cache.store(SCOPE, "question", vector(1, 0), {"result": "answer"})
+    assert cache.lookup(SCOPE, "question", vector(1, 0)) is not None
+
+    time.sleep(0.06)
+    assert cache.lookup(SCOPE, "question", vector(1, 0)) is None
+    assert cache.lookup(SCOPE, "question again", vector(1, 0)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnswerCache(max_entries=2)
+    cache.store(SCOPE, "first", vector(1, 0, 0), {"result": 1})
+    cache.store(SCOPE, "second", vector(0, 1, 0), {"result": 2})
+    cache.lookup(SCOPE, "first", vector(1, 0, 0))  # first is now the most recently used
+
+    cache.store(SCOPE, "third", vector(0, 0, 1), {"result": 3})
+
+    assert cache.lookup(SCOPE, "second", vector(0, 1, 0)) is None
+    assert cache.lookup(SCOPE, "first", vector(1, 0, 0)) is not None
+    assert cache.lookup(SCOPE, "third", vector(0, 0, 1)) is not None
+
+
+def test_invalidate_forgets_one_container():
+    cache = AnswerCache()
+    other = ("containers/recipes", 1)
+    cache.store(SCOPE, "question", vector(1, 0), {"result": "manuals"})
+    cache.store(other, "question", vector(1, 0), {"result": "recipes"})
+
+    cache.invalidate(SCOPE[0])
+
+    assert cache.lookup(SCOPE, "question", vector(1, 0)) is None
+    assert cache.lookup(other, "question", vector(1, 0)) is not None
@@ -0,0 +1,75 @@
+from langchain_core.embeddings import Embeddings
+from raglib.embedding_cache import EmbeddingCache, CachedEmbeddings, text_hash
+
+VECTOR_BYTES = 4 * 4  # four float32 values
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.documents = []
+        self.queries = []
+
+    def embed_documents(self, texts):
+        self.documents.extend(texts)
+        return [[float(len(text)), 0.0, 0.0, 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return [float(len(text)), 1.0, 0.0, 0.0]
+
+
+def test_whitespace_and_unicode_form_do_not_change_the_key():
+    assert text_hash("Oyster  mushrooms\nare rich ") == text_hash("Oyster mushrooms are rich")
+    assert text_hash("cafe\u0301") == text_hash("caf\u00e9")
+    assert text_hash("Oyster mushrooms") != text_hash("oyster mushrooms")
+
+
+def test_replacing_a_row_does_not_count_its_bytes_twice(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    cache.put_many("m", {"a": [1, 2, 3, 4], "b": [1, 2, 3, 4]})
+    cache.put_many("m", {"a": [5, 6, 7, 8]})
+    assert cache.total_bytes == 2 * VECTOR_BYTES
+    assert cache.get_many("m", ["a"]) == {"a": [5.0, 6.0, 7.0, 8.0]}
+    cache.close()
+
+    reopened = EmbeddingCache(tmp_path / "cache.sqlite")
+    assert reopened.total_bytes == 2 * VECTOR_BYTES
+    reopened.close()
+
+
+def test_eviction_frees_down_to_90_percent_least_recently_used_first(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite", max_bytes=10 * VECTOR_BYTES)
+    for i in range(10):
+        cache.put_many("m", {f"k{i}": [i, 0, 0, 0]})
+    cache.get_many("m", ["k0"])  # recently used again
+
+    cache.put_many("m", {"k10": [10, 0, 0, 0]})
+
+    assert cache.total_bytes <= 9 * VECTOR_BYTES
+    assert cache.entries() == 9 and cache.evicted == 2
+    assert set(cache.get_many("m", ["k0", "k1", "k2", "k10"])) == {"k0", "k10"}
+    cache.close()
+
+
+def test_only_missing_chunks_reach_the_embedder(tmp_path):
+    embedder = CountingEmbeddings()
+    cached = CachedEmbeddings(embedder, EmbeddingCache(tmp_path / "cache.sqlite"), model="m")
+
+    first = cached.embed_documents(["alpha", "beta", "alpha"])
+    second = cached.embed_documents(["alpha  ", "gamma"])
+
+    assert embedder.documents == ["alpha", "beta", "gamma"]
+    assert first[0] == first[2] == second[0]
+    assert (cached.hits, cached.misses) == (2, 3)
+
+
+def test_queries_stay_out_of_the_persistent_cache(tmp_path):
+    embedder = CountingEmbeddings()
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    cached = CachedEmbeddings(embedder, cache, model="m", query_cache_size=2)
+
+    for question in ("what is a?", "what is a?", "what is b?", "what is c?", "what is a?"):
+        cached.embed_query(question)
+
+    assert cache.entries() == 0
+    assert embedder.queries == ["what is a?", "what is b?", "what is c?", "what is a?"]  # a was evicted by c
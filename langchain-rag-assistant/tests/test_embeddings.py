@@ -0,0 +1,43 @@
+import pytest
+from benchmarks.ollama_stub import OllamaStub, fake_embedding
+from raglib.embeddings import OllamaBatchEmbeddings, EmbeddingError
+
+
+@pytest.fixture
+def stub():
+    with OllamaStub(dim=8, request_latency=0.0, text_latency=0.0) as stub:
+        yield stub
+
+
+def test_batches_come_back_in_input_order(stub):
+    texts = [f"chunk number {i}" for i in range(100)]
+    embedder = OllamaBatchEmbeddings(base_url=stub.url, batch_size=8, concurrency=4)
+    try:
+        vectors = embedder.embed_documents(texts)
+    finally:
+        embedder.close()
+
+    assert vectors == [fake_embedding(text, 8) for text in texts]
+    assert embedder.stats() == {"requests": 13, "retries": 0, "texts": 100}
+
+
+def test_server_errors_are_retried(stub):
+    stub.fail_next = 2
+    embedder = OllamaBatchEmbeddings(base_url=stub.url, backoff=0.01)
+    try:
+        assert embedder.embed_query("hello") == fake_embedding("hello", 8)
+    finally:
+        embedder.close()
+
+    assert embedder.stats()["retries"] == 2
+    assert stub.requests == 3
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.fail_next = 10
+    embedder = OllamaBatchEmbeddings(base_url=stub.url, max_retries=2, backoff=0.01)
+    try:
+        with pytest.raises(EmbeddingError, match="after 3 attempts"):
+            embedder.embed_documents(["a", "b"])
+    finally:
+        embedder.close()
@@ -0,0 +1,171 @@
+import os
+from types import SimpleNamespace
+import fitz  # PyMuPDF
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from raglib.incremental import chunk_ids, fingerprint, is_unchanged, remove_pdf, same_content, sync_pdf
+
+
+class FakeStore:
+    """
+    The part of Chroma that sync_pdf and remove_pdf use: upsert and delete by ID, filter by source.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.added = []
+        self.deleted = []
+
+    def add_documents(self, documents, ids):
+        self.documents.update(zip(ids, documents))
+        self.added.extend(ids)
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self.documents.pop(chunk_id, None)
+        self.deleted.extend(ids)
+
+    def get(self, where):
+        return {"ids": [chunk_id for chunk_id, doc in self.documents.items()
+                        if doc.metadata.get("source") == where["source"]]}
+
+
+def write_pdf(path, pages: list, images: dict = None):
+    """
+    One page per text; `images` maps a page index to the grey level of a small image drawn on it.
+    """
+    doc = fitz.open()
+    for i, text in enumerate(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(72, 72, 540, 520), text, fontsize=9)
+        if images and i in images:
+            pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 32, 32), False)
+            pix.set_rect(pix.irect, (images[i],))
+            page.insert_image(fitz.Rect(72, 560, 136, 624), pixmap=pix)
+    doc.save(str(path))
+    doc.close()
+
+
+def page_text(label: str) -> str:
+    return " ".join(f"{label} sentence {i} about oyster mushrooms and their nutrients." for i in range(12))
+
+
+def sync(path, entry, store, tmp_path):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=200, chunk_overlap=0)
+    current = fingerprint(str(path), entry)
+    if is_unchanged(entry, current):
+        return entry, None
+    return sync_pdf(str(path), entry, current, str(tmp_path / "images"), store, splitter, image_mode="lazy")
+
+
+def test_chunk_ids_are_stable_and_number_repeats():
+    chunks = [SimpleNamespace(page_content=text) for text in ("a", "b", "a")]
+    ids = chunk_ids("key", 3, chunks)
+    assert ids == chunk_ids("key", 3, chunks)
+    assert len(set(ids)) == 3
+    assert ids[0].endswith("-0") and ids[2].endswith("-1") and ids[0][:-2] == ids[2][:-2]
+    assert all(chunk_id.startswith("key-p3-") for chunk_id in ids)
+
+
+def test_only_changed_pages_are_upserted(tmp_path):
+    path = tmp_path / "manual.pdf"
+    write_pdf(path, [page_text("first"), page_text("second"), page_text("third")])
+    store = FakeStore()
+    entry, stats = sync(path, None, store, tmp_path)
+    assert stats.pages == 3 and stats.pages_changed == 3
+    indexed = set(store.documents)
+    page_two = set(entry["chunks"]["2"])
+
+    store.added.clear()
+    write_pdf(path, [page_text("first"), page_text("revised"), page_text("third")])
+    entry, stats = sync(path, entry, store, tmp_path)
+
+    assert stats.pages_changed == 1
+    assert set(store.added) == set(entry["chunks"]["2"])
+    assert set(store.deleted) == page_two - set(entry["chunks"]["2"])
+    assert set(store.documents) == (indexed - page_two) | set(entry["chunks"]["2"])
+    assert all(store.documents[chunk_id].metadata["page"] == 2 for chunk_id in store.added)
+
+
+def test_page_with_only_a_new_image_is_rewritten(tmp_path):
+    path = tmp_path / "manual.pdf"
+    write_pdf(path, [page_text("first"), page_text("second")], images={1: 40})
+    store = FakeStore()
+    entry, _ = sync(path, None, store, tmp_path)
+    page_two = entry["chunks"]["2"]
+    old_images = store.documents[page_two[0]].metadata["images"]
+    store.added.clear()
+
+    write_pdf(path, [page_text("first"), page_text("second")], images={1: 200})
+    entry, stats = sync(path, entry, store, tmp_path)
+
+    assert stats.pages_changed == 1 and entry["chunks"]["2"] == page_two
+    assert set(store.added) == set(page_two) and store.deleted == []
+    assert all(store.documents[chunk_id].metadata["images"] not in ("", old_images) for chunk_id in page_two)
+
+
+def test_pages_cut_from_the_end_are_deleted(tmp_path):
+    path = tmp_path / "manual.pdf"
+    write_pdf(path, [page_text("first"), page_text("second"), page_text("third")])
+    store = FakeStore()
+    entry, _ = sync(path, None, store, tmp_path)
+    page_three = set(entry["chunks"]["3"])
+
+    write_pdf(path, [page_text("first"), page_text("second")])
+    entry, stats = sync(path, entry, store, tmp_path)
+
+    assert stats.pages == 2 and stats.pages_changed == 0 and stats.chunks_added == 0
+    assert set(store.deleted) == page_three and stats.chunks_deleted == len(page_three)
+    assert "3" not in entry["chunks"] and len(entry["page_hashes"]) == 2
+    assert not page_three & set(store.documents)
+
+
+def test_legacy_entry_is_reindexed_with_stable_ids(tmp_path):
+    path = tmp_path / "manual.pdf"
+    write_pdf(path, [page_text("first"), page_text("second")])
+    store = FakeStore()
+    legacy_ids = ["3f2a-random", "9c1b-random"]
+    store.add_documents([SimpleNamespace(page_content="old", metadata={"source": str(path)})] * 2, ids=legacy_ids)
+    entry = {"timestamp": "2024-01-01T00:00:00", "pages": 2}  # manifest from before fingerprints
+
+    entry, stats = sync(path, entry, store, tmp_path)
+
+    assert set(store.deleted) == set(legacy_ids)
+    assert stats.pages_changed == 2
+    assert set(store.documents) == {chunk_id for ids in entry["chunks"].values() for chunk_id in ids}
+    assert "page_hashes" in entry and entry["sha256"]
+
+
+def test_touched_but_identical_file_is_skipped(tmp_path):
+    path = tmp_path / "manual.pdf"
+    write_pdf(path, [page_text("first")])
+    store = FakeStore()
+    entry, _ = sync(path, None, store, tmp_path)
+    store.added.clear()
+
+    os.utime(path, (entry["mtime"] + 10, entry["mtime"] + 10))
+    current = fingerprint(str(path), entry)
+    assert current["mtime"] != entry["mtime"]
+    assert is_unchanged(entry, current)
+    assert sync(path, entry, store, tmp_path) == (entry, None)
+    assert store.added == []
+
+
+def test_remove_pdf_deletes_every_chunk(tmp_path):
+    path = tmp_path / "manual.pdf"
+    write_pdf(path, [page_text("first"), page_text("second")])
+    store = FakeStore()
+    entry, _ = sync(path, None, store, tmp_path)
+
+    removed = remove_pdf(str(path), entry, store)
+
+    assert removed == sum(len(ids) for ids in entry["chunks"].values())
+    assert store.documents == {}
+
+
+def test_same_content_compares_size_then_hash(tmp_path):
+    path = tmp_path / "manual.pdf"
+    path.write_bytes(b"%PDF-1.7 one")
+    assert same_content(path, b"%PDF-1.7 one")
+    assert not same_content(path, b"%PDF-1.7 two")
+    assert not same_content(path, b"%PDF-1.7 longer")
+    assert not same_content(tmp_path / "missing.pdf", b"")
@@ -0,0 +1,38 @@
+import fitz  # PyMuPDF
+from raglib.ingest import image_path, image_refs, iter_pages, materialize_images
+
+
+def write_pdf(path, color: int):
+    figure = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 32, 32), False)
+    figure.clear_with(color)
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "A page with a figure.")
+    page.insert_image(fitz.Rect(72, 100, 136, 164), pixmap=figure)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_lazy_images_are_written_when_shown(tmp_path):
+    pdf = tmp_path / "manual.pdf"
+    write_pdf(pdf, 40)
+    page = next(iter_pages(str(pdf), str(tmp_path / "images"), image_mode="lazy"))
+    assert not (tmp_path / "images").exists()
+
+    paths = materialize_images(str(pdf), page.metadata["images"], str(tmp_path / "images"), page=1)
+
+    [(_, digest)] = image_refs(page.metadata["images"])
+    assert paths == [str(image_path(tmp_path / "images", digest))]
+    assert fitz.Pixmap(paths[0]).pixel(0, 0) == (40, 40, 40)
+
+
+def test_replaced_pdf_never_writes_under_a_recorded_digest(tmp_path):
+    pdf = tmp_path / "manual.pdf"
+    write_pdf(pdf, 40)
+    page = next(iter_pages(str(pdf), str(tmp_path / "images"), image_mode="lazy"))
+
+    write_pdf(pdf, 200)  # uploaded again with a different figure, not yet re-ingested
+    paths = materialize_images(str(pdf), page.metadata["images"], str(tmp_path / "images"), page=1)
+
+    assert paths == []
+    assert not list((tmp_path / "images").glob("*.png"))